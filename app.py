@@ -4,21 +4,36 @@ Sistema completo com login e monitoramento integrado
 """
 
 from flask import Flask, render_template, jsonify, request, redirect, url_for, session, flash
+import atexit
 import threading
 import time
 from datetime import datetime
 import json
 import os
-import pyautogui
+import sys
 import cv2
 import numpy as np
 from PIL import Image
-import pytesseract
 import pickle
 from sklearn.metrics.pairwise import cosine_similarity
-
-# Configurar caminho do Tesseract
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+from banco_templates import BancoTemplates
+from extrator_caracteristicas import ExtratorHistogramaHu
+from captura_roi import calcular_blocos_cartas
+from fontes_frames import TelaFrameSource, criar_fonte
+from detector_mudanca import DetectorMudanca
+from motor_ocr import MotorOCR
+from cascata_ocr import CascataOCR
+from backend_ocr import ler_texto  # Backend de OCR persistente (tesserocr) ou pytesseract
+from maquina_rodada import MaquinaEstadosRodada
+from indice_canto import ReconhecedorIndiceCanto, valor_do_nome
+from classificador_fatorado import cor_predominante, recortar_regioes
+from cache_reconhecimento import CacheReconhecimento
+from cascata_reconhecedores import CascataReconhecedores, EtapaCascata
+from diario_rodadas import DiarioRodadas
+from persistencia_assincrona import PersistidorAssincrono
+from armazenamento_rodadas import ArmazenamentoRodadas
+from estatisticas_rodadas import EstatisticasRodadas
+from rodadas_colunares import CODIGO_VALOR, RodadasColunares
 
 app = Flask(__name__)
 app.secret_key = 'football_studio_2024_secret'
@@ -31,83 +46,27 @@ class TemplateCardRecognizer:
     """Sistema de reconhecimento de cartas por templates - Similar ao reconhecimento facial"""
     
     def __init__(self):
-        self.templates = {}  # Dicionário para armazenar templates das cartas
-        self.templates_file = "templates_cartas.pkl"
+        self.templates = {}  # Visão {valor_lado: [template_info, ...]} do banco
+        self.templates_file = "templates_cartas.pkl"  # Formato antigo, apenas para migração
         self.cartas_validas = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
         self.threshold_similaridade = 0.75  # Threshold para aceitar reconhecimento
+        self.extrator = ExtratorHistogramaHu()  # Buffers de trabalho reaproveitados entre extrações
+        # Banco em disco (matriz float32 com mmap) usado diretamente na busca vetorizada
+        self.banco = BancoTemplates("templates_cartas_banco", self.extrator.versao, maximo_por_chave=300)
+        self.cache = CacheReconhecimento()  # Resultados por conteúdo da ROI (limpo ao mudar os templates)
         self.carregar_templates()
     
     def extrair_caracteristicas(self, img_carta):
         """Extrai características da imagem da carta para comparação"""
         try:
-            if img_carta is None or img_carta.size == 0:
-                return None
-            
-            # Redimensionar para tamanho padrão
-            img_redimensionada = cv2.resize(img_carta, (80, 120), interpolation=cv2.INTER_AREA)
-            
-            # Converter para escala de cinza
-            gray = cv2.cvtColor(img_redimensionada, cv2.COLOR_BGR2GRAY)
-            
-            # Normalizar a imagem
-            gray = cv2.equalizeHist(gray)
-            
-            # Aplicar threshold para destacar texto/números
-            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            # Extrair bordas
-            edges = cv2.Canny(gray, 50, 150)
-            
-            # Criar descritor simples baseado em histograma e momentos
-            hist_gray = cv2.calcHist([gray], [0], None, [32], [0, 256])
-            hist_thresh = cv2.calcHist([thresh], [0], None, [32], [0, 256])
-            hist_edges = cv2.calcHist([edges], [0], None, [32], [0, 256])
-            
-            # Momentos de Hu (invariantes à rotação, escala e translação)
-            moments = cv2.moments(thresh)
-            hu_moments = cv2.HuMoments(moments)
-            
-            # Combinar todas as características
-            caracteristicas = np.concatenate([
-                hist_gray.flatten(),
-                hist_thresh.flatten(), 
-                hist_edges.flatten(),
-                hu_moments.flatten(),
-                [moments['m00'], moments['m10'], moments['m01']]  # Momentos básicos
-            ])
-            
-            # Normalizar
-            if np.linalg.norm(caracteristicas) > 0:
-                caracteristicas = caracteristicas / np.linalg.norm(caracteristicas)
-            
-            return caracteristicas
-            
+            return self.extrator.extrair(img_carta)
         except Exception as e:
             print(f"❌ Erro ao extrair características: {e}")
             return None
     
-    def calcular_similaridade_simples(self, carac1, carac2):
-        """Calcula similaridade sem usar sklearn"""
-        try:
-            # Garantir que os vetores tenham o mesmo tamanho
-            tamanho_min = min(len(carac1), len(carac2))
-            v1 = carac1[:tamanho_min]
-            v2 = carac2[:tamanho_min]
-            
-            # Calcular similaridade coseno manualmente
-            dot_product = np.dot(v1, v2)
-            norm_v1 = np.linalg.norm(v1)
-            norm_v2 = np.linalg.norm(v2)
-            
-            if norm_v1 == 0 or norm_v2 == 0:
-                return 0.0
-            
-            similaridade = dot_product / (norm_v1 * norm_v2)
-            return max(0.0, min(1.0, similaridade))  # Garantir que esteja entre 0 e 1
-            
-        except Exception as e:
-            print(f"❌ Erro no cálculo de similaridade: {e}")
-            return 0.0
+    def extrair_caracteristicas_lote(self, imagens):
+        """Extrai as características de N blocos de uma vez (matriz N x D float32 + máscara de válidos)"""
+        return self.extrator.extrair_lote(imagens)
     
     def salvar_template(self, img_carta, valor_carta, lado="GERAL"):
         """Salva um template de carta para reconhecimento posterior"""
@@ -116,90 +75,123 @@ class TemplateCardRecognizer:
             if caracteristicas is None:
                 return False
             
-            chave = f"{valor_carta}_{lado}"
-            
-            if chave not in self.templates:
-                self.templates[chave] = []
-            
-            template_info = {
-                'caracteristicas': caracteristicas,
-                'valor': valor_carta,
-                'lado': lado,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            self.templates[chave].append(template_info)
-            
-            # Manter apenas os 3 melhores templates por carta
-            if len(self.templates[chave]) > 3:
-                self.templates[chave] = self.templates[chave][-3:]
+            # Anexa ao banco em disco sem regravar os templates existentes
+            # (o banco mantém ativos apenas os 300 mais recentes por carta)
+            self.banco.anexar(caracteristicas, valor_carta, lado)
+            self.templates = self.banco.templates_por_chave()
+            self.cache.limpar()
             
             print(f"✅ Template salvo: {valor_carta} ({lado})")
-            self.salvar_templates_arquivo()
             return True
             
         except Exception as e:
             print(f"❌ Erro ao salvar template: {e}")
             return False
     
-    def reconhecer_carta(self, img_carta):
-        """Reconhece uma carta comparando com templates salvos"""
+    def reconhecer_top_k(self, img_carta, k=3, lado=None):
+        """Retorna as k cartas mais prováveis como lista de (valor, similaridade); lado restringe a busca"""
         try:
             if not self.templates:
-                return None, 0.0
+                return []
             
             caracteristicas_carta = self.extrair_caracteristicas(img_carta)
             if caracteristicas_carta is None:
-                return None, 0.0
-            
-            melhor_match = None
-            melhor_similaridade = 0.0
-            
-            # Comparar com todos os templates
-            for chave, templates_lista in self.templates.items():
-                for template in templates_lista:
-                    caracteristicas_template = template['caracteristicas']
-                    
-                    similaridade = self.calcular_similaridade_simples(
-                        caracteristicas_carta, caracteristicas_template
-                    )
-                    
-                    if similaridade > melhor_similaridade:
-                        melhor_similaridade = similaridade
-                        melhor_match = template['valor']
+                return []
             
-            # Verificar se a similaridade é suficiente
-            if melhor_similaridade >= self.threshold_similaridade:
-                print(f"✅ Carta reconhecida: {melhor_match} (similaridade: {melhor_similaridade:.3f})")
-                return melhor_match, melhor_similaridade
-            else:
-                print(f"❌ Baixa similaridade: {melhor_similaridade:.3f}")
-                return None, melhor_similaridade
+            # Um produto matriz-vetor contra todo o banco
+            return self.banco.buscar(caracteristicas_carta, k, lado)
             
+        except Exception as e:
+            print(f"❌ Erro no reconhecimento: {e}")
+            return []
+    
+    def reconhecer_carta(self, img_carta, lado=None):
+        """Reconhece uma carta comparando com templates salvos (ROIs repetidas saem do cache).
+
+        Com lado ('CASA'/'VISITANTE') só os templates daquele lado e os 'GERAL' são comparados.
+        """
+        try:
+            return self.cache.reconhecer(img_carta, f"templates_{lado or 'GERAL'}",
+                                         lambda img: self._avaliar_candidatos(self.reconhecer_top_k(img, 1, lado)))
         except Exception as e:
             print(f"❌ Erro no reconhecimento: {e}")
             return None, 0.0
     
+    def reconhecer_lote(self, imagens, lados=None):
+        """Reconhece N blocos com uma extração em lote e um produto matriz-matriz por lado"""
+        try:
+            lados = lados or [None] * len(imagens)
+            resultados = [(None, 0.0)] * len(imagens)
+            for lado in dict.fromkeys(lados):
+                posicoes = [posicao for posicao, lado_imagem in enumerate(lados) if lado_imagem == lado]
+                # Só os blocos fora do cache são extraídos e buscados
+                grupo = self.cache.reconhecer_lote(
+                    [imagens[posicao] for posicao in posicoes], f"templates_{lado or 'GERAL'}",
+                    lambda pendentes, lado=lado: self._reconhecer_lote_sem_cache(pendentes, lado))
+                for posicao, resultado in zip(posicoes, grupo):
+                    resultados[posicao] = resultado
+            return resultados
+        except Exception as e:
+            print(f"❌ Erro no reconhecimento em lote: {e}")
+            return [(None, 0.0)] * len(imagens)
+    
+    def _reconhecer_lote_sem_cache(self, imagens, lado=None):
+        if not self.templates:
+            return [(None, 0.0)] * len(imagens)
+        
+        caracteristicas, validos = self.extrair_caracteristicas_lote(imagens)
+        candidatos = self.banco.buscar_lote(caracteristicas, k=1, lado=lado)
+        return [self._avaliar_candidatos(lista) if valido else (None, 0.0)
+                for lista, valido in zip(candidatos, validos)]
+    
+    def _avaliar_candidatos(self, candidatos):
+        """Aplica o threshold ao melhor candidato: (valor, similaridade) ou (None, similaridade)"""
+        if not candidatos:
+            return None, 0.0
+        
+        melhor_match, melhor_similaridade = candidatos[0]
+        
+        # Verificar se a similaridade é suficiente
+        if melhor_similaridade >= self.threshold_similaridade:
+            print(f"✅ Carta reconhecida: {melhor_match} (similaridade: {melhor_similaridade:.3f})")
+            return melhor_match, melhor_similaridade
+        else:
+            print(f"❌ Baixa similaridade: {melhor_similaridade:.3f}")
+            return None, melhor_similaridade
+    
     def salvar_templates_arquivo(self):
-        """Salva templates em arquivo"""
+        """Reescreve o banco de templates compactado (os salvamentos normais só anexam)"""
         try:
-            with open(self.templates_file, 'wb') as f:
-                pickle.dump(self.templates, f)
+            self.banco.compactar()
+            self.templates = self.banco.templates_por_chave()
         except Exception as e:
             print(f"❌ Erro ao salvar templates: {e}")
     
     def carregar_templates(self):
-        """Carrega templates do arquivo"""
+        """Carrega templates do banco (mmap, sem pickle); migra o arquivo .pkl antigo se existir"""
         try:
-            if os.path.exists(self.templates_file):
-                with open(self.templates_file, 'rb') as f:
-                    self.templates = pickle.load(f)
-                print(f"📁 Templates carregados: {len(self.templates)} tipos")
+            if self.banco.carregar():
+                self.templates = self.banco.templates_por_chave()
+                print(f"📁 Templates carregados: {len(self.templates)} tipos ({len(self.banco)} linhas no banco)")
+            elif not self.banco.existe() and os.path.exists(self.templates_file):
+                self.migrar_templates_pickle()
             else:
                 print("📝 Nenhum template encontrado")
         except Exception as e:
             print(f"❌ Erro ao carregar templates: {e}")
             self.templates = {}
+    
+    def migrar_templates_pickle(self):
+        """Converte o antigo templates_cartas.pkl para o banco versionado (executado uma única vez)"""
+        print(f"🔄 Migrando {self.templates_file} para o banco '{self.banco.pasta}'...")
+        with open(self.templates_file, 'rb') as f:
+            templates_antigos = pickle.load(f)
+        
+        # Só entram no banco os templates gerados por este extrator
+        self.banco.compilar(templates_antigos, self.extrator.dimensao)
+        self.banco.salvar()
+        self.templates = self.banco.templates_por_chave()
+        print(f"✅ Migração concluída: {len(self.banco)} templates")
 
 class CartaFootballStudio:
     """Representa uma carta do Football Studio"""
@@ -219,11 +211,8 @@ class RodadaFutebolEstudio:
         self.vencedor = self._calcular_vencedor()
     
     def _calcular_vencedor(self):
-        valores = {'A': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, 
-                   '8': 8, '9': 9, '10': 10, 'J': 11, 'Q': 12, 'K': 13}
-        
-        valor_vermelho = valores.get(self.carta_vermelha.valor, 0)
-        valor_azul = valores.get(self.carta_azul.valor, 0)
+        valor_vermelho = CODIGO_VALOR.get(self.carta_vermelha.valor, 0)  # A = 1 ... K = 13
+        valor_azul = CODIGO_VALOR.get(self.carta_azul.valor, 0)
         
         if valor_vermelho > valor_azul:
             return "Casa"
@@ -233,109 +222,174 @@ class RodadaFutebolEstudio:
             return "Empate"
 
 class CatalogadorCartas:
-    """Gerencia o histórico de cartas"""
+    """Gerencia o histórico de cartas (SQLite em historico_cartas.db; JSON só para importar/exportar)"""
     def __init__(self):
-        self.historico = []
-        self.arquivo_dados = "historico_cartas.json"
+        self.arquivo_dados = "historico_cartas.json"  # Histórico antigo, importado na primeira execução
+        self.armazenamento = ArmazenamentoRodadas("historico_cartas.db")
+        self.estatisticas = EstatisticasRodadas(tamanho_janela=100)  # Agregados mantidos a cada rodada
+        self.rodadas = RodadasColunares()  # Histórico em memória: 13 bytes por rodada
         self.carregar_dados()
     
     def adicionar_rodada(self, rodada):
-        self.historico.append(rodada)
-        if len(self.historico) > 100:  # Manter apenas últimas 100 rodadas
-            self.historico = self.historico[-100:]
-        self.salvar_dados()
+        try:
+            # Colunas primeiro: se o banco falhar a linha é desfeita, e os agregados só contam rodadas gravadas
+            self.rodadas.anexar(rodada.carta_vermelha, rodada.carta_azul, rodada.timestamp)
+            try:
+                self.armazenamento.inserir([self.serializar_rodada(rodada)])  # Uma transação por rodada
+            except Exception:
+                self.rodadas.descartar_ultimas(1)
+                raise
+            self.estatisticas.adicionar(rodada.vencedor, (str(rodada.carta_vermelha), str(rodada.carta_azul)))
+        except Exception as e:
+            print(f"❌ Erro ao salvar rodada: {e}")
     
     def carregar_dados(self):
-        if os.path.exists(self.arquivo_dados):
+        """Importa (uma única vez) o histórico JSON antigo para o banco e calcula os agregados iniciais"""
+        if not self.armazenamento.obter_meta('json_importado') and os.path.exists(self.arquivo_dados):
             try:
-                with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
-                    dados = json.load(f)
-                    for item in dados:
-                        carta_vermelha = CartaFootballStudio(
-                            item['carta_vermelha']['naipe'], 
-                            item['carta_vermelha']['valor']
-                        )
-                        carta_azul = CartaFootballStudio(
-                            item['carta_azul']['naipe'], 
-                            item['carta_azul']['valor']
-                        )
-                        rodada = RodadaFutebolEstudio(carta_vermelha, carta_azul, item['timestamp'])
-                        self.historico.append(rodada)
-            except:
-                self.historico = []
-    
-    def salvar_dados(self):
-        dados = []
-        for rodada in self.historico:
-            dados.append({
-                'carta_vermelha': {'naipe': rodada.carta_vermelha.naipe, 'valor': rodada.carta_vermelha.valor},
-                'carta_azul': {'naipe': rodada.carta_azul.naipe, 'valor': rodada.carta_azul.valor},
-                'timestamp': rodada.timestamp,
-                'vencedor': rodada.vencedor
-            })
+                importadas = self.armazenamento.importar(DiarioRodadas(self.arquivo_dados).carregar())
+                self.armazenamento.definir_meta('json_importado', self.arquivo_dados)
+                print(f"📥 {importadas} rodadas importadas de {self.arquivo_dados} para {self.armazenamento.caminho}")
+            except Exception as e:
+                print(f"❌ Erro ao importar {self.arquivo_dados}: {e}")
+        
+        # Única passada pelo histórico: daqui em diante colunas e agregados são atualizados em adicionar_rodada
+        try:
+            for bloco in self.armazenamento.linhas():
+                self.rodadas.anexar_linhas(bloco)
+        except Exception as e:
+            print(f"❌ Erro ao carregar as rodadas do banco na memória: {e}")
         
-        with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
+        try:
+            self.estatisticas.carregar(
+                self.armazenamento.contagem_por_vencedor(),
+                {str(CartaFootballStudio(naipe, valor)): vezes
+                 for (valor, naipe), vezes in self.armazenamento.frequencia_cartas().items()},
+                self.armazenamento.sequencia_atual(),
+                [rodada.vencedor for rodada in self.rodadas.ultimas(self.estatisticas.tamanho_janela)])
+        except Exception as e:
+            print(f"❌ Erro ao calcular as estatísticas do histórico: {e}")
+    
+    def ultimas_rodadas(self, quantidade=10):
+        """As rodadas mais recentes (da mais antiga para a mais nova), como visões das colunas em memória"""
+        return self.rodadas.ultimas(quantidade)
+    
+    def rodadas_no_intervalo(self, inicio=None, fim=None):
+        """Rodadas com inicio <= timestamp < fim (ISO), por busca binária na coluna de timestamps"""
+        return self.rodadas.intervalo(inicio, fim)
+    
+    def serializar_rodada(self, rodada):
+        return {
+            'carta_vermelha': {'naipe': rodada.carta_vermelha.naipe, 'valor': rodada.carta_vermelha.valor},
+            'carta_azul': {'naipe': rodada.carta_azul.naipe, 'valor': rodada.carta_azul.valor},
+            'timestamp': rodada.timestamp,
+            'vencedor': rodada.vencedor
+        }
+    
+    def exportar_dados(self, caminho="historico_cartas_exportado.json"):
+        """Exporta todas as rodadas do banco para JSON (mesmo formato do histórico antigo)"""
+        return self.armazenamento.exportar_json(caminho)
+    
+    def limpar(self):
+        self.armazenamento.limpar()
+        self.estatisticas.reiniciar()
+        self.rodadas.limpar()
     
     def obter_estatisticas(self):
-        if not self.historico:
+        # Agregados incrementais: o custo não depende do tamanho do histórico
+        resumo = self.estatisticas.resumo()
+        contagem = resumo['vencedores']
+        total_rodadas = resumo['total']
+        if not total_rodadas:
             return {
                 'total_rodadas': 0,
                 'casa_vitorias': 0,
                 'visitante_vitorias': 0,
                 'empates': 0,
                 'carta_mais_comum': 'N/A',
-                'sequencia_atual': 'N/A'
+                'sequencia_atual': 'N/A',
+                'janela': self.resumo_janela(resumo)
             }
         
-        casa_wins = sum(1 for r in self.historico if r.vencedor == "Casa")
-        visitante_wins = sum(1 for r in self.historico if r.vencedor == "Visitante")
-        empates = sum(1 for r in self.historico if r.vencedor == "Empate")
+        casa_wins = contagem.get("Casa", 0)
+        visitante_wins = contagem.get("Visitante", 0)
+        empates = contagem.get("Empate", 0)
         
         # Carta mais comum
-        todas_cartas = []
-        for rodada in self.historico:
-            todas_cartas.append(str(rodada.carta_vermelha))
-            todas_cartas.append(str(rodada.carta_azul))
-        
-        carta_mais_comum = 'N/A'
-        if todas_cartas:
-            from collections import Counter
-            contador = Counter(todas_cartas)
-            carta_mais_comum = contador.most_common(1)[0][0]
+        carta_mais_comum = resumo['carta_mais_comum'] or 'N/A'
         
         # Sequência atual
         sequencia_atual = 'N/A'
-        if len(self.historico) >= 2:
-            ultimo_vencedor = self.historico[-1].vencedor
-            contador_sequencia = 1
-            for i in range(len(self.historico) - 2, -1, -1):
-                if self.historico[i].vencedor == ultimo_vencedor:
-                    contador_sequencia += 1
-                else:
-                    break
-            sequencia_atual = f"{ultimo_vencedor} x{contador_sequencia}"
+        if total_rodadas >= 2:
+            sequencia_atual = f"{resumo['ultimo_vencedor']} x{resumo['sequencia']}"
         
         return {
-            'total_rodadas': len(self.historico),
+            'total_rodadas': total_rodadas,
             'casa_vitorias': casa_wins,
             'visitante_vitorias': visitante_wins,
             'empates': empates,
             'carta_mais_comum': carta_mais_comum,
-            'sequencia_atual': sequencia_atual
+            'sequencia_atual': sequencia_atual,
+            'janela': self.resumo_janela(resumo)
+        }
+    
+    def resumo_janela(self, resumo):
+        """Vitórias nas últimas rodadas da janela deslizante"""
+        return {
+            'rodadas': resumo['rodadas_janela'],
+            'casa_vitorias': resumo['vencedores_janela'].get("Casa", 0),
+            'visitante_vitorias': resumo['vencedores_janela'].get("Visitante", 0),
+            'empates': resumo['vencedores_janela'].get("Empate", 0)
         }
 
 # ============================================================================
 # VARIÁVEIS GLOBAIS
 # ============================================================================
 
-catalogador = CatalogadorCartas()
-template_recognizer = TemplateCardRecognizer()  # Sistema de reconhecimento por templates
+# Criados em inicializar_sistema(), chamada só no processo principal: com o início 'spawn'
+# (Windows/macOS) os processos do motor de OCR reimportam este módulo como __mp_main__
+catalogador = None
+template_recognizer = None  # Sistema de reconhecimento por templates
+detector_mudanca = DetectorMudanca()  # Pula o reconhecimento de blocos que não mudaram
+cache_reconhecimento = CacheReconhecimento()  # Resultados de OCR e do canto por conteúdo da ROI
+# 'blocos' compara o bloco inteiro com os templates; 'canto' compara só o índice (valor + naipe) do canto
+MODO_RECONHECIMENTO = os.environ.get('MODO_RECONHECIMENTO', 'blocos')
+reconhecedor_canto = None  # ReconhecedorIndiceCanto, criado no primeiro uso do modo 'canto'
+# Cascata: a etapa barata do modo acima e, abaixo da confiança, LBPH e OCR ('0' = só a primeira etapa)
+CASCATA_RECONHECIMENTO = os.environ.get('CASCATA_RECONHECIMENTO', '1') != '0'
+cascata_reconhecedores = None  # CascataReconhecedores, criada no primeiro reconhecimento
+modelo_lbph = None  # (reconhecedor, mapa, por_indice) do classifier_cartas/; False se indisponível
+LIMIAR_DISTANCIA_LBPH = 100  # Mesmo limiar de reconhecer_cartas_dinamico.py (distância: menor é melhor)
+TAMANHO_CARTA_LBPH = (220, 300)  # Devem ser os mesmos de treinar_modelo_cartas.py
+TAMANHO_VALOR_LBPH = (40, 60)
+motor_ocr = MotorOCR()  # Pool de processos para as tentativas de OCR dos blocos
+CONSENSO_OCR = 3  # Leituras iguais que encerram o OCR de um bloco
+CONFIANCA_PARADA_OCR = 120  # Confiança (com bônus de consenso) que encerra o OCR de um bloco
+cascata_ocr_bloco = None       # CascataOCR: ordem adaptativa das 42 combinações do OCR de bloco
+cascata_ocr_tempo_real = None  # CascataOCR: ordem adaptativa dos thresholds do OCR rápido
 monitoramento_ativo = False
 thread_monitoramento = None
 ultima_atividade = "Sistema iniciado"
 credenciais_usuario = {"email": "", "senha": "", "logado": False}
-historico_cartas = []  # Lista para histórico de cartas
+diario_historico = None  # DiarioRodadas do monitor: snapshot + diário só de anexação
+historico_cartas = []  # Lista para histórico de cartas (snapshot + diário)
+persistidor_historico = None  # PersistidorAssincrono do histórico
+
+def inicializar_sistema():
+    """Carrega catálogo, templates, cascatas de OCR e histórico, e inicia a gravação em segundo plano"""
+    global catalogador, template_recognizer, cascata_ocr_bloco, cascata_ocr_tempo_real
+    global diario_historico, historico_cartas, persistidor_historico
+    catalogador = CatalogadorCartas()
+    template_recognizer = TemplateCardRecognizer()
+    cascata_ocr_bloco = CascataOCR('bloco')
+    cascata_ocr_tempo_real = CascataOCR('tempo_real')
+    # Arquivo próprio: historico_cartas.json é o histórico antigo do CatalogadorCartas (outro formato)
+    diario_historico = DiarioRodadas("historico_monitor.json")
+    historico_cartas = list(diario_historico.carregar())
+    # Gravação do histórico fora do loop de detecção: 'rodada' (fsync por rodada), 'lote' ou 'rapida'
+    persistidor_historico = PersistidorAssincrono.com_politica(
+        diario_historico.anexar_lote, os.environ.get('DURABILIDADE_HISTORICO', 'lote'), nome="historico_cartas")
+    atexit.register(persistidor_historico.parar)  # Grava o que estiver na fila ao encerrar
 
 # ============================================================================
 # FUNÇÕES AUXILIARES
@@ -351,20 +405,23 @@ def carregar_coordenadas_calibradas():
         pass
     return None
 
-def capturar_tela_jogo():
-    """Captura apenas a REGIÃO DE INTERESSE (ROI) do jogo para análise."""
+def capturar_tela_jogo(fonte=None):
+    """Captura um frame completo do jogo (tela ao vivo ou fonte informada) para análise."""
     try:
         print("📸 Capturando tela completa para análise dos blocos das cartas")
         
         # Capturar tela completa (para ter contexto dos blocos)
-        screenshot_completa = pyautogui.screenshot()
-        real_width, real_height = screenshot_completa.size
+        if fonte is None:
+            with TelaFrameSource() as fonte_tela:
+                img_bgr = fonte_tela.ler_frame()
+        else:
+            img_bgr = fonte.ler_frame()
         
-        # Converter para array numpy e BGR
-        img_np = np.array(screenshot_completa)
-        img_bgr = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
+        if img_bgr is None:
+            return None, None
         
-        print(f"� Tela capturada: {real_width}x{real_height}")
+        real_height, real_width = img_bgr.shape[:2]
+        print(f"📸 Tela capturada: {real_width}x{real_height}")
         
         return img_bgr, None
         
@@ -375,8 +432,6 @@ def capturar_tela_jogo():
 def detectar_cartas_com_templates(img):
     """Detecta cartas usando sistema de templates (reconhecimento facial de cartas)"""
     try:
-        global template_recognizer
-        
         if img is None:
             print("❌ Imagem nula recebida")
             return None, None
@@ -386,15 +441,9 @@ def detectar_cartas_com_templates(img):
         print(f"📏 Imagem: {largura}x{altura}")
         
         # COORDENADAS DOS BLOCOS DAS CARTAS (ÁREA AUMENTADA)
-        casa_x = int(largura * 0.30)    # 30% da largura (aumentado)
-        casa_y = int(altura * 0.60)     # 60% da altura (aumentado)
-        casa_w = int(largura * 0.20)    # 20% da largura (aumentado)
-        casa_h = int(altura * 0.35)     # 35% da altura (aumentado)
-        
-        visit_x = int(largura * 0.50)   # 50% da largura (aumentado)
-        visit_y = int(altura * 0.60)    # 60% da altura (aumentado)
-        visit_w = int(largura * 0.20)   # 20% da largura (aumentado)
-        visit_h = int(altura * 0.35)    # 35% da altura (aumentado)
+        blocos = calcular_blocos_cartas(largura, altura)
+        casa_x, casa_y, casa_w, casa_h = blocos['CASA']
+        visit_x, visit_y, visit_w, visit_h = blocos['VISITANTE']
         
         print(f"🔶 BLOCO CASA: x={casa_x}, y={casa_y}, w={casa_w}, h={casa_h}")
         print(f"🔷 BLOCO VISITANTE: x={visit_x}, y={visit_y}, w={visit_w}, h={visit_h}")
@@ -403,19 +452,29 @@ def detectar_cartas_com_templates(img):
         bloco_casa = img[casa_y:casa_y+casa_h, casa_x:casa_x+casa_w]
         bloco_visitante = img[visit_y:visit_y+visit_h, visit_x:visit_x+visit_w]
         
+        return detectar_cartas_nos_blocos(bloco_casa, bloco_visitante)
+        
+    except Exception as e:
+        print(f"❌ Erro na detecção por templates: {e}")
+        return None, None
+
+def detectar_cartas_nos_blocos(bloco_casa, bloco_visitante):
+    """Reconhece as cartas a partir dos blocos CASA/VISITANTE já recortados"""
+    try:
+        global template_recognizer
+        
         # Verificar se os blocos foram extraídos corretamente
-        if bloco_casa.size == 0 or bloco_visitante.size == 0:
+        if bloco_casa is None or bloco_visitante is None or bloco_casa.size == 0 or bloco_visitante.size == 0:
             print("❌ Blocos vazios extraídos")
             return None, None
         
         print(f"📦 Blocos extraídos: CASA={bloco_casa.shape}, VISITANTE={bloco_visitante.shape}")
         
-        # RECONHECIMENTO POR TEMPLATES
-        print("🔍 Reconhecendo CASA com templates...")
-        valor_casa, sim_casa = template_recognizer.reconhecer_carta(bloco_casa)
-        
-        print("🔍 Reconhecendo VISITANTE com templates...")
-        valor_visitante, sim_visitante = template_recognizer.reconhecer_carta(bloco_visitante)
+        # CASCATA (apenas blocos que mudaram): etapa barata primeiro, LBPH e OCR só abaixo da confiança
+        print("🪜 Reconhecendo CASA e VISITANTE pela cascata de reconhecedores...")
+        (valor_casa, sim_casa), (valor_visitante, sim_visitante) = detector_mudanca.reconhecer_lote(
+            ['cascata_CASA', 'cascata_VISITANTE'], [bloco_casa, bloco_visitante],
+            reconhecer_blocos_em_cascata, com_chaves=True)
         
         # Criar objetos CartaFootballStudio se reconhecimento foi bem-sucedido
         carta_casa = None
@@ -423,22 +482,22 @@ def detectar_cartas_com_templates(img):
         
         if valor_casa:
             carta_casa = CartaFootballStudio('♦', valor_casa)
-            print(f"   ✅ CASA: {carta_casa} (similaridade: {sim_casa:.3f})")
+            print(f"   ✅ CASA: {carta_casa} (confiança: {sim_casa:.3f})")
         else:
-            print(f"   ❌ CASA: Não reconhecida (max similaridade: {sim_casa:.3f})")
+            print(f"   ❌ CASA: Não reconhecida (max confiança: {sim_casa:.3f})")
         
         if valor_visitante:
             carta_visitante = CartaFootballStudio('♠', valor_visitante)
-            print(f"   ✅ VISITANTE: {carta_visitante} (similaridade: {sim_visitante:.3f})")
+            print(f"   ✅ VISITANTE: {carta_visitante} (confiança: {sim_visitante:.3f})")
         else:
-            print(f"   ❌ VISITANTE: Não reconhecida (max similaridade: {sim_visitante:.3f})")
+            print(f"   ❌ VISITANTE: Não reconhecida (max confiança: {sim_visitante:.3f})")
         
         # Retornar apenas se ambas foram reconhecidas
         if carta_casa and carta_visitante:
             print(f"🎉 AMBAS RECONHECIDAS: {carta_casa} x {carta_visitante}")
             return carta_casa, carta_visitante
         else:
-            print("⚠️ Falha no reconhecimento por templates")
+            print("⚠️ Falha no reconhecimento (nenhuma etapa da cascata aceitou)")
             
             # Se não temos templates suficientes, sugerir criação
             if len(template_recognizer.templates) < 10:  # Menos de 10 tipos de cartas
@@ -450,16 +509,109 @@ def detectar_cartas_com_templates(img):
         print(f"❌ Erro na detecção por templates: {e}")
         return None, None
 
+def obter_cascata_reconhecedores():
+    """Monta a cascata no primeiro uso: templates (ou canto) → LBPH → OCR"""
+    global cascata_reconhecedores
+    if cascata_reconhecedores is None:
+        if MODO_RECONHECIMENTO == 'canto':
+            # O reconhecedor do canto já aplica o próprio limiar (retorna None abaixo dele)
+            etapas = [EtapaCascata('canto', reconhecer_pelo_canto, 0.0)]
+        else:
+            etapas = [EtapaCascata('templates', None, template_recognizer.threshold_similaridade,
+                                   funcao_lote=template_recognizer.reconhecer_lote)]
+        if CASCATA_RECONHECIMENTO:
+            etapas.append(EtapaCascata('lbph', reconhecer_com_lbph, 0.5))
+            # Mesmo critério do OCR de bloco: aceita a partir de 60% de confiança
+            etapas.append(EtapaCascata('ocr', ler_valor_no_bloco, 0.6))
+        cascata_reconhecedores = CascataReconhecedores(etapas)
+        print(f"🪜 Cascata de reconhecimento: {' → '.join(etapa.nome for etapa in etapas)}")
+    return cascata_reconhecedores
+
+def reconhecer_blocos_em_cascata(blocos, chaves):
+    """Reconhecedor em lote para o DetectorMudanca: chaves 'cascata_CASA'/'cascata_VISITANTE'"""
+    lados = [chave.split('_', 1)[1] for chave in chaves]
+    resultados = obter_cascata_reconhecedores().reconhecer_lote(blocos, lados)
+    for lado, (valor, confianca, etapa) in zip(lados, resultados):
+        if etapa:
+            print(f"   🪜 {lado}: {valor} pela etapa {etapa} (confiança {confianca:.2f})")
+    return [(valor, confianca) for valor, confianca, _ in resultados]
+
+def carregar_modelo_lbph():
+    """Carrega o modelo LBPH de treinar_modelo_cartas.py (de valores, se existir); None se indisponível"""
+    global modelo_lbph
+    if modelo_lbph is None:
+        try:
+            por_indice = os.path.exists('classifier_cartas/classificadorValoresLBPH.yml')
+            arquivo_modelo = 'classifier_cartas/classificadorValoresLBPH.yml' if por_indice else 'classifier_cartas/classificadorCartasLBPH.yml'
+            arquivo_mapa = 'classifier_cartas/mapeamento_valores.json' if por_indice else 'classifier_cartas/mapeamento_nomes.json'
+            
+            reconhecedor = cv2.face.LBPHFaceRecognizer_create()  # Requer opencv-contrib-python
+            reconhecedor.read(arquivo_modelo)
+            with open(arquivo_mapa, 'r') as f:
+                mapa = json.load(f)
+            modelo_lbph = (reconhecedor, mapa, por_indice)
+            print(f"🧬 Modelo LBPH carregado: {arquivo_modelo}")
+        except Exception as e:
+            print(f"⚠️ Modelo LBPH indisponível ({e}), a cascata segue sem essa etapa")
+            modelo_lbph = False
+    return modelo_lbph or None
+
+def reconhecer_com_lbph(bloco_img, lado):
+    """Reconhece o valor com o LBPH: (valor, confiança 0-1; 0.5 = LIMIAR_DISTANCIA_LBPH)"""
+    modelo = carregar_modelo_lbph()
+    if modelo is None:
+        return None, 0.0
+    reconhecedor, mapa, por_indice = modelo
+    
+    conversao = cv2.COLOR_BGRA2GRAY if bloco_img.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    if por_indice:
+        patch_valor, _ = recortar_regioes(bloco_img)
+        amostra = cv2.resize(cv2.cvtColor(patch_valor, conversao), TAMANHO_VALOR_LBPH)
+    else:
+        amostra = cv2.resize(cv2.cvtColor(bloco_img, conversao), TAMANHO_CARTA_LBPH)
+    
+    id_predito, distancia = reconhecedor.predict(amostra)
+    nome = mapa.get(str(id_predito))
+    valor = nome if por_indice else valor_do_nome(nome)
+    return valor, max(0.0, 1.0 - distancia / (2 * LIMIAR_DISTANCIA_LBPH))
+
+def reconhecer_pelo_canto(bloco_img, lado):
+    """Reconhece o valor da carta pelo índice do canto: (valor, correlação) ou (None, correlação)"""
+    global reconhecedor_canto
+    if reconhecedor_canto is None:
+        reconhecedor_canto = ReconhecedorIndiceCanto()
+    nome_carta, score = cache_reconhecimento.reconhecer(
+        bloco_img, f"canto_{lado}", lambda img: reconhecedor_canto.reconhecer(img, lado))
+    return valor_do_nome(nome_carta), score
+
 def detectar_cartas_football_studio(img, coordenadas_calibradas=None):
     """Wrapper principal - usa detecção por templates"""
     return detectar_cartas_com_templates(img)
 
 def detectar_carta_no_bloco_especifico(bloco_img, tipo):
     """Detecta carta especificamente no bloco extraído - MÁXIMA PRECISÃO"""
+    valor, _ = ler_valor_no_bloco(bloco_img, tipo)
+    if valor:
+        naipe = '♦' if tipo == "CASA" else '♠'
+        return CartaFootballStudio(naipe, valor)
+    return None
+
+def ler_valor_no_bloco(bloco_img, tipo):
+    """(valor, confiança 0-1) do OCR de bloco; só roda quando o bloco mudou e fora do cache"""
+    return detector_mudanca.reconhecer(
+        f"ocr_{tipo}", bloco_img,
+        lambda img: cache_reconhecimento.reconhecer(img, f"ocr_bloco_{tipo}", lambda roi: _ler_valor_no_bloco_ocr(roi, tipo)))
+
+def _ocr_com_cache(img, metodo, funcao_ocr, *args):
+    """Executa funcao_ocr(img, *args) atrás do cache LRU (o OCR só retorna o valor, sem confiança)"""
+    return cache_reconhecimento.reconhecer(img, metodo, lambda roi: (funcao_ocr(roi, *args), None))[0]
+
+def _ler_valor_no_bloco_ocr(bloco_img, tipo):
+    """OCR completo do bloco (7 preprocessamentos x 6 configs): (valor, confiança 0-1) ou (None, melhor confiança)"""
     try:
         if bloco_img is None or bloco_img.size == 0:
             print(f"❌ Bloco {tipo} vazio")
-            return None
+            return None, 0.0
         
         print(f"� Analisando bloco {tipo} - dimensões: {bloco_img.shape}")
         
@@ -517,29 +669,50 @@ def detectar_carta_no_bloco_especifico(bloco_img, tipo):
             '--psm 10',  # Caracter único sem dicionário e filtro
         ]
         
-        # Tentar todas as combinações
+        # Combinações ordenadas pela taxa de acerto/custo observada; os resultados chegam conforme terminam
+        combinacoes = {f"{nome_prep}+config{i}": (nome_prep, i, processed, config)
+                       for nome_prep, processed in preprocessamentos
+                       for i, config in enumerate(configs_ocr)}
+        tentativas = [(metodo, combinacoes[metodo][2], combinacoes[metodo][3])
+                      for metodo in cascata_ocr_bloco.ordenar(combinacoes)]
+        
         resultados = []
-        for nome_prep, processed in preprocessamentos:
-            for i, config in enumerate(configs_ocr):
-                try:
-                    texto = pytesseract.image_to_string(processed, config=config)
-                    texto_limpo = limpar_texto_bloco_preciso(texto)
-                    
-                    if texto_limpo:
-                        valor = validar_valor_carta_preciso(texto_limpo)
-                        if valor:
-                            confianca = calcular_confianca_bloco_preciso(texto, texto_limpo, valor, nome_prep)
-                            resultados.append({
-                                'valor': valor,
-                                'confianca': confianca,
-                                'metodo': f"{nome_prep}+config{i}",
-                                'texto_original': texto.strip(),
-                                'texto_limpo': texto_limpo,
-                                'preprocessamento': nome_prep
-                            })
-                            print(f"   🔤 {nome_prep}[{i}]: '{texto.strip()}' -> '{texto_limpo}' -> '{valor}' (conf: {confianca}%)")
-                except Exception as e:
-                    continue
+        executadas = []  # (metodo, valor lido ou None, duração) para as estatísticas da cascata
+        votos = {}
+        melhor_confianca = {}
+        
+        def leitura_suficiente(chave, texto):
+            # Consenso ou uma leitura (com bônus de consenso) acima da barra de parada
+            return any(votos[v] >= CONSENSO_OCR or
+                       melhor_confianca[v] + (votos[v] * 20 if votos[v] > 1 else 0) >= CONFIANCA_PARADA_OCR
+                       for v in votos)
+        
+        for metodo, texto, duracao in motor_ocr.executar(tentativas, parar=leitura_suficiente):
+            nome_prep, i = combinacoes[metodo][:2]
+            texto_limpo = limpar_texto_bloco_preciso(texto)
+            valor = validar_valor_carta_preciso(texto_limpo) if texto_limpo else None
+            executadas.append((metodo, valor, duracao))
+            
+            if texto_limpo:
+                if valor:
+                    confianca = calcular_confianca_bloco_preciso(texto, texto_limpo, valor, nome_prep)
+                    resultados.append({
+                        'valor': valor,
+                        'confianca': confianca,
+                        'metodo': f"{nome_prep}+config{i}",
+                        'texto_original': texto.strip(),
+                        'texto_limpo': texto_limpo,
+                        'preprocessamento': nome_prep
+                    })
+                    votos[valor] = votos.get(valor, 0) + 1
+                    melhor_confianca[valor] = max(melhor_confianca.get(valor, 0), confianca)
+                    print(f"   🔤 {nome_prep}[{i}]: '{texto.strip()}' -> '{texto_limpo}' -> '{valor}' (conf: {confianca}%)")
+        
+        if len(executadas) < len(tentativas):
+            print(f"   ⚡ Decidido após {len(executadas)}/{len(tentativas)} tentativas de OCR")
+        
+        valor_aceito = None
+        confianca_final = 0.0
         
         # Analisar resultados e escolher o melhor
         if resultados:
@@ -563,23 +736,29 @@ def detectar_carta_no_bloco_especifico(bloco_img, tipo):
             melhor = resultados[0]
             
             print(f"   ✅ MELHOR para {tipo}: {melhor['valor']} (confiança: {melhor['confianca']}%)")
+            confianca_final = min(melhor['confianca'], 100) / 100.0  # O bônus de consenso pode passar de 100%
             print(f"      Método: {melhor['metodo']}")
             print(f"      Consenso: {contador_valores[melhor['valor']]}/{len(resultados)} métodos")
             
             # Aceitar se confiança for suficiente
             if melhor['confianca'] >= 60:  # Threshold ajustado para blocos específicos
-                naipe = '♦' if tipo == "CASA" else '♠'
-                carta = CartaFootballStudio(naipe, melhor['valor'])
-                return carta
+                valor_aceito = melhor['valor']
             else:
                 print(f"   ⚠️ Confiança baixa ({melhor['confianca']}%), rejeitando")
         
+        # Acerto = a combinação leu o valor que acabou aceito
+        for metodo, valor, duracao in executadas:
+            cascata_ocr_bloco.registrar(metodo, valor_aceito is not None and valor == valor_aceito, duracao)
+        
+        if valor_aceito:
+            return valor_aceito, confianca_final
+        
         print(f"   ❌ Nenhuma carta detectada no bloco {tipo}")
-        return None
+        return None, confianca_final
         
     except Exception as e:
         print(f"❌ Erro no bloco {tipo}: {e}")
-        return None
+        return None, 0.0
 
 def limpar_texto_bloco_preciso(texto):
     """Limpeza específica para texto de blocos de cartas"""
@@ -873,7 +1052,7 @@ def calcular_confianca_deteccao(texto_bruto, texto_limpo, valor_carta):
             
             for j, config in enumerate(configs_ocr):
                 try:
-                    texto = pytesseract.image_to_string(processed, config=config)
+                    texto = ler_texto(processed, config=config)
                     texto_limpo = limpar_texto_ocr_rigoroso(texto)
                     
                     if texto_limpo:
@@ -1084,7 +1263,7 @@ def tentar_ocr_robusto(carta_roi, tipo_carta):
         for processed in processamentos:
             for config in configs:
                 try:
-                    texto = pytesseract.image_to_string(processed, config=config)
+                    texto = ler_texto(processed, config=config)
                     texto = limpar_texto_ocr(texto)
                     
                     if texto:
@@ -1227,7 +1406,7 @@ def extrair_carta_melhorada(carta_img, tipo_carta):
         for thresh_img in thresholds:
             for config in configs:
                 try:
-                    texto = pytesseract.image_to_string(thresh_img, config=config)
+                    texto = ler_texto(thresh_img, config=config)
                     texto = texto.strip().upper().replace(' ', '').replace('\n', '')
                     
                     if texto:
@@ -1295,7 +1474,7 @@ def processar_carta_ocr(carta_img):
         _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
         # Aplicar OCR
-        texto = pytesseract.image_to_string(thresh, config='--psm 8')
+        texto = ler_texto(thresh, config='--psm 8')
         texto = texto.strip().upper()
         
         # Mapear texto para carta
@@ -1334,30 +1513,10 @@ def processar_carta_ocr(carta_img):
         return None
 
 def detectar_naipe_por_cor(carta_img):
-    """Detecta o naipe baseado na cor predominante"""
+    """Detecta o naipe baseado na cor predominante (máscaras HSV em classificador_fatorado)"""
     try:
-        # Converter para HSV
-        hsv = cv2.cvtColor(carta_img, cv2.COLOR_BGR2HSV)
-        
-        # Contar pixels vermelhos vs pretos
-        # Vermelho para ♥ ♦
-        lower_red1 = np.array([0, 50, 50])
-        upper_red1 = np.array([10, 255, 255])
-        lower_red2 = np.array([170, 50, 50])
-        upper_red2 = np.array([180, 255, 255])
-        
-        mask_red1 = cv2.inRange(hsv, lower_red1, upper_red1)
-        mask_red2 = cv2.inRange(hsv, lower_red2, upper_red2)
-        red_pixels = cv2.countNonZero(mask_red1 + mask_red2)
-        
-        # Preto para ♠ ♣
-        lower_black = np.array([0, 0, 0])
-        upper_black = np.array([180, 255, 50])
-        mask_black = cv2.inRange(hsv, lower_black, upper_black)
-        black_pixels = cv2.countNonZero(mask_black)
-        
         # Retornar naipe baseado na cor predominante
-        if red_pixels > black_pixels:
+        if cor_predominante(carta_img) == 'vermelho':
             return '♦'  # Vermelho fixo (sem aleatoriedade)
         else:
             return '♠'  # Preto fixo (sem aleatoriedade)
@@ -1366,7 +1525,11 @@ def detectar_naipe_por_cor(carta_img):
         return '♦'  # Padrão fixo (sem aleatoriedade)
 
 def detectar_carta_tempo_real(img_regiao, lado):
-    """Detecção rápida de carta para tempo real"""
+    """Detecção rápida de carta para tempo real (regiões repetidas saem do cache)"""
+    return _ocr_com_cache(img_regiao, f"ocr_tempo_real_{lado}", _detectar_carta_tempo_real_ocr, lado)
+
+def _detectar_carta_tempo_real_ocr(img_regiao, lado):
+    """OCR rápido da região (thresholds na ordem da cascata adaptativa)"""
     try:
         if img_regiao is None or img_regiao.size == 0:
             return None
@@ -1383,21 +1546,24 @@ def detectar_carta_tempo_real(img_regiao, lado):
             new_h, new_w = int(h * scale), int(w * scale)
             gray = cv2.resize(gray, (new_w, new_h), interpolation=cv2.INTER_CUBIC)
         
-        # Múltiplas tentativas RÁPIDAS
-        metodos = [
-            cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
-            cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2),
-            cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)[1],
-            cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY_INV)[1]
-        ]
+        # Múltiplas tentativas RÁPIDAS (geradas sob demanda, na ordem de acerto/custo observada)
+        metodos = {
+            'OTSU': lambda: cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
+            'ADAPTIVE_GAUSS': lambda: cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2),
+            'BINARIO_127': lambda: cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)[1],
+            'BINARIO_127_INV': lambda: cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY_INV)[1]
+        }
         
-        for processed in metodos:
+        for nome_metodo in cascata_ocr_tempo_real.ordenar(metodos):
             try:
                 # OCR rápido
-                texto = pytesseract.image_to_string(processed, config='--psm 8 -c tessedit_char_whitelist=A23456789JQK10')
+                inicio = time.perf_counter()
+                texto = ler_texto(metodos[nome_metodo](), config='--psm 8 -c tessedit_char_whitelist=A23456789JQK10')
                 texto_limpo = limpar_texto_rapido(texto)
+                aceito = texto_limpo in cartas_validas
+                cascata_ocr_tempo_real.registrar(nome_metodo, aceito, time.perf_counter() - inicio)
                 
-                if texto_limpo in cartas_validas:
+                if aceito:
                     print(f"   ✅ {lado}: {texto_limpo}")
                     return texto_limpo
             except:
@@ -1453,20 +1619,30 @@ def determinar_vencedor_football_studio(carta_casa, carta_visitante):
     else:
         return "EMPATE"
 
-def salvar_historico():
-    """Salva histórico rapidamente"""
+def salvar_historico(entrada):
+    """Enfileira a rodada para o diário: a gravação (em lote) acontece na thread de persistência"""
     try:
-        with open("historico_cartas.json", "w", encoding='utf-8') as f:
-            json.dump(historico_cartas, f, indent=2, ensure_ascii=False)
+        persistidor_historico.enfileirar(entrada)
     except Exception as e:
         print(f"❌ Erro ao salvar histórico: {e}")
 
-def monitorar_integrado_real():
-    """Thread de monitoramento TEMPO REAL com sistema de templates"""
+def monitorar_integrado_real(fonte=None):
+    """Thread de monitoramento TEMPO REAL com sistema de templates.
+    
+    Aceita qualquer FrameSource; sem fonte, captura a tela ao vivo.
+    """
     global monitoramento_ativo, ultima_atividade, historico_cartas, template_recognizer
     
+    # Tela ao vivo por padrão, capturando apenas a ROI dos blocos
+    if fonte is None:
+        fonte = TelaFrameSource()
+    
     print("🚀 Iniciando monitoramento TEMPO REAL COM TEMPLATES...")
-    print("⚡ Captura a cada 2 segundos")
+    print(f"🎞️ Fonte: {fonte.descricao()}")
+    if fonte.tempo_real:
+        print("⚡ Amostragem por fase da rodada (lenta com mesa vazia, rápida na revelação)")
+    else:
+        print("⏩ Replay sem espera entre frames")
     print("🎯 Detecção por templates (reconhecimento facial de cartas)")
     print("📊 Histórico automático")
     
@@ -1477,26 +1653,33 @@ def monitorar_integrado_real():
     
     contador_tentativas = 0
     contador_sucessos = 0
-    ultima_deteccao_str = None
+    maquina = MaquinaEstadosRodada()
+    detector_mudanca.invalidar()  # Nova sessão: nada de resultados de uma fonte anterior
     
     while monitoramento_ativo:
         try:
             contador_tentativas += 1
             print(f"\n🔍 [{contador_tentativas}] Capturando com templates...")
             
-            # CAPTURA DA TELA
-            screenshot = pyautogui.screenshot()
-            img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            # CAPTURA DOS BLOCOS
+            bloco_casa, bloco_visitante = fonte.ler_blocos()
+            if fonte.esgotada:
+                print("🏁 Fonte de frames esgotada")
+                break
             
             # DETECTAR CARTAS COM TEMPLATES
-            carta_casa, carta_visitante = detectar_cartas_com_templates(img)
+            carta_casa, carta_visitante = detectar_cartas_nos_blocos(bloco_casa, bloco_visitante)
+            
+            # Avançar a fase da rodada (registra uma vez por revelação, mesmo com cartas repetidas)
+            blocos_mudaram = detector_mudanca.houve_mudanca('cascata_CASA', 'cascata_VISITANTE')
+            rodada_confirmada = maquina.processar(carta_casa, carta_visitante, blocos_mudaram)
             
             if carta_casa and carta_visitante:
                 contador_sucessos += 1
                 deteccao_atual = f"{carta_casa}-{carta_visitante}"
                 
                 # Verificar se é nova rodada
-                if deteccao_atual != ultima_deteccao_str:
+                if rodada_confirmada:
                     # Determinar vencedor
                     vencedor = determinar_vencedor_football_studio(carta_casa, carta_visitante)
                     
@@ -1506,12 +1689,12 @@ def monitorar_integrado_real():
                         'casa': str(carta_casa),
                         'visitante': str(carta_visitante),
                         'vencedor': vencedor,
-                        'metodo': 'templates'
+                        'metodo': 'cascata'
                     }
                     
                     # Adicionar ao histórico
                     historico_cartas.append(nova_entrada)
-                    salvar_historico()
+                    salvar_historico(nova_entrada)
                     
                     print("🎉 NOVA RODADA DETECTADA COM TEMPLATES!")
                     print(f"   🏠 CASA: {carta_casa}")
@@ -1521,9 +1704,8 @@ def monitorar_integrado_real():
                     print(f"   📈 Taxa: {contador_sucessos}/{contador_tentativas} ({(contador_sucessos/contador_tentativas)*100:.1f}%)")
                     
                     ultima_atividade = f"Rodada detectada: {carta_casa} x {carta_visitante} - {vencedor}"
-                    ultima_deteccao_str = deteccao_atual
                 else:
-                    print(f"🔄 Mesma rodada: {deteccao_atual}")
+                    print(f"🔄 Mesma rodada: {deteccao_atual} ({maquina.fase})")
             else:
                 print(f"❌ Templates não detectaram: CASA={carta_casa}, VISITANTE={carta_visitante}")
                 if len(template_recognizer.templates) < 10:
@@ -1534,16 +1716,42 @@ def monitorar_integrado_real():
                 taxa = (contador_sucessos/contador_tentativas)*100
                 templates_count = len(template_recognizer.templates)
                 print(f"\n📊 ESTATÍSTICAS: {contador_sucessos}/{contador_tentativas} ({taxa:.1f}%) - Templates: {templates_count}")
+                print(f"♻️ Reconhecimentos evitados: {detector_mudanca.taxa_reaproveitamento():.1f}%")
+                for linha in obter_cascata_reconhecedores().resumo():
+                    print(f"🪜 {linha}")
+                print(f"💾 Persistência: {persistidor_historico.resumo()}")
             
-            # Aguardar 2 segundos para próxima captura (templates são mais lentos)
-            time.sleep(2)
+            # Aguardar conforme a fase: devagar com a mesa vazia, rápido durante a revelação
+            if fonte.tempo_real:
+                time.sleep(maquina.proximo_intervalo())
             
         except Exception as e:
             print(f"❌ Erro no monitoramento: {e}")
-            time.sleep(3)
+            if fonte.tempo_real:
+                time.sleep(3)
     
+    fonte.fechar()
+    persistidor_historico.descarregar()  # Rodadas ainda na fila vão para o disco
     print("⏹️ Monitoramento tempo real parado")
 
+def processar_gravacao(origem):
+    """Roda o monitoramento sobre uma gravação (pasta de frames ou vídeo) sem servidor web"""
+    global monitoramento_ativo
+    
+    fonte = criar_fonte(origem)
+    inicio = time.time()
+    
+    monitoramento_ativo = True
+    try:
+        monitorar_integrado_real(fonte)
+    finally:
+        monitoramento_ativo = False
+    
+    duracao = time.time() - inicio
+    fps = fonte.frames_lidos / duracao if duracao > 0 else 0
+    print(f"\n📼 Replay concluído: {fonte.frames_lidos} frames em {duracao:.1f}s ({fps:.1f} frames/s)")
+    print(f"📊 Rodadas no histórico: {len(historico_cartas)}")
+
 # ============================================================================
 # ROTAS PRINCIPAIS
 # ============================================================================
@@ -1745,7 +1953,7 @@ def status_monitor():
         
         # Últimas 10 rodadas
         ultimas_rodadas = []
-        for rodada in catalogador.historico[-10:]:
+        for rodada in catalogador.ultimas_rodadas(10):
             # Mapear vencedor para o formato esperado pelo JavaScript
             resultado = 'empate'
             vencedor_texto = 'EMPATE'
@@ -1780,6 +1988,8 @@ def status_monitor():
                 'empates': stats['empates']
             },
             'ultimas_rodadas': ultimas_rodadas,
+            'cascata': obter_cascata_reconhecedores().estatisticas(),  # Latência e escalonamento por etapa
+            'persistencia': persistidor_historico.metricas(),  # Fila e latência da gravação do histórico
             'timestamp': datetime.now().strftime("%H:%M:%S")
         })
     except Exception as e:
@@ -1790,14 +2000,12 @@ def status_monitor():
 
 @app.route('/limpar_dados', methods=['POST'])
 def limpar_dados():
-    """Limpa o histórico na memória e no arquivo JSON."""
+    """Limpa o histórico de rodadas do banco."""
     global catalogador, ultima_atividade
     
     try:
-        # Limpa a lista na memória
-        catalogador.historico = []
-        # Salva a lista vazia no arquivo, sobrescrevendo o conteúdo antigo
-        catalogador.salvar_dados()
+        # Apaga as rodadas do historico_cartas.db (o JSON antigo não é importado de novo)
+        catalogador.limpar()
         
         ultima_atividade = "Dados limpos"
         
@@ -1816,6 +2024,13 @@ def limpar_dados():
 # ============================================================================
 
 if __name__ == '__main__':
+    inicializar_sistema()
+
+    # Replay offline: python app.py --replay <pasta_de_frames|video>
+    if len(sys.argv) > 2 and sys.argv[1] == '--replay':
+        processar_gravacao(sys.argv[2])
+        sys.exit(0)
+    
     print("\n" + "="*70)
     print("🎮 FOOTBALL STUDIO - SISTEMA AVANÇADO E EFICAZ")
     print("="*70)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗄️ ARMAZENAMENTO DE RODADAS EM SQLITE - FOOTBALL STUDIO
+Backend do CatalogadorCartas: uma linha por rodada em historico_cartas.db.
+
+- Modo WAL: o monitor grava enquanto o painel consulta, sem bloquear a leitura
+- Índices em timestamp e vencedor: consultas por intervalo e contagens sem varrer a tabela
+- Inserções preparadas, uma transação por rodada (ou por lote, na importação)
+- O JSON (mesmo formato de antes) é só formato de importação/exportação
+"""
+
+import json
+import sqlite3
+import threading
+
+COLUNAS = ('timestamp', 'naipe_vermelha', 'valor_vermelha', 'naipe_azul', 'valor_azul', 'vencedor')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS rodadas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    naipe_vermelha TEXT NOT NULL,
+    valor_vermelha TEXT NOT NULL,
+    naipe_azul TEXT NOT NULL,
+    valor_azul TEXT NOT NULL,
+    vencedor TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rodadas_timestamp ON rodadas (timestamp);
+CREATE INDEX IF NOT EXISTS idx_rodadas_vencedor ON rodadas (vencedor);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+SQL_INSERIR = f"INSERT INTO rodadas ({', '.join(COLUNAS)}) VALUES ({', '.join('?' * len(COLUNAS))})"
+SQL_SELECIONAR = f"SELECT {', '.join(COLUNAS)} FROM rodadas"
+
+def registro_para_linha(registro):
+    """Dict no formato do JSON ({'carta_vermelha': {...}, 'carta_azul': {...}, ...}) -> tupla de COLUNAS"""
+    return (registro['timestamp'],
+            registro['carta_vermelha']['naipe'], registro['carta_vermelha']['valor'],
+            registro['carta_azul']['naipe'], registro['carta_azul']['valor'],
+            registro['vencedor'])
+
+def linha_para_registro(linha):
+    timestamp, naipe_vermelha, valor_vermelha, naipe_azul, valor_azul, vencedor = linha
+    return {
+        'carta_vermelha': {'naipe': naipe_vermelha, 'valor': valor_vermelha},
+        'carta_azul': {'naipe': naipe_azul, 'valor': valor_azul},
+        'timestamp': timestamp,
+        'vencedor': vencedor
+    }
+
+class ArmazenamentoRodadas:
+    """Tabela de rodadas em SQLite (WAL), compartilhada entre as threads do app"""
+
+    def __init__(self, caminho="historico_cartas.db"):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")  # Em WAL: sem fsync por commit, banco sempre consistente
+        self.conexao.executescript(ESQUEMA)
+        self.conexao.commit()
+
+    def inserir(self, registros):
+        """Insere registros (dicts do formato JSON) em uma única transação"""
+        linhas = [registro_para_linha(registro) for registro in registros]
+        if not linhas:
+            return 0
+        with self._lock, self.conexao:
+            self.conexao.executemany(SQL_INSERIR, linhas)
+        return len(linhas)
+
+    def total(self):
+        with self._lock:
+            return self.conexao.execute("SELECT COUNT(*) FROM rodadas").fetchone()[0]
+
+    def ultimas(self, quantidade):
+        """As 'quantidade' rodadas mais recentes, da mais antiga para a mais nova"""
+        with self._lock:
+            linhas = self.conexao.execute(f"{SQL_SELECIONAR} ORDER BY id DESC LIMIT ?", (quantidade,)).fetchall()
+        return [linha_para_registro(linha) for linha in reversed(linhas)]
+
+    def linhas(self, bloco=10000):
+        """Todas as rodadas em ordem de inserção, em blocos de tuplas na ordem de COLUNAS"""
+        ultimo_id = 0
+        while True:
+            with self._lock:
+                linhas = self.conexao.execute(
+                    f"SELECT id, {', '.join(COLUNAS)} FROM rodadas WHERE id > ? ORDER BY id LIMIT ?",
+                    (ultimo_id, bloco)).fetchall()
+            if not linhas:
+                return
+            ultimo_id = linhas[-1][0]
+            yield [linha[1:] for linha in linhas]
+
+    def intervalo(self, inicio=None, fim=None):
+        """Rodadas com inicio <= timestamp < fim (timestamps ISO; None = sem limite), em ordem"""
+        condicoes, parametros = [], []
+        if inicio is not None:
+            condicoes.append("timestamp >= ?")
+            parametros.append(inicio)
+        if fim is not None:
+            condicoes.append("timestamp < ?")
+            parametros.append(fim)
+        filtro = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        with self._lock:
+            linhas = self.conexao.execute(f"{SQL_SELECIONAR}{filtro} ORDER BY timestamp, id", parametros).fetchall()
+        return [linha_para_registro(linha) for linha in linhas]
+
+    def contagem_por_vencedor(self):
+        """{vencedor: rodadas} (percorre só o índice de vencedor)"""
+        with self._lock:
+            return dict(self.conexao.execute("SELECT vencedor, COUNT(*) FROM rodadas GROUP BY vencedor").fetchall())
+
+    def frequencia_cartas(self):
+        """{(valor, naipe): vezes} somando as duas cartas de cada rodada"""
+        with self._lock:
+            linhas = self.conexao.execute("""
+                SELECT valor, naipe, COUNT(*) FROM (
+                    SELECT valor_vermelha AS valor, naipe_vermelha AS naipe FROM rodadas
+                    UNION ALL
+                    SELECT valor_azul, naipe_azul FROM rodadas
+                ) GROUP BY valor, naipe""").fetchall()
+        return {(valor, naipe): vezes for valor, naipe, vezes in linhas}
+
+    def sequencia_atual(self, bloco=64):
+        """(vencedor, tamanho) da sequência de vitórias iguais que termina na última rodada"""
+        ultimo, tamanho, deslocamento = None, 0, 0
+        while True:
+            with self._lock:
+                vencedores = [linha[0] for linha in self.conexao.execute(
+                    "SELECT vencedor FROM rodadas ORDER BY id DESC LIMIT ? OFFSET ?", (bloco, deslocamento))]
+            for vencedor in vencedores:
+                if ultimo is None:
+                    ultimo = vencedor
+                elif vencedor != ultimo:
+                    return ultimo, tamanho
+                tamanho += 1
+            if len(vencedores) < bloco:
+                return ultimo, tamanho
+            deslocamento += bloco
+
+    def obter_meta(self, chave, padrao=None):
+        with self._lock:
+            linha = self.conexao.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else padrao
+
+    def definir_meta(self, chave, valor):
+        with self._lock, self.conexao:
+            self.conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+    def limpar(self):
+        with self._lock, self.conexao:
+            self.conexao.execute("DELETE FROM rodadas")
+
+    def importar(self, registros):
+        """Insere os registros no formato do CatalogadorCartas (os demais são ignorados); retorna quantos entraram"""
+        validos = [registro for registro in registros
+                   if isinstance(registro, dict) and {'carta_vermelha', 'carta_azul', 'timestamp', 'vencedor'} <= set(registro)]
+        if len(validos) < len(registros):
+            print(f"⚠️ {len(registros) - len(validos)} registros em outro formato foram ignorados na importação")
+        return self.inserir(validos)
+
+    def importar_json(self, caminho):
+        """Importa um histórico JSON (lista no formato do CatalogadorCartas)"""
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return self.importar(json.load(f))
+
+    def exportar_json(self, caminho):
+        """Exporta todas as rodadas para JSON (o formato antigo de historico_cartas.json)"""
+        registros = self.intervalo()
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(registros, f, ensure_ascii=False, indent=2)
+        return len(registros)
+
+    def fechar(self):
+        with self._lock:
+            self.conexao.close()
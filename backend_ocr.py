@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔤 BACKENDS DE OCR - FOOTBALL STUDIO
+Interface única para as leituras de OCR dos detectores.
+
+- BackendTesserocr: API do Tesseract mantida viva no processo (pip install tesserocr),
+  inicializada uma vez por processo/thread; PSM e whitelist são aplicados a cada chamada
+- BackendPytesseract: um processo tesseract por chamada (comportamento antigo, fallback)
+
+O backend é escolhido automaticamente (tesserocr se disponível) ou pela variável
+de ambiente OCR_BACKEND=tesserocr|pytesseract.
+"""
+
+import os
+import re
+import threading
+
+import cv2
+
+TESSERACT_CMD_WINDOWS = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+def interpretar_config(config):
+    """Extrai (psm, whitelist) de uma config no formato do tesseract ('--psm 8 -c tessedit_char_whitelist=...')"""
+    psm = re.search(r'--psm\s+(\d+)', config or '')
+    whitelist = re.search(r'tessedit_char_whitelist=(\S+)', config or '')
+    return (int(psm.group(1)) if psm else 3), (whitelist.group(1) if whitelist else '')
+
+class BackendOCR:
+    """Interface dos backends de OCR"""
+
+    nome = None
+
+    def ler_texto(self, imagem, config=''):
+        """Retorna o texto lido na imagem (cinza, BGR ou BGRA) com a config do tesseract"""
+        raise NotImplementedError
+
+class BackendPytesseract(BackendOCR):
+    """Um processo tesseract por chamada (recarrega os dados de idioma a cada leitura)"""
+
+    nome = 'pytesseract'
+
+    def __init__(self):
+        import pytesseract
+        if os.name == 'nt' and os.path.exists(TESSERACT_CMD_WINDOWS):
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD_WINDOWS
+        self._pytesseract = pytesseract
+
+    def ler_texto(self, imagem, config=''):
+        return self._pytesseract.image_to_string(imagem, config=config)
+
+class BackendTesserocr(BackendOCR):
+    """API do Tesseract persistente: sem criação de processo nem recarga de idioma por leitura"""
+
+    nome = 'tesserocr'
+
+    def __init__(self, idioma='eng'):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.idioma = idioma
+        self._local = threading.local()  # Uma API por thread (a API não é thread-safe)
+        self._obter_api()  # Falha cedo se os dados de idioma não forem encontrados
+
+    def _obter_api(self):
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=self.idioma)
+            self._local.api = api
+        return api
+
+    def ler_texto(self, imagem, config=''):
+        psm, whitelist = interpretar_config(config)
+        api = self._obter_api()
+        api.SetPageSegMode(psm)
+        api.SetVariable('tessedit_char_whitelist', whitelist)
+
+        if imagem.ndim == 3:
+            conversao = cv2.COLOR_BGRA2RGB if imagem.shape[2] == 4 else cv2.COLOR_BGR2RGB
+            imagem = cv2.cvtColor(imagem, conversao)
+        imagem = imagem if imagem.flags['C_CONTIGUOUS'] else imagem.copy()
+
+        altura, largura = imagem.shape[:2]
+        bytes_por_pixel = 1 if imagem.ndim == 2 else 3
+        api.SetImageBytes(imagem.tobytes(), largura, altura, bytes_por_pixel, largura * bytes_por_pixel)
+        return api.GetUTF8Text()
+
+BACKENDS = {
+    'tesserocr': BackendTesserocr,
+    'pytesseract': BackendPytesseract,
+}
+
+_backend = None
+
+def obter_backend(nome=None):
+    """Retorna o backend do processo (criado na primeira chamada)"""
+    global _backend
+    if _backend is not None and (nome is None or _backend.nome == nome):
+        return _backend
+
+    nome = nome or os.environ.get('OCR_BACKEND')
+    if nome:
+        _backend = BACKENDS[nome]()
+    else:
+        try:
+            _backend = BackendTesserocr()
+        except Exception as e:
+            print(f"⚠️ tesserocr indisponível ({e}), usando pytesseract")
+            _backend = BackendPytesseract()
+
+    print(f"🔤 Backend de OCR: {_backend.nome}")
+    return _backend
+
+def ler_texto(imagem, config=''):
+    """Lê o texto da imagem com o backend do processo (substitui pytesseract.image_to_string)"""
+    return obter_backend().ler_texto(imagem, config)
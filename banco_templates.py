@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗃️ BANCO DE TEMPLATES COMPILADO
+Compila os templates de características em uma matriz float32 contígua (N x D)
+com rótulos paralelos: reconhecer um bloco vira um produto matriz-vetor + argmax.
+
+Formato em disco (pasta do banco, sem pickle):
+    cabecalho.json            formato, versão das características, dimensão, total e geração
+    caracteristicas_gN.npy    matriz float32 (total x dimensão), carregada com mmap
+    rotulos_gN.npy            registros (valor, lado, timestamp) de cada linha
+
+Novos templates são anexados ao fim dos .npy (o cabeçalho do .npy tem folga para crescer
+no lugar) e o cabecalho.json é regravado atomicamente por último, servindo de ponto de
+confirmação. A compactação grava uma nova geração e troca o cabecalho.json.
+
+A busca passa por um índice plugável (indice_templates.py): exato para bancos pequenos,
+aproximado por partições para bancos com centenas de variações por carta.
+
+Buscas com lado ('CASA'/'VISITANTE') usam uma partição pré-calculada no carregamento:
+as linhas daquele lado e de 'GERAL', com um índice próprio. A partição só cresce com as
+anexações; variações desativadas ficam nela até a compactação e são zeradas na busca.
+"""
+
+import json
+import os
+import struct
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from indice_templates import criar_indice
+
+FORMATO_BANCO = 1
+VALORES_CARTAS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+LADOS = ['GERAL', 'CASA', 'VISITANTE']
+DTYPE_ROTULOS = np.dtype([('valor', 'u1'), ('lado', 'u1'), ('timestamp', '<i8')])
+FOLGA_CABECALHO_NPY = 21  # Dígitos reservados para o número de linhas crescer no lugar
+
+def _texto_cabecalho_npy(dtype, forma):
+    return "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(dtype), tuple(forma))
+
+def _escrever_cabecalho_npy(arquivo, dtype, forma, tamanho=None):
+    """Grava o cabeçalho .npy (versão 1.0); sem tamanho, reserva folga para crescer"""
+    texto = _texto_cabecalho_npy(dtype, forma)
+    if tamanho is None:
+        # magic (6) + versão (2) + campo de tamanho (2) + texto + folga, alinhado em 64 bytes
+        total = 10 + len(texto) + FOLGA_CABECALHO_NPY + 1
+        tamanho = -(-total // 64) * 64 - 10
+    if len(texto) + 1 > tamanho:
+        raise ValueError("Cabeçalho .npy sem espaço para crescer no lugar")
+
+    arquivo.seek(0)
+    arquivo.write(np.lib.format.magic(1, 0))
+    arquivo.write(struct.pack('<H', tamanho))
+    arquivo.write((texto.ljust(tamanho - 1) + '\n').encode('latin1'))
+
+def _gravar_npy(caminho, dados):
+    """Grava um .npy completo com folga no cabeçalho"""
+    dados = np.ascontiguousarray(dados)
+    with open(caminho, 'wb') as f:
+        _escrever_cabecalho_npy(f, dados.dtype, dados.shape)
+        f.write(dados.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+def _anexar_npy(caminho, linhas, total_confirmado):
+    """Anexa linhas depois das 'total_confirmado' primeiras de um .npy, sem regravar o arquivo.
+
+    O total confirmado é o do cabecalho.json, não a forma gravada no .npy: linhas de uma
+    anexação interrompida antes da confirmação são sobrescritas, e a forma é regravada a partir dele.
+    """
+    with open(caminho, 'r+b') as f:
+        if np.lib.format.read_magic(f) != (1, 0):
+            raise ValueError(f"Versão de .npy não suportada: {caminho}")
+        forma, _, dtype = np.lib.format.read_array_header_1_0(f)
+        if forma[0] < total_confirmado:
+            raise ValueError(f"{caminho} tem {forma[0]} linhas, menos que as {total_confirmado} confirmadas")
+        inicio_dados = f.tell()
+
+        linhas = np.ascontiguousarray(linhas, dtype=dtype)
+        bytes_por_linha = dtype.itemsize * int(np.prod(forma[1:], dtype=np.int64))
+        fim_dados = inicio_dados + total_confirmado * bytes_por_linha
+
+        # Descartar linhas não confirmadas (gravação interrompida) antes de anexar
+        f.seek(0, os.SEEK_END)
+        if f.tell() > fim_dados:
+            f.truncate(fim_dados)
+
+        f.seek(fim_dados)
+        f.write(linhas.tobytes())
+
+        nova_forma = (total_confirmado + linhas.shape[0],) + tuple(forma[1:])
+        _escrever_cabecalho_npy(f, dtype, nova_forma, inicio_dados - 10)
+        f.flush()
+        os.fsync(f.fileno())
+
+class _ParticaoLado:
+    """Linhas de um lado + 'GERAL' (posições no banco e vetores) com índice próprio; cresce por duplicação"""
+
+    def __init__(self, dimensao, indice, versao):
+        self.indice = indice
+        self.versao = versao
+        self.tamanho = 0
+        self._linhas = np.empty(0, dtype=np.int64)
+        self._matriz = np.empty((0, dimensao), dtype=np.float32)
+
+    @property
+    def linhas(self):
+        return self._linhas[:self.tamanho]
+
+    @property
+    def matriz(self):
+        return self._matriz[:self.tamanho]
+
+    def anexar(self, linhas, matriz):
+        necessario = self.tamanho + len(linhas)
+        if necessario > len(self._linhas):
+            capacidade = max(necessario, 2 * len(self._linhas), 64)
+            novas_linhas = np.empty(capacidade, dtype=np.int64)
+            novas_linhas[:self.tamanho] = self.linhas
+            nova_matriz = np.empty((capacidade, self._matriz.shape[1]), dtype=np.float32)
+            nova_matriz[:self.tamanho] = self.matriz
+            self._linhas, self._matriz = novas_linhas, nova_matriz
+        self._linhas[self.tamanho:necessario] = linhas
+        self._matriz[self.tamanho:necessario] = matriz
+        self.tamanho = necessario
+        # Mesma versão com mais linhas: o índice só indexa as novas
+        self.indice.atualizar(self.matriz, self.versao)
+
+class BancoTemplates:
+    """Matriz de características dos templates + rótulos (valor e lado) de cada linha"""
+
+    def __init__(self, pasta="templates_cartas_banco", versao_caracteristicas=None, maximo_por_chave=None,
+                 indice='auto'):
+        self.pasta = pasta
+        self.versao_caracteristicas = versao_caracteristicas
+        self.maximo_por_chave = maximo_por_chave  # Variações ativas por valor_lado (None = todas)
+        self.geracao = 0
+        # 'exato', 'particoes', 'auto' ou uma instância de índice de indice_templates
+        self.indice = criar_indice(indice) if isinstance(indice, str) else indice
+        # Tipo dos índices das partições por lado (instâncias passadas em 'indice' não são copiadas)
+        self.tipo_indice_lado = indice if isinstance(indice, str) else 'auto'
+        self.particoes_lado = {}  # lado -> _ParticaoLado
+        self._limpar_memoria()
+
+    def _limpar_memoria(self, dimensao=0):
+        self.dimensao = dimensao
+        self.matriz = np.empty((0, dimensao), dtype=np.float32)
+        self.rotulos = np.empty(0, dtype=DTYPE_ROTULOS)
+        self._ativos = np.empty(0, dtype=bool)  # Com folga no fim: anexar não copia o vetor
+        self._inativos = 0
+        self._variacoes_ativas = {}             # valor*len(LADOS)+lado -> linhas ativas, da mais antiga
+
+    def __len__(self):
+        return self.matriz.shape[0]
+
+    @property
+    def ativos(self):
+        return self._ativos[:len(self)]
+
+    def total_ativos(self):
+        return len(self) - self._inativos
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def _caminho(self, nome, geracao=None):
+        geracao = self.geracao if geracao is None else geracao
+        return os.path.join(self.pasta, f"{nome}_g{geracao}.npy")
+
+    def _caminho_cabecalho(self):
+        return os.path.join(self.pasta, "cabecalho.json")
+
+    def existe(self):
+        return os.path.exists(self._caminho_cabecalho())
+
+    def _gravar_cabecalho(self, total=None):
+        """Grava o cabecalho.json atomicamente (arquivo temporário + rename)"""
+        cabecalho = {
+            'formato': FORMATO_BANCO,
+            'versao_caracteristicas': self.versao_caracteristicas,
+            'dimensao': self.dimensao,
+            'total': len(self) if total is None else total,
+            'geracao': self.geracao
+        }
+        temporario = self._caminho_cabecalho() + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(cabecalho, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self._caminho_cabecalho())
+
+    def _ler_cabecalho(self):
+        with open(self._caminho_cabecalho(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def carregar(self):
+        """Carrega o banco com mmap (somente leitura). Retorna False se não existir ou for incompatível"""
+        if not self.existe():
+            return False
+
+        cabecalho = self._ler_cabecalho()
+
+        if cabecalho.get('formato') != FORMATO_BANCO:
+            print(f"❌ Formato de banco não suportado: {cabecalho.get('formato')}")
+            return False
+        if self.versao_caracteristicas and cabecalho.get('versao_caracteristicas') != self.versao_caracteristicas:
+            print(f"⚠️ Banco gerado por outro extrator ({cabecalho.get('versao_caracteristicas')}), "
+                  f"esperado {self.versao_caracteristicas}")
+            return False
+
+        self.versao_caracteristicas = cabecalho.get('versao_caracteristicas')
+        self.geracao = cabecalho['geracao']
+        total = cabecalho['total']
+        self._limpar_memoria(cabecalho['dimensao'])
+
+        if total > 0:
+            # O cabecalho.json é a referência: linhas além de 'total' são de uma gravação interrompida
+            self._mapear(total)
+
+        self._recalcular_ativos()
+        # Mesma geração com mais linhas: o índice só indexa as linhas novas
+        self._atualizar_indices(self.geracao)
+        return True
+
+    def _mapear(self, total):
+        """Reabre os .npy em mmap limitados a 'total' linhas (só lê o cabeçalho dos arquivos)"""
+        self.matriz = np.load(self._caminho('caracteristicas'), mmap_mode='r')[:total]
+        self.rotulos = np.load(self._caminho('rotulos'), mmap_mode='r')[:total]
+
+    def salvar(self):
+        """Grava o conteúdo atual como uma nova geração (reescrita completa)"""
+        os.makedirs(self.pasta, exist_ok=True)
+        geracao_antiga = self.geracao if self.existe() else None
+        nova_geracao = self.geracao + 1 if geracao_antiga is not None else self.geracao
+
+        _gravar_npy(self._caminho('caracteristicas', nova_geracao), np.asarray(self.matriz, dtype=np.float32))
+        _gravar_npy(self._caminho('rotulos', nova_geracao), np.asarray(self.rotulos, dtype=DTYPE_ROTULOS))
+
+        self.geracao = nova_geracao
+        self._gravar_cabecalho()
+
+        if geracao_antiga is not None and geracao_antiga != nova_geracao:
+            for nome in ('caracteristicas', 'rotulos'):
+                try:
+                    os.remove(self._caminho(nome, geracao_antiga))
+                except OSError:
+                    pass  # Outro processo ainda pode estar com o arquivo mapeado
+
+        return self.carregar()
+
+    def anexar(self, vetor, valor, lado="GERAL"):
+        """Anexa um template ao banco em disco, sem regravar o restante"""
+        vetor = np.asarray(vetor, dtype=np.float32).reshape(1, -1)
+        norma = np.linalg.norm(vetor)
+        if norma > 0:
+            vetor = vetor / norma
+
+        rotulo = np.zeros(1, dtype=DTYPE_ROTULOS)
+        rotulo['valor'] = VALORES_CARTAS.index(valor)
+        rotulo['lado'] = LADOS.index(lado) if lado in LADOS else 0
+        rotulo['timestamp'] = int(time.time())
+
+        if not self.existe():
+            self.dimensao = vetor.shape[1]
+            self.matriz = vetor
+            self.rotulos = rotulo
+            return self.salvar()
+
+        cabecalho = self._ler_cabecalho()
+        if cabecalho['total'] != len(self) or cabecalho['geracao'] != self.geracao:
+            # Memória diferente do disco (banco não carregado ou compilado sem salvar)
+            if not self.carregar():
+                raise ValueError(f"Banco em {self.pasta} incompatível, anexação cancelada")
+
+        if vetor.shape[1] != self.dimensao:
+            raise ValueError(f"Dimensão {vetor.shape[1]} diferente da do banco ({self.dimensao})")
+
+        # Dados primeiro, cabecalho.json por último (ponto de confirmação)
+        total = len(self)
+        _anexar_npy(self._caminho('caracteristicas'), vetor, total)
+        _anexar_npy(self._caminho('rotulos'), rotulo, total)
+        self._gravar_cabecalho(total + 1)
+        self._anexar_em_memoria(total)
+
+        # Variações substituídas continuam no arquivo até a compactação
+        inativos = len(self) - self.total_ativos()
+        if inativos >= 32 and inativos > self.total_ativos():
+            self.compactar()
+        return True
+
+    def _anexar_em_memoria(self, linha):
+        """Atualiza a memória com a linha recém-confirmada, sem recarregar o banco nem refazer as partições"""
+        self._mapear(linha + 1)
+        self._ativar(linha)
+        self.indice.atualizar(self.matriz, self.geracao)
+
+        lado = LADOS[self.rotulos['lado'][linha]]
+        for nome, particao in self.particoes_lado.items():
+            if lado in (nome, 'GERAL'):
+                particao.anexar([linha], self.matriz[linha:linha + 1])
+
+    def compactar(self):
+        """Reescreve o banco mantendo apenas as linhas ativas"""
+        print(f"🧹 Compactando banco de templates: {len(self)} → {self.total_ativos()} linhas")
+        ativos = self.ativos
+        self.matriz = np.array(self.matriz[ativos], dtype=np.float32)
+        self.rotulos = np.array(self.rotulos[ativos], dtype=DTYPE_ROTULOS)
+        return self.salvar()
+
+    def limpar(self):
+        """Remove todos os templates do banco"""
+        self._limpar_memoria(self.dimensao)
+        self._atualizar_indices(None)
+        if self.existe():
+            self.salvar()
+
+    # ------------------------------------------------------------------
+    # Construção em memória e compatibilidade com o dicionário de templates
+    # ------------------------------------------------------------------
+
+    def compilar(self, templates, dimensao=None):
+        """Monta o banco (em memória) a partir do dicionário {chave: [template_info, ...]}.
+
+        Linhas com dimensão diferente da esperada (templates de outro extrator) ou com valor
+        fora de VALORES_CARTAS são ignoradas.
+        """
+        infos = [info for lista in templates.values() for info in lista]
+        if dimensao is None and infos:
+            # Dimensão mais comum entre os templates salvos
+            tamanhos = [len(info['caracteristicas']) for info in infos]
+            dimensao = max(set(tamanhos), key=tamanhos.count)
+
+        valor_invalido = [info for info in infos if info['valor'] not in VALORES_CARTAS]
+        if valor_invalido:
+            print(f"⚠️ {len(valor_invalido)} templates com valor inválido ignorados "
+                  f"({', '.join(sorted({str(info['valor']) for info in valor_invalido}))})")
+        infos = [info for info in infos if info['valor'] in VALORES_CARTAS]
+
+        validos = [info for info in infos if len(info['caracteristicas']) == dimensao]
+        if len(validos) < len(infos):
+            print(f"⚠️ {len(infos) - len(validos)} templates com dimensão diferente de {dimensao} ignorados")
+
+        self._limpar_memoria(dimensao or 0)
+        if not validos:
+            self._atualizar_indices(None)
+            return
+
+        matriz = np.array([info['caracteristicas'] for info in validos], dtype=np.float32)
+
+        # Garantir linhas unitárias: o produto escalar passa a ser a similaridade coseno
+        normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+        normas[normas == 0] = 1.0
+        self.matriz = np.ascontiguousarray(matriz / normas)
+
+        self.rotulos = np.zeros(len(validos), dtype=DTYPE_ROTULOS)
+        self.rotulos['valor'] = [VALORES_CARTAS.index(info['valor']) for info in validos]
+        self.rotulos['lado'] = [LADOS.index(info.get('lado', 'GERAL')) if info.get('lado', 'GERAL') in LADOS else 0
+                                for info in validos]
+        self.rotulos['timestamp'] = int(time.time())
+        self._recalcular_ativos()
+        self._atualizar_indices(None)  # Conteúdo novo em memória: reconstruir os índices
+
+    def _recalcular_ativos(self):
+        """Marca como ativas apenas as últimas 'maximo_por_chave' variações de cada valor_lado"""
+        self._ativos = np.ones(len(self), dtype=bool)
+        self._inativos = 0
+        self._variacoes_ativas = {}
+        if self.maximo_por_chave is None or len(self) == 0:
+            return
+
+        chaves = self.rotulos['valor'].astype(np.int64) * len(LADOS) + self.rotulos['lado']
+        for indice, chave in enumerate(chaves.tolist()):
+            self._desativar_excedente(chave, indice)
+
+    def _ativar(self, linha):
+        """Linha nova no fim: ativa, desativando a variação mais antiga da chave se passar do máximo"""
+        if linha >= len(self._ativos):
+            ativos = np.zeros(max(linha + 1, 2 * len(self._ativos), 64), dtype=bool)
+            ativos[:linha] = self._ativos[:linha]
+            self._ativos = ativos
+        self._ativos[linha] = True
+        if self.maximo_por_chave is not None:
+            self._desativar_excedente(int(self.rotulos['valor'][linha]) * len(LADOS) + int(self.rotulos['lado'][linha]), linha)
+
+    def _desativar_excedente(self, chave, linha):
+        variacoes = self._variacoes_ativas.setdefault(chave, deque())
+        variacoes.append(linha)
+        if len(variacoes) > self.maximo_por_chave:
+            self._ativos[variacoes.popleft()] = False
+            self._inativos += 1
+
+    def _atualizar_indices(self, geracao):
+        """Atualiza o índice do banco inteiro e reconstrói as partições por lado"""
+        self.indice.atualizar(self.matriz, geracao)
+
+        lados = self.rotulos['lado']
+        for codigo, lado in enumerate(LADOS):
+            if lado == 'GERAL':
+                continue
+            # O índice da partição é reaproveitado; versão nova = retreino
+            anterior = self.particoes_lado.get(lado)
+            if anterior is not None:
+                particao = _ParticaoLado(self.dimensao, anterior.indice, anterior.versao + 1)
+            else:
+                particao = _ParticaoLado(self.dimensao, criar_indice(self.tipo_indice_lado), 0)
+            linhas = np.flatnonzero((lados == codigo) | (lados == LADOS.index('GERAL')))
+            particao.anexar(linhas, self.matriz[linhas])
+            self.particoes_lado[lado] = particao
+
+    def _particao(self, lado):
+        """Partição do lado; None (busca no banco inteiro) para lado None/'GERAL' ou partição vazia"""
+        particao = self.particoes_lado.get(lado)
+        if particao is None or particao.tamanho == 0:
+            return None
+        return particao
+
+    def templates_por_chave(self):
+        """Visão compatível com o antigo dicionário {valor_lado: [template_info, ...]}"""
+        templates = {}
+        for indice in np.flatnonzero(self.ativos):
+            valor = VALORES_CARTAS[self.rotulos['valor'][indice]]
+            lado = LADOS[self.rotulos['lado'][indice]]
+            templates.setdefault(f"{valor}_{lado}", []).append({
+                'caracteristicas': self.matriz[indice],
+                'valor': valor,
+                'lado': lado,
+                'timestamp': datetime.fromtimestamp(int(self.rotulos['timestamp'][indice])).isoformat()
+            })
+        return templates
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+
+    def similaridades(self, vetor):
+        """(linhas, similaridades coseno) do vetor contra o banco: linhas None = todas, em ordem"""
+        vetor = np.asarray(vetor, dtype=np.float32)
+        norma = np.linalg.norm(vetor)
+        if norma == 0:
+            return None, np.zeros(len(self), dtype=np.float32)
+        return self.indice.similaridades_lote((vetor / norma).reshape(1, -1))[0]
+
+    def buscar(self, vetor, k=1, lado=None):
+        """Retorna até k pares (valor, similaridade) com valores distintos, do melhor para o pior.
+
+        Com lado ('CASA'/'VISITANTE') compara só com os templates daquele lado e os 'GERAL'.
+        """
+        if len(self) == 0 or len(vetor) != self.dimensao:
+            return []
+
+        vetor = np.asarray(vetor, dtype=np.float32)
+        norma = np.linalg.norm(vetor)
+        if norma == 0:
+            return []
+        return self.buscar_lote((vetor / norma).reshape(1, -1), k, lado)[0]
+
+    def buscar_lote(self, matriz, k=1, lado=None):
+        """Busca N vetores (linhas já normalizadas) com um único produto matriz-matriz"""
+        matriz = np.asarray(matriz, dtype=np.float32)
+        if len(self) == 0 or matriz.ndim != 2 or matriz.shape[1] != self.dimensao:
+            return [[] for _ in range(len(matriz))]
+
+        particao = self._particao(lado)
+        if particao is None:
+            return [self._melhores(*self._pontuar(linhas, sims), k)
+                    for linhas, sims in self.indice.similaridades_lote(matriz)]
+
+        resultados = []
+        for linhas, sims in particao.indice.similaridades_lote(matriz):
+            # Linhas do índice da partição -> linhas do banco
+            linhas = particao.linhas if linhas is None else particao.linhas[linhas]
+            resultados.append(self._melhores(*self._pontuar(linhas, sims), k))
+        return resultados
+
+    def _pontuar(self, linhas, sims):
+        """Similaridades entre 0 e 1 (variações inativas zeradas) e códigos de valor das linhas (None = todas)"""
+        sims = np.clip(sims, 0.0, 1.0)
+        if linhas is None:
+            if self._inativos:
+                sims[~self.ativos] = 0.0
+            return sims, self.rotulos['valor']
+        if self._inativos:
+            sims[~self.ativos[linhas]] = 0.0
+        return sims, self.rotulos['valor'][linhas]
+
+    def _melhores(self, sims, codigos, k):
+        if len(sims) == 0:
+            return []
+        if k == 1:
+            indice = int(np.argmax(sims))
+            return [(VALORES_CARTAS[codigos[indice]], float(sims[indice]))]
+
+        resultados = []
+        vistos = set()
+        for indice in np.argsort(-sims):
+            codigo = int(codigos[indice])
+            if codigo in vistos:
+                continue
+            vistos.add(codigo)
+            resultados.append((VALORES_CARTAS[codigo], float(sims[indice])))
+            if len(resultados) == k:
+                break
+        return resultados
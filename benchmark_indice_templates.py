@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BENCHMARK DOS ÍNDICES DO BANCO DE TEMPLATES
+Mede recall (top-1 igual ao da busca exata) e latência por consulta do índice exato
+e do índice por partições, para escolher LIMIAR_INDICE_PARTICOES.
+
+Uso:
+    python benchmark_indice_templates.py                      # bancos sintéticos (106 dimensões)
+    python benchmark_indice_templates.py --banco templates_cartas_banco
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from banco_templates import BancoTemplates
+from indice_templates import IndiceExato, IndiceParticoes
+
+def gerar_banco_sintetico(total, dimensao, chaves=39, ruido=0.35, semente=0):
+    """Variações ruidosas de 'chaves' centros (13 valores x 3 lados), linhas normalizadas"""
+    rng = np.random.default_rng(semente)
+    centros = rng.normal(size=(chaves, dimensao)).astype(np.float32)
+    matriz = centros[rng.integers(0, chaves, total)] + ruido * rng.normal(size=(total, dimensao)).astype(np.float32)
+    return matriz / np.linalg.norm(matriz, axis=1, keepdims=True)
+
+def gerar_consultas(matriz, quantidade, ruido=0.2, semente=1):
+    """Consultas: linhas do banco com ruído (como um novo frame da mesma carta)"""
+    rng = np.random.default_rng(semente)
+    consultas = matriz[rng.integers(0, len(matriz), quantidade)]
+    consultas = consultas + ruido * rng.normal(size=consultas.shape).astype(np.float32) / np.sqrt(matriz.shape[1])
+    return (consultas / np.linalg.norm(consultas, axis=1, keepdims=True)).astype(np.float32)
+
+def medir(indice, consultas):
+    """Latência média por consulta (ms) e o top-1 de cada consulta"""
+    melhores = []
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        linhas, sims = indice.similaridades_lote(consulta.reshape(1, -1))[0]
+        melhor = int(np.argmax(sims)) if len(sims) else -1
+        melhores.append(melhor if linhas is None or melhor < 0 else int(linhas[melhor]))
+    return (time.perf_counter() - inicio) * 1000 / len(consultas), np.array(melhores)
+
+def comparar(matriz, consultas, sondas_testadas):
+    exato = IndiceExato()
+    exato.atualizar(matriz)
+    ms_exato, referencia = medir(exato, consultas)
+    print(f"   exato              {ms_exato:8.3f} ms/consulta   recall 1.000")
+
+    for sondas in sondas_testadas:
+        particoes = IndiceParticoes(sondas=sondas)
+        inicio = time.perf_counter()
+        particoes.atualizar(matriz)
+        ms_construcao = (time.perf_counter() - inicio) * 1000
+        ms, melhores = medir(particoes, consultas)
+        recall = float(np.mean(melhores == referencia))
+        print(f"   partições s={sondas:<3d}    {ms:8.3f} ms/consulta   recall {recall:.3f}   "
+              f"({len(particoes.listas)} partições, construção {ms_construcao:.0f} ms)")
+
+    # Atualização incremental: anexar 1% de linhas novas sem retreinar
+    particoes = IndiceParticoes(sondas=sondas_testadas[0])
+    corte = max(1, len(matriz) - max(1, len(matriz) // 100))
+    particoes.atualizar(matriz[:corte])
+    inicio = time.perf_counter()
+    particoes.atualizar(matriz)
+    print(f"   anexar {len(matriz) - corte} linhas: {(time.perf_counter() - inicio) * 1000:.1f} ms "
+          f"(treinamentos: {particoes.treinamentos})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall e latência dos índices do banco de templates")
+    parser.add_argument('--banco', help="Pasta de um banco real (BancoTemplates) em vez de dados sintéticos")
+    parser.add_argument('--tamanhos', default="1000,5000,20000,50000", help="Linhas dos bancos sintéticos")
+    parser.add_argument('--dimensao', type=int, default=106, help="Dimensão dos bancos sintéticos")
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--sondas', default="4,8,16")
+    args = parser.parse_args()
+    sondas = [int(s) for s in args.sondas.split(',')]
+
+    print("⏱️ BENCHMARK DOS ÍNDICES DE TEMPLATES")
+    if args.banco:
+        banco = BancoTemplates(args.banco)
+        if not banco.carregar() or len(banco) == 0:
+            print(f"❌ Banco '{args.banco}' vazio ou inexistente")
+            return
+        matriz = np.asarray(banco.matriz, dtype=np.float32)
+        print(f"\n📦 {args.banco}: {len(matriz)} linhas x {matriz.shape[1]} dimensões")
+        comparar(matriz, gerar_consultas(matriz, args.consultas), sondas)
+        return
+
+    for total in (int(t) for t in args.tamanhos.split(',')):
+        matriz = gerar_banco_sintetico(total, args.dimensao)
+        print(f"\n📦 Sintético: {total} linhas x {args.dimensao} dimensões")
+        comparar(matriz, gerar_consultas(matriz, args.consultas), sondas)
+
+if __name__ == "__main__":
+    main()
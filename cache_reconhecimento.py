@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧠 CACHE LRU DE RECONHECIMENTO - FOOTBALL STUDIO
+Guarda o resultado dos reconhecedores (templates, OCR, canto...) por conteúdo da ROI.
+
+- Chave: hash da miniatura em cinza, reduzida e quantizada (frames repetidos e a mesma
+  carta renderizada de novo em outra rodada caem na mesma chave)
+- Valor: (valor, confiança, método) do reconhecedor que calculou
+- Capacidade limitada: a entrada usada há mais tempo é descartada primeiro
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+
+class CacheReconhecimento:
+    """Cache LRU (valor, confiança, método) por hash da ROI normalizada"""
+
+    def __init__(self, capacidade=1024, tamanho=(32, 48), bits_descartados=3):
+        self.capacidade = capacidade              # Máximo de entradas (descarte LRU)
+        self.tamanho = tamanho                    # (largura, altura) da miniatura
+        self.bits_descartados = bits_descartados  # Quantização: 3 = 32 níveis de cinza
+        self._entradas = OrderedDict()            # chave -> (valor, confiança, método)
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def chave(self, img, metodo):
+        """Hash do método + miniatura quantizada da ROI"""
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+        miniatura = cv2.resize(img, self.tamanho, interpolation=cv2.INTER_AREA) >> self.bits_descartados
+        resumo = hashlib.blake2b(miniatura.tobytes(), digest_size=16)
+        resumo.update(metodo.encode('utf-8'))
+        return resumo.digest()
+
+    def _obter(self, chave):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada
+
+    def _guardar(self, chave, entrada):
+        with self._lock:
+            self._entradas[chave] = entrada
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self.descartes += 1
+
+    def reconhecer(self, img, metodo, reconhecedor):
+        """Retorna (valor, confiança) do cache ou de reconhecedor(img), que deve retornar (valor, confiança)"""
+        if img is None or img.size == 0:
+            return reconhecedor(img)
+
+        chave = self.chave(img, metodo)
+        entrada = self._obter(chave)
+        if entrada is not None:
+            return entrada[0], entrada[1]
+
+        valor, confianca = reconhecedor(img)
+        self._guardar(chave, (valor, confianca, metodo))
+        return valor, confianca
+
+    def reconhecer_lote(self, imagens, metodo, reconhecedor_lote):
+        """Como reconhecer(), mas chama reconhecedor_lote(lista) uma vez só para as ROIs fora do cache"""
+        resultados = [None] * len(imagens)
+        pendentes = []
+        for posicao, img in enumerate(imagens):
+            if img is None or img.size == 0:
+                pendentes.append((posicao, img, None))
+                continue
+            chave = self.chave(img, metodo)
+            entrada = self._obter(chave)
+            if entrada is not None:
+                resultados[posicao] = (entrada[0], entrada[1])
+            else:
+                pendentes.append((posicao, img, chave))
+
+        if pendentes:
+            novos = reconhecedor_lote([img for _, img, _ in pendentes])
+            for (posicao, _, chave), (valor, confianca) in zip(pendentes, novos):
+                resultados[posicao] = (valor, confianca)
+                if chave is not None:
+                    self._guardar(chave, (valor, confianca, metodo))
+        return resultados
+
+    def limpar(self):
+        """Descarta todas as entradas (ex.: depois de salvar novos templates)"""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def taxa_acerto(self):
+        total = self.acertos + self.falhas
+        return (self.acertos / total) * 100 if total else 0.0
+
+    def resumo(self):
+        """Texto com o estado do cache"""
+        return (f"{len(self)}/{self.capacidade} entradas, {self.acertos} acertos, {self.falhas} falhas "
+                f"({self.taxa_acerto():.0f}%), {self.descartes} descartes")
@@ -10,10 +10,7 @@ import time
 import os
 import json
 from datetime import datetime
-import pytesseract
-
-# Configurar caminho do Tesseract
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+from backend_ocr import ler_texto
 
 class CalibradorDeteccao:
     def __init__(self):
@@ -175,7 +172,7 @@ class CalibradorDeteccao:
         for nome_proc, proc_img in preprocessamentos.items():
             for i, config in enumerate(configs_ocr):
                 try:
-                    texto = pytesseract.image_to_string(proc_img, config=config)
+                    texto = ler_texto(proc_img, config=config)
                     texto_limpo = self.limpar_texto_ocr(texto)
                     if texto_limpo:
                         valor_carta = self.validar_valor_carta(texto_limpo)
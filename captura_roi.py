@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📸 CAPTURA POR REGIÃO DE INTERESSE (ROI) - FOOTBALL STUDIO
+Captura apenas a união dos blocos CASA/VISITANTE em vez da tela inteira
+"""
+
+import cv2
+import numpy as np
+import mss
+
+from config_football_studio import DEFAULT_CASA_COORDS, DEFAULT_VISITANTE_COORDS
+
+def calcular_blocos_cartas(largura, altura, coords_casa=None, coords_visitante=None):
+    """Converte as coordenadas percentuais dos blocos em retângulos (x, y, w, h) em pixels"""
+    coords_casa = coords_casa or DEFAULT_CASA_COORDS
+    coords_visitante = coords_visitante or DEFAULT_VISITANTE_COORDS
+
+    blocos = {}
+    for lado, coords in (('CASA', coords_casa), ('VISITANTE', coords_visitante)):
+        blocos[lado] = (
+            int(largura * coords['x']),
+            int(altura * coords['y']),
+            int(largura * coords['w']),
+            int(altura * coords['h'])
+        )
+    return blocos
+
+class CapturadorROI:
+    """Captura somente a área que contém os dois blocos de cartas, reaproveitando buffers"""
+
+    def __init__(self, coords_casa=None, coords_visitante=None, indice_monitor=1):
+        self.coords_casa = coords_casa
+        self.coords_visitante = coords_visitante
+        self.indice_monitor = indice_monitor
+        self.sct = None
+        self.regiao = None       # União dos blocos em coordenadas absolutas (formato mss)
+        self.fatias = {}         # Fatias de cada bloco dentro da união
+        self._buffer_bgr = None  # Buffer BGR reutilizado entre capturas
+
+    def _preparar(self):
+        """Abre o mss e calcula a região de captura (feito na thread que vai capturar)"""
+        self.sct = mss.mss()
+        monitor = self.sct.monitors[self.indice_monitor]
+        blocos = calcular_blocos_cartas(monitor['width'], monitor['height'],
+                                        self.coords_casa, self.coords_visitante)
+
+        # União dos dois blocos
+        x1 = min(x for x, _, _, _ in blocos.values())
+        y1 = min(y for _, y, _, _ in blocos.values())
+        x2 = max(x + w for x, _, w, _ in blocos.values())
+        y2 = max(y + h for _, y, _, h in blocos.values())
+
+        self.regiao = {
+            'left': monitor['left'] + x1,
+            'top': monitor['top'] + y1,
+            'width': x2 - x1,
+            'height': y2 - y1
+        }
+        self.fatias = {
+            lado: (slice(y - y1, y - y1 + h), slice(x - x1, x - x1 + w))
+            for lado, (x, y, w, h) in blocos.items()
+        }
+        self._buffer_bgr = np.empty((self.regiao['height'], self.regiao['width'], 3), dtype=np.uint8)
+
+        print(f"📐 Região de captura: {self.regiao['width']}x{self.regiao['height']} "
+              f"em ({self.regiao['left']}, {self.regiao['top']})")
+
+    def capturar_regiao(self):
+        """Captura a união dos blocos e converte BGRA→BGR direto no buffer reutilizado"""
+        if self.sct is None:
+            self._preparar()
+
+        captura = self.sct.grab(self.regiao)
+        bgra = np.frombuffer(captura.raw, dtype=np.uint8).reshape(captura.height, captura.width, 4)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._buffer_bgr)
+        return self._buffer_bgr
+
+    def capturar_blocos(self):
+        """Retorna (bloco_casa, bloco_visitante) como views do buffer.
+
+        As views são sobrescritas na próxima captura; use .copy() para guardá-las.
+        """
+        try:
+            img = self.capturar_regiao()
+            fatia_casa = self.fatias['CASA']
+            fatia_visitante = self.fatias['VISITANTE']
+            return img[fatia_casa], img[fatia_visitante]
+        except Exception as e:
+            print(f"❌ Erro na captura da ROI: {e}")
+            return None, None
+
+    def fechar(self):
+        """Libera o mss"""
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
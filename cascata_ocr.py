@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📶 CASCATA ADAPTATIVA DE OCR - FOOTBALL STUDIO
+Registra quais combinações (preprocessamento, config) realmente produzem leituras aceitas
+e as ordena por taxa de acerto / custo, para que a maioria dos frames se resolva
+nas primeiras tentativas. As estatísticas persistem entre execuções.
+"""
+
+import atexit
+import json
+import os
+import threading
+
+ARQUIVO_ESTATISTICAS_OCR = "estatisticas_ocr.json"
+# Todas as cascatas gravam seções do mesmo arquivo: a leitura-modificação-escrita é serializada
+_LOCK_ARQUIVO = threading.Lock()
+
+class CascataOCR:
+    """Estatísticas de acerto e custo por combinação de OCR de uma etapa de detecção"""
+
+    def __init__(self, nome, arquivo=ARQUIVO_ESTATISTICAS_OCR, salvar_a_cada=50):
+        self.nome = nome              # Seção do arquivo (ex.: 'bloco', 'tempo_real')
+        self.arquivo = arquivo
+        self.salvar_a_cada = salvar_a_cada
+        self.estatisticas = {}        # chave -> {'tentativas', 'acertos', 'custo_medio'}
+        self._pendentes = 0
+        self._lock = threading.Lock()
+        self.carregar()
+        atexit.register(self.salvar)
+
+    def carregar(self):
+        try:
+            if os.path.exists(self.arquivo):
+                with open(self.arquivo, 'r', encoding='utf-8') as f:
+                    self.estatisticas = json.load(f).get(self.nome, {})
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar estatísticas de OCR: {e}")
+            self.estatisticas = {}
+
+    def salvar(self):
+        """Grava a seção desta cascata preservando as demais (escrita atômica)"""
+        with self._lock:
+            if not self.estatisticas:
+                return
+            estatisticas = {chave: dict(dados) for chave, dados in self.estatisticas.items()}
+            self._pendentes = 0
+
+        try:
+            with _LOCK_ARQUIVO:
+                dados = {}
+                if os.path.exists(self.arquivo):
+                    with open(self.arquivo, 'r', encoding='utf-8') as f:
+                        dados = json.load(f)
+                dados[self.nome] = estatisticas
+
+                # Temporário próprio da cascata e do processo: duas gravações nunca dividem o arquivo
+                temporario = f"{self.arquivo}.{self.nome}.{os.getpid()}.tmp"
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f, indent=2)
+                os.replace(temporario, self.arquivo)
+        except Exception as e:
+            print(f"⚠️ Erro ao salvar estatísticas de OCR: {e}")
+
+    def pontuacao(self, chave):
+        """Taxa de acerto (suavizada) por segundo de OCR; combinações novas começam neutras"""
+        dados = self.estatisticas.get(chave)
+        if not dados:
+            # Sem histórico: taxa neutra com o custo médio das combinações já vistas
+            custos = [d['custo_medio'] for d in self.estatisticas.values()]
+            return 0.5 / max(sum(custos) / len(custos), 0.001)
+        taxa = (dados['acertos'] + 1) / (dados['tentativas'] + 2)
+        return taxa / max(dados['custo_medio'], 0.001)
+
+    def ordenar(self, chaves):
+        """Ordena as chaves da mais para a menos promissora (empates mantêm a ordem original)"""
+        if not self.estatisticas:
+            return list(chaves)
+        return sorted(chaves, key=self.pontuacao, reverse=True)
+
+    def registrar(self, chave, aceito, duracao):
+        """Registra o resultado de uma tentativa: se a leitura foi aceita e quanto custou (s)"""
+        with self._lock:
+            dados = self.estatisticas.setdefault(chave, {'tentativas': 0, 'acertos': 0, 'custo_medio': duracao})
+            dados['tentativas'] += 1
+            if aceito:
+                dados['acertos'] += 1
+            # Média móvel exponencial do custo
+            dados['custo_medio'] = 0.9 * dados['custo_medio'] + 0.1 * duracao
+            self._pendentes += 1
+            salvar = self._pendentes >= self.salvar_a_cada
+
+        if salvar:
+            self.salvar()
+
+    def resumo(self, limite=5):
+        """Texto com as combinações mais promissoras"""
+        linhas = []
+        for chave in self.ordenar(self.estatisticas)[:limite]:
+            dados = self.estatisticas[chave]
+            linhas.append(f"{chave}: {dados['acertos']}/{dados['tentativas']} "
+                          f"({dados['custo_medio'] * 1000:.0f} ms)")
+        return linhas
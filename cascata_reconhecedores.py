@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🪜 CASCATA DE RECONHECEDORES - FOOTBALL STUDIO
+Roda o reconhecedor mais barato primeiro e só escala para o próximo (mais caro)
+quando a confiança fica abaixo do limiar da etapa.
+
+Ordem típica: templates (ms) → LBPH (ms) → OCR (centenas de ms, rede de segurança).
+Cada etapa registra chamadas, aceitações, escalonamentos e latência média.
+"""
+
+import threading
+import time
+
+class EtapaCascata:
+    """Um reconhecedor da cascata: funcao(img, lado) -> (valor, confiança 0-1)"""
+
+    def __init__(self, nome, funcao, limiar, funcao_lote=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.limiar = limiar            # Confiança mínima para aceitar sem escalar
+        self.funcao_lote = funcao_lote  # Opcional: funcao_lote(imagens, lados) -> [(valor, confiança), ...]
+        self.chamadas = 0
+        self.aceitas = 0
+        self.tempo_total = 0.0
+
+    def aceita(self, valor, confianca):
+        return bool(valor) and confianca is not None and confianca >= self.limiar
+
+    def registrar(self, quantidade, aceitas, duracao):
+        self.chamadas += quantidade
+        self.aceitas += aceitas
+        self.tempo_total += duracao
+
+    def estatisticas(self):
+        escaladas = self.chamadas - self.aceitas
+        return {
+            'chamadas': self.chamadas,
+            'aceitas': self.aceitas,
+            'escaladas': escaladas,
+            'taxa_escalonamento': (escaladas / self.chamadas) * 100 if self.chamadas else 0.0,
+            'latencia_media_ms': (self.tempo_total / self.chamadas) * 1000 if self.chamadas else 0.0
+        }
+
+class CascataReconhecedores:
+    """Executa as etapas em ordem de custo até uma delas aceitar"""
+
+    def __init__(self, etapas):
+        self.etapas = list(etapas)
+        self._lock = threading.Lock()
+
+    def reconhecer(self, img, lado):
+        """Retorna (valor, confiança, nome da etapa); (None, melhor confiança, None) se nenhuma aceitar"""
+        return self.reconhecer_lote([img], [lado])[0]
+
+    def reconhecer_lote(self, imagens, lados):
+        """Como reconhecer(), para N imagens; etapas com funcao_lote processam os pendentes de uma vez"""
+        resultados = [(None, 0.0, None)] * len(imagens)
+        pendentes = [posicao for posicao, img in enumerate(imagens) if img is not None and img.size > 0]
+
+        for etapa in self.etapas:
+            if not pendentes:
+                break
+
+            inicio = time.perf_counter()
+            try:
+                if etapa.funcao_lote is not None:
+                    saidas = etapa.funcao_lote([imagens[p] for p in pendentes], [lados[p] for p in pendentes])
+                else:
+                    saidas = [etapa.funcao(imagens[p], lados[p]) for p in pendentes]
+            except Exception as e:
+                print(f"❌ Erro na etapa {etapa.nome} da cascata: {e}")
+                saidas = [(None, 0.0)] * len(pendentes)
+            duracao = time.perf_counter() - inicio
+
+            escalados = []
+            for posicao, (valor, confianca) in zip(pendentes, saidas):
+                if etapa.aceita(valor, confianca):
+                    resultados[posicao] = (valor, confianca, etapa.nome)
+                else:
+                    escalados.append(posicao)
+                    melhor = resultados[posicao][1]
+                    resultados[posicao] = (None, max(melhor, confianca or 0.0), None)
+
+            with self._lock:
+                etapa.registrar(len(pendentes), len(pendentes) - len(escalados), duracao)
+            pendentes = escalados
+
+        return resultados
+
+    def estatisticas(self):
+        """{etapa: {'chamadas', 'aceitas', 'escaladas', 'taxa_escalonamento', 'latencia_media_ms'}}"""
+        with self._lock:
+            return {etapa.nome: etapa.estatisticas() for etapa in self.etapas}
+
+    def resumo(self):
+        """Linhas de texto com latência e escalonamento de cada etapa"""
+        linhas = []
+        for nome, dados in self.estatisticas().items():
+            linhas.append(f"{nome}: {dados['chamadas']} chamadas, {dados['latencia_media_ms']:.1f} ms, "
+                          f"{dados['taxa_escalonamento']:.0f}% escaladas")
+        return linhas
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧩 CLASSIFICADOR FATORADO VALOR × NAIPE - FOOTBALL STUDIO
+Reconhece o valor (13 classes) e o naipe (4 classes) separadamente e combina os dois.
+
+- Valor: glifo do índice (canto superior esquerdo), comparado pela máscara da cor da carta
+- Naipe: cor predominante (HSV, mesma regra de detectar_naipe_por_cor) + forma do símbolo,
+  comparada só com os 2 naipes daquela cor
+- Como valor e naipe são independentes, cartas sem pasta em templates_cartas/
+  (ex.: copas/5) também são reconhecidas
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+from indice_canto import FRACAO_CANTO, regiao_na_carta, retangulo_carta
+
+# Região do símbolo do naipe (ao lado do índice) dentro da carta
+FRACAO_NAIPE = (0.5, 0.0, 0.5, 0.45)
+NAIPES_POR_COR = {'vermelho': ('copas', 'ouros'), 'preto': ('espadas', 'paus')}
+COR_DO_NAIPE = {naipe: cor for cor, naipes in NAIPES_POR_COR.items() for naipe in naipes}
+SIMBOLOS_NAIPES = {'copas': '♥', 'ouros': '♦', 'espadas': '♠', 'paus': '♣'}
+
+def mascaras_cor(img_bgr):
+    """Máscaras (vermelho, preto) em HSV: vermelho para ♥ ♦, preto para ♠ ♣"""
+    if img_bgr.ndim == 3 and img_bgr.shape[2] == 4:
+        img_bgr = cv2.cvtColor(img_bgr, cv2.COLOR_BGRA2BGR)
+    hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
+
+    mask_red1 = cv2.inRange(hsv, np.array([0, 50, 50]), np.array([10, 255, 255]))
+    mask_red2 = cv2.inRange(hsv, np.array([170, 50, 50]), np.array([180, 255, 255]))
+    mask_black = cv2.inRange(hsv, np.array([0, 0, 0]), np.array([180, 255, 50]))
+    return cv2.bitwise_or(mask_red1, mask_red2), mask_black
+
+def cor_predominante(*imagens):
+    """'vermelho' ou 'preto', pela contagem de pixels de cada máscara (somada nas imagens)"""
+    vermelhos = pretos = 0
+    for img in imagens:
+        mask_red, mask_black = mascaras_cor(img)
+        vermelhos += cv2.countNonZero(mask_red)
+        pretos += cv2.countNonZero(mask_black)
+    return 'vermelho' if vermelhos > pretos else 'preto'
+
+def _vetor(mascara, tamanho):
+    """Redimensiona e normaliza (média zero, norma 1)"""
+    vetor = cv2.resize(mascara, tamanho, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    vetor -= vetor.mean()
+    norma = np.linalg.norm(vetor)
+    return vetor / norma if norma > 0 else vetor
+
+def recortar_regioes(img_carta, area_minima=0.02):
+    """Recorta (índice do valor, símbolo do naipe) da imagem da carta (BGR/BGRA)"""
+    cinza = cv2.cvtColor(img_carta, cv2.COLOR_BGRA2GRAY if img_carta.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+    altura, largura = cinza.shape
+    retangulo = retangulo_carta(cinza, area_minima) or (0, 0, largura, altura)
+
+    x, y, w, h = regiao_na_carta(retangulo, FRACAO_CANTO)
+    patch_valor = img_carta[y:y + h, x:x + w]
+    x, y, w, h = regiao_na_carta(retangulo, FRACAO_NAIPE)
+    return patch_valor, img_carta[y:y + h, x:x + w]
+
+class ClassificadorFatorado:
+    """Classificador de valor (exemplos do glifo) + classificador de naipe (cor e forma do símbolo)"""
+
+    def __init__(self, pasta_templates="templates_cartas", tamanho_valor=(40, 60), tamanho_naipe=(24, 24),
+                 limiar_valor=0.5, limiar_naipe=0.5):
+        self.pasta_templates = pasta_templates
+        self.tamanho_valor = tamanho_valor
+        self.tamanho_naipe = tamanho_naipe
+        self.limiar_valor = limiar_valor
+        self.limiar_naipe = limiar_naipe
+        self.valores = []                 # Valor de cada linha de matriz_valores
+        self.matriz_valores = np.empty((0, tamanho_valor[0] * tamanho_valor[1]), dtype=np.float32)
+        self.modelos_naipe = {}           # naipe -> forma média do símbolo (vetor normalizado)
+        self.carregar_modelos()
+
+    # ------------------------------------------------------------------
+    # Características
+    # ------------------------------------------------------------------
+
+    def caracteristicas_valor(self, patch_valor, cor):
+        """Máscara da cor da carta no índice (independe do tom de vermelho/preto do fundo)"""
+        mask_red, mask_black = mascaras_cor(patch_valor)
+        return _vetor(mask_red if cor == 'vermelho' else mask_black, self.tamanho_valor)
+
+    def caracteristicas_naipe(self, patch_naipe, cor):
+        """Forma do maior componente da cor no canto do naipe, ou None"""
+        mask_red, mask_black = mascaras_cor(patch_naipe)
+        mascara = mask_red if cor == 'vermelho' else mask_black
+        total, rotulos, stats, _ = cv2.connectedComponentsWithStats(mascara)
+        if total < 2:
+            return None
+        indice = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        x, y, w, h = stats[indice, :4]
+        simbolo = (rotulos[y:y + h, x:x + w] == indice).astype(np.uint8) * 255
+        return _vetor(simbolo, self.tamanho_naipe)
+
+    # ------------------------------------------------------------------
+    # Modelos
+    # ------------------------------------------------------------------
+
+    def carregar_modelos(self):
+        """Extrai glifos de valor e símbolos de naipe de templates_cartas/<naipe>/<valor>/"""
+        if not os.path.isdir(self.pasta_templates):
+            print(f"❌ Pasta de templates '{self.pasta_templates}' não encontrada")
+            return
+
+        vetores_valor = []
+        formas_naipe = {}
+        for naipe in sorted(os.listdir(self.pasta_templates)):
+            pasta_naipe = os.path.join(self.pasta_templates, naipe)
+            if naipe not in COR_DO_NAIPE or not os.path.isdir(pasta_naipe):
+                continue
+            cor = COR_DO_NAIPE[naipe]
+            for valor in sorted(os.listdir(pasta_naipe)):
+                pasta_valor = os.path.join(pasta_naipe, valor)
+                if not os.path.isdir(pasta_valor):
+                    continue
+                for arquivo in sorted(os.listdir(pasta_valor)):
+                    if not arquivo.lower().endswith(('.png', '.jpg', '.jpeg')):
+                        continue
+                    img = cv2.imread(os.path.join(pasta_valor, arquivo))
+                    if img is None:
+                        continue
+                    patch_valor, patch_naipe = recortar_regioes(img, area_minima=0.3)
+                    vetores_valor.append(self.caracteristicas_valor(patch_valor, cor))
+                    self.valores.append(valor)
+                    forma = self.caracteristicas_naipe(patch_naipe, cor)
+                    if forma is not None:
+                        formas_naipe.setdefault(naipe, []).append(forma)
+
+        if vetores_valor:
+            self.matriz_valores = np.ascontiguousarray(vetores_valor, dtype=np.float32)
+        for naipe, formas in formas_naipe.items():
+            media = np.mean(formas, axis=0)
+            self.modelos_naipe[naipe] = media / max(np.linalg.norm(media), 1e-6)
+
+        print(f"🧩 Classificador fatorado: {len(self.valores)} exemplos de valor "
+              f"({len(set(self.valores))} valores), {len(self.modelos_naipe)} naipes")
+
+    # ------------------------------------------------------------------
+    # Classificação
+    # ------------------------------------------------------------------
+
+    def classificar_valor(self, patch_valor, cor):
+        """(valor, correlação) do exemplo de glifo mais parecido"""
+        if len(self.valores) == 0 or patch_valor.size == 0:
+            return None, 0.0
+        sims = self.matriz_valores @ self.caracteristicas_valor(patch_valor, cor)
+        indice = int(np.argmax(sims))
+        return self.valores[indice], float(sims[indice])
+
+    def classificar_naipe(self, patch_naipe, cor=None):
+        """(naipe, correlação): a cor escolhe o par de naipes e a forma decide entre os dois"""
+        if patch_naipe.size == 0:
+            return None, 0.0
+        cor = cor or cor_predominante(patch_naipe)
+        forma = self.caracteristicas_naipe(patch_naipe, cor)
+        candidatos = [naipe for naipe in NAIPES_POR_COR[cor] if naipe in self.modelos_naipe]
+        if forma is None or not candidatos:
+            return None, 0.0
+        sims = [float(self.modelos_naipe[naipe] @ forma) for naipe in candidatos]
+        melhor = int(np.argmax(sims))
+        return candidatos[melhor], sims[melhor]
+
+    def classificar(self, img_carta):
+        """Retorna (naipe, valor, correlação do valor, correlação do naipe); None no que não passar do limiar"""
+        try:
+            if img_carta is None or img_carta.size == 0:
+                return None, None, 0.0, 0.0
+            patch_valor, patch_naipe = recortar_regioes(img_carta)
+            if patch_valor.size == 0 or patch_naipe.size == 0:
+                return None, None, 0.0, 0.0
+
+            cor = cor_predominante(patch_valor, patch_naipe)
+            valor, score_valor = self.classificar_valor(patch_valor, cor)
+            naipe, score_naipe = self.classificar_naipe(patch_naipe, cor)
+            if score_valor < self.limiar_valor:
+                valor = None
+            if score_naipe < self.limiar_naipe:
+                naipe = None
+            return naipe, valor, score_valor, score_naipe
+        except Exception as e:
+            print(f"❌ Erro na classificação fatorada: {e}")
+            return None, None, 0.0, 0.0
+
+    def reconhecer(self, img_carta):
+        """Mesmo formato dos outros reconhecedores: ('naipe_valor', correlação) ou (None, correlação)"""
+        naipe, valor, score_valor, score_naipe = self.classificar(img_carta)
+        score = min(score_valor, score_naipe)
+        if naipe and valor:
+            return f"{naipe}_{valor}", score
+        return None, score
@@ -37,6 +37,7 @@ LOCAL_SERVER_URL = "http://localhost:5000"
 DEBUG_MODE = True
 
 # Arquivos de dados
-TEMPLATES_FILE = "templates_cartas.pkl"
+TEMPLATES_BANCO = "templates_cartas_banco"  # Banco versionado (.npy + cabecalho.json)
+TEMPLATES_FILE = "templates_cartas.pkl"      # Formato antigo, migrado na primeira carga
 HISTORICO_FILE = "historico_cartas.json"
 TEMPLATES_FOLDER = "templates_organizados"
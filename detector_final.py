@@ -6,27 +6,27 @@ Sistema eficaz para capturar todas as cartas sem perder nenhuma
 """
 
 import cv2
-import numpy as np
-import pytesseract
-import pyautogui
 import json
+import sys
 import time
 from datetime import datetime
 from collections import Counter
 
+from backend_ocr import ler_texto
+from fontes_frames import criar_fonte
+
 class FootballStudioDetector:
-    def __init__(self):
+    def __init__(self, fonte=None):
+        self.fonte = fonte or criar_fonte()
         self.cartas_validas = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
         self.valores_cartas = {'A': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10, 'J': 11, 'Q': 12, 'K': 13}
         self.historico = []
         self.ultima_deteccao = None
         
     def capturar_tela(self):
-        """Captura a tela completa"""
+        """Captura a tela completa (ou o próximo frame da fonte configurada)"""
         try:
-            screenshot = pyautogui.screenshot()
-            img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-            return img
+            return self.fonte.ler_frame()
         except Exception as e:
             print(f"❌ Erro ao capturar tela: {e}")
             return None
@@ -107,7 +107,7 @@ class FootballStudioDetector:
                     ]
                     
                     for config in configs:
-                        texto = pytesseract.image_to_string(processed, config=config).strip()
+                        texto = ler_texto(processed, config=config).strip()
                         # Limpar texto
                         texto_limpo = ''.join(c for c in texto if c.isalnum())
                         
@@ -137,10 +137,11 @@ class FootballStudioDetector:
         try:
             regiao_casa, regiao_visitante = self.extrair_regioes(img)
             
-            # Salvar regiões para debug
-            timestamp = datetime.now().strftime("%H%M%S")
-            cv2.imwrite(f"debug_casa_{timestamp}.png", regiao_casa)
-            cv2.imwrite(f"debug_visitante_{timestamp}.png", regiao_visitante)
+            # Salvar regiões para debug (apenas ao vivo, replays gerariam milhares de arquivos)
+            if self.fonte.tempo_real:
+                timestamp = datetime.now().strftime("%H%M%S")
+                cv2.imwrite(f"debug_casa_{timestamp}.png", regiao_casa)
+                cv2.imwrite(f"debug_visitante_{timestamp}.png", regiao_visitante)
             
             carta_casa = self.detectar_carta_ocr(regiao_casa, "CASA")
             carta_visitante = self.detectar_carta_ocr(regiao_visitante, "VISITANTE")
@@ -176,7 +177,9 @@ class FootballStudioDetector:
         print("🚀 INICIANDO MONITOR FINAL OTIMIZADO")
         print("=" * 50)
         print("🎯 Sistema configurado para máxima eficácia")
-        print("📸 Captura a cada 3 segundos")
+        print(f"🎞️ Fonte: {self.fonte.descricao()}")
+        if self.fonte.tempo_real:
+            print("📸 Captura a cada 3 segundos")
         print("🔬 OCR com múltiplas técnicas")
         print("💾 Histórico salvo automaticamente")
         print("\n🎮 Pressione Ctrl+C para parar")
@@ -192,6 +195,9 @@ class FootballStudioDetector:
                 
                 # Capturar tela
                 img = self.capturar_tela()
+                if self.fonte.esgotada:
+                    print("🏁 Fonte de frames esgotada")
+                    break
                 if img is None:
                     continue
                 
@@ -239,12 +245,14 @@ class FootballStudioDetector:
                     print(f"\n📊 ESTATÍSTICAS: {sucessos}/{tentativas} sucessos ({taxa:.1f}%)")
                     
                 # Aguardar próxima captura
-                time.sleep(3)
+                if self.fonte.tempo_real:
+                    time.sleep(3)
                 
         except KeyboardInterrupt:
             print("\n⏹️ Monitoramento interrompido")
             
         finally:
+            self.fonte.fechar()
             taxa_final = (sucessos/tentativas)*100 if tentativas > 0 else 0
             print(f"\n🏁 ESTATÍSTICAS FINAIS:")
             print(f"   🎯 Tentativas: {tentativas}")
@@ -256,11 +264,15 @@ class FootballStudioDetector:
 if __name__ == "__main__":
     print("🎯 FOOTBALL STUDIO - DETECTOR FINAL")
     print("=" * 50)
-    print("🎮 Abra o Football Studio no navegador")
-    print("📱 Deixe o jogo visível na tela")
-    print("⏰ Aguarde 5 segundos e pressione Enter...")
     
-    input()
+    # Uso: python detector_final.py [pasta_de_frames|video]
+    origem = sys.argv[1] if len(sys.argv) > 1 else None
+    
+    if origem is None:
+        print("🎮 Abra o Football Studio no navegador")
+        print("📱 Deixe o jogo visível na tela")
+        print("⏰ Aguarde 5 segundos e pressione Enter...")
+        input()
     
-    detector = FootballStudioDetector()
+    detector = FootballStudioDetector(criar_fonte(origem))
     detector.monitorar()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+♻️ DETECTOR DE MUDANÇA DOS BLOCOS - FOOTBALL STUDIO
+Compara uma miniatura de cada bloco com a do último reconhecimento e só
+executa o reconhecedor quando o bloco realmente mudou.
+"""
+
+import cv2
+
+class DetectorMudanca:
+    """Portão de mudança por bloco: diferença média absoluta de uma miniatura em escala de cinza"""
+
+    def __init__(self, limiar=4.0, tamanho=(32, 48), verboso=True):
+        self.limiar = limiar      # Diferença média (0-255) a partir da qual o bloco "mudou"
+        self.tamanho = tamanho    # (largura, altura) da miniatura comparada
+        self.verboso = verboso    # Loga cada reaproveitamento (desligar em loops por frame)
+        self._referencias = {}    # chave -> miniatura do último reconhecimento
+        self._resultados = {}     # chave -> último resultado do reconhecedor
+        self.ultimo_mudou = {}    # chave -> se a última chamada executou o reconhecedor
+        self.reconhecimentos = 0
+        self.reaproveitados = 0
+
+    def calcular_miniatura(self, img):
+        """Reduz o bloco para uma miniatura em escala de cinza"""
+        if len(img.shape) == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(img, self.tamanho, interpolation=cv2.INTER_AREA)
+
+    def diferenca(self, chave, miniatura):
+        """Diferença média absoluta em relação à referência (None se não houver referência)"""
+        referencia = self._referencias.get(chave)
+        if referencia is None:
+            return None
+        return cv2.absdiff(miniatura, referencia).mean()
+
+    def mudou(self, chave, img):
+        """Indica se o bloco mudou desde o último reconhecimento"""
+        if img is None or img.size == 0:
+            return True
+        diferenca = self.diferenca(chave, self.calcular_miniatura(img))
+        return diferenca is None or diferenca >= self.limiar
+
+    def reconhecer(self, chave, img, reconhecedor):
+        """Executa reconhecedor(img) apenas se o bloco mudou; caso contrário reaproveita o último resultado"""
+        if img is None or img.size == 0:
+            self.ultimo_mudou[chave] = True
+            return reconhecedor(img)
+
+        miniatura = self.calcular_miniatura(img)
+        diferenca = self.diferenca(chave, miniatura)
+
+        if diferenca is not None and diferenca < self.limiar and chave in self._resultados:
+            self.reaproveitados += 1
+            self.ultimo_mudou[chave] = False
+            if self.verboso:
+                print(f"♻️ {chave}: sem mudança (diff {diferenca:.1f}), reaproveitando resultado")
+            return self._resultados[chave]
+
+        resultado = reconhecedor(img)
+        self.reconhecimentos += 1
+        self.ultimo_mudou[chave] = True
+        self._referencias[chave] = miniatura
+        self._resultados[chave] = resultado
+        return resultado
+
+    def reconhecer_lote(self, chaves, imagens, reconhecedor_lote, com_chaves=False):
+        """Como reconhecer(), mas chama reconhecedor_lote(lista_imagens) uma vez só para os blocos que mudaram.
+
+        Com com_chaves=True a chamada é reconhecedor_lote(lista_imagens, lista_chaves).
+        """
+        resultados = [None] * len(chaves)
+        pendentes = []
+
+        for posicao, (chave, img) in enumerate(zip(chaves, imagens)):
+            if img is None or img.size == 0:
+                pendentes.append((posicao, chave, img, None))
+                continue
+
+            miniatura = self.calcular_miniatura(img)
+            diferenca = self.diferenca(chave, miniatura)
+            if diferenca is not None and diferenca < self.limiar and chave in self._resultados:
+                self.reaproveitados += 1
+                self.ultimo_mudou[chave] = False
+                if self.verboso:
+                    print(f"♻️ {chave}: sem mudança (diff {diferenca:.1f}), reaproveitando resultado")
+                resultados[posicao] = self._resultados[chave]
+            else:
+                pendentes.append((posicao, chave, img, miniatura))
+
+        if pendentes:
+            imagens_pendentes = [img for _, _, img, _ in pendentes]
+            if com_chaves:
+                novos = reconhecedor_lote(imagens_pendentes, [chave for _, chave, _, _ in pendentes])
+            else:
+                novos = reconhecedor_lote(imagens_pendentes)
+            for (posicao, chave, img, miniatura), resultado in zip(pendentes, novos):
+                resultados[posicao] = resultado
+                self.ultimo_mudou[chave] = True
+                if miniatura is not None:
+                    self.reconhecimentos += 1
+                    self._referencias[chave] = miniatura
+                    self._resultados[chave] = resultado
+
+        return resultados
+
+    def houve_mudanca(self, *chaves):
+        """Indica se algum dos blocos mudou na última chamada de reconhecer()"""
+        return any(self.ultimo_mudou.get(chave, False) for chave in chaves)
+
+    def invalidar(self, chave=None):
+        """Descarta as referências (de uma chave ou de todas), forçando novo reconhecimento"""
+        if chave is None:
+            self._referencias.clear()
+            self._resultados.clear()
+            self.ultimo_mudou.clear()
+        else:
+            self._referencias.pop(chave, None)
+            self._resultados.pop(chave, None)
+            self.ultimo_mudou.pop(chave, None)
+
+    def taxa_reaproveitamento(self):
+        total = self.reconhecimentos + self.reaproveitados
+        return (self.reaproveitados / total) * 100 if total else 0.0
@@ -6,30 +6,36 @@ Sistema simplificado e eficaz para captura em tempo real
 """
 
 import cv2
-import numpy as np
-import pytesseract
-import pyautogui
-import json
+import sys
 import time
 import threading
 from datetime import datetime
 
-# Configurar Tesseract
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+from backend_ocr import ler_texto
+from diario_rodadas import DiarioRodadas
+from persistencia_assincrona import PersistidorAssincrono
+from fontes_frames import criar_fonte
+from maquina_rodada import MaquinaEstadosRodada
 
 class DetectorTempoReal:
-    def __init__(self):
+    def __init__(self, fonte=None):
+        self.fonte = fonte or criar_fonte()
         self.ativo = False
-        self.historico = []
-        self.ultima_deteccao = None
+        # Manter apenas últimas 50; cada rodada é uma linha no diário (snapshot compactado periodicamente)
+        self.diario = DiarioRodadas("historico_tempo_real.json", maximo=50)
+        self.historico = list(self.diario.carregar())
+        # O diário é gravado em lotes por uma thread de fundo: o disco não atrasa a detecção
+        self.persistidor = PersistidorAssincrono.com_politica(self.diario.anexar_lote, 'lote', nome="historico_tempo_real")
+        self.maquina = MaquinaEstadosRodada(intervalo_lento=1.0)  # Mesmo intervalo do polling antigo deste detector
         self.cartas_validas = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
         
     def capturar_e_detectar(self):
         """Captura tela e detecta cartas rapidamente"""
         try:
-            # Capturar tela completa
-            screenshot = pyautogui.screenshot()
-            img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            # Capturar tela completa (ou próximo frame da fonte)
+            img = self.fonte.ler_frame()
+            if img is None:
+                return None, None
             altura, largura = img.shape[:2]
             
             print(f"📸 Tela: {largura}x{altura}")
@@ -92,7 +98,7 @@ class DetectorTempoReal:
             for processed in metodos:
                 try:
                     # OCR rápido
-                    texto = pytesseract.image_to_string(processed, config='--psm 8 -c tessedit_char_whitelist=A23456789JQK10')
+                    texto = ler_texto(processed, config='--psm 8 -c tessedit_char_whitelist=A23456789JQK10')
                     texto_limpo = self.limpar_texto(texto)
                     
                     if texto_limpo in self.cartas_validas:
@@ -164,18 +170,16 @@ class DetectorTempoReal:
         if len(self.historico) > 50:
             self.historico = self.historico[-50:]
         
-        # Salvar arquivo
-        try:
-            with open("historico_tempo_real.json", "w", encoding='utf-8') as f:
-                json.dump(self.historico, f, indent=2, ensure_ascii=False)
-        except:
-            pass
+        # Gravação no diário em segundo plano
+        self.persistidor.enfileirar(entrada)
     
     def monitorar_tempo_real(self):
         """Monitor principal em tempo real"""
         print("🚀 INICIANDO MONITOR TEMPO REAL")
         print("=" * 50)
-        print("⚡ Captura a cada 1 segundo")
+        print(f"🎞️ Fonte: {self.fonte.descricao()}")
+        if self.fonte.tempo_real:
+            print("⚡ Amostragem por fase da rodada (lenta com mesa vazia, rápida na revelação)")
         print("🎯 Detecção simplificada e rápida")
         print("📊 Histórico automático")
         print("\n⏹️ Pressione Ctrl+C para parar")
@@ -191,13 +195,19 @@ class DetectorTempoReal:
                 
                 # Capturar e detectar
                 carta_casa, carta_visitante = self.capturar_e_detectar()
+                if self.fonte.esgotada:
+                    print("🏁 Fonte de frames esgotada")
+                    break
+                
+                # Registra uma vez por revelação, mesmo que as cartas repitam a rodada anterior
+                rodada_confirmada = self.maquina.processar(carta_casa, carta_visitante)
                 
                 if carta_casa and carta_visitante:
                     sucessos += 1
                     deteccao_atual = f"{carta_casa}-{carta_visitante}"
                     
                     # Verificar se é nova
-                    if deteccao_atual != self.ultima_deteccao:
+                    if rodada_confirmada:
                         vencedor = self.determinar_vencedor(carta_casa, carta_visitante)
                         
                         # Salvar
@@ -209,10 +219,8 @@ class DetectorTempoReal:
                         print(f"   🏆 {vencedor}")
                         print(f"   📊 Total: {len(self.historico)}")
                         print(f"   📈 Taxa: {sucessos}/{tentativas} ({(sucessos/tentativas)*100:.1f}%)")
-                        
-                        self.ultima_deteccao = deteccao_atual
                     else:
-                        print(f"🔄 Mesma rodada: {deteccao_atual}")
+                        print(f"🔄 Mesma rodada: {deteccao_atual} ({self.maquina.fase})")
                 else:
                     print("❌ Não detectado")
                 
@@ -221,14 +229,17 @@ class DetectorTempoReal:
                     taxa = (sucessos/tentativas)*100
                     print(f"\n📊 ESTATÍSTICA: {sucessos}/{tentativas} ({taxa:.1f}%)")
                 
-                # Aguardar 1 segundo
-                time.sleep(1)
+                # Aguardar conforme a fase da rodada
+                if self.fonte.tempo_real:
+                    time.sleep(self.maquina.proximo_intervalo())
                 
         except KeyboardInterrupt:
             print("\n⏹️ Parando...")
         
         finally:
             self.ativo = False
+            self.fonte.fechar()
+            self.persistidor.parar()  # Grava as rodadas que ainda estão na fila
             taxa_final = (sucessos/tentativas)*100 if tentativas > 0 else 0
             print(f"\n🏁 FINAL: {sucessos}/{tentativas} ({taxa_final:.1f}%)")
             print(f"📁 Histórico salvo: {len(self.historico)} rodadas")
@@ -270,6 +281,13 @@ if __name__ == "__main__":
     print("🎯 FOOTBALL STUDIO - DETECTOR TEMPO REAL")
     print("=" * 50)
     
+    # Replay: python detector_tempo_real.py <pasta_de_frames|video>
+    if len(sys.argv) > 1:
+        detector = DetectorTempoReal(criar_fonte(sys.argv[1]))
+        detector.ativo = True
+        detector.monitorar_tempo_real()
+        sys.exit(0)
+    
     opcao = input("Escolha:\n1 - Teste rápido\n2 - Monitor contínuo\nOpção: ")
     
     if opcao == "1":
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📓 DIÁRIO DE RODADAS - FOOTBALL STUDIO
+Histórico persistido como snapshot JSON + diário JSON Lines só de anexação.
+
+- Snapshot (ex.: historico_cartas.json): a lista completa, no mesmo formato de antes,
+  regravada atomicamente (arquivo temporário + fsync + rename) só na compactação
+- Diário (ex.: historico_cartas.jsonl): uma linha por rodada nova; cada rodada custa
+  uma anexação pequena, qualquer que seja o tamanho do histórico
+- Compactação a cada 'compactar_a_cada' linhas: snapshot novo e diário zerado
+
+Na carga, o estado é o snapshot mais as linhas do diário. Uma última linha cortada
+(queda no meio da escrita) é descartada e removida do arquivo. Se a queda aconteceu
+depois de gravar o snapshot e antes de zerar o diário, a última rodada do diário já
+está no fim do snapshot, e o diário é ignorado.
+"""
+
+import json
+import os
+import threading
+
+class DiarioRodadas:
+    """Lista de rodadas (dicts) com snapshot atômico + diário JSON Lines"""
+
+    def __init__(self, arquivo_snapshot, maximo=None, compactar_a_cada=200):
+        self.arquivo_snapshot = arquivo_snapshot
+        self.arquivo_diario = os.path.splitext(arquivo_snapshot)[0] + '.jsonl'
+        self.maximo = maximo                    # Rodadas mantidas (None = todas)
+        self.compactar_a_cada = compactar_a_cada
+        self.entradas = []                      # Estado em memória (a mesma lista durante toda a vida)
+        self.linhas_diario = 0
+        self._lock = threading.Lock()
+
+    def _aparar(self):
+        if self.maximo is not None and len(self.entradas) > self.maximo:
+            del self.entradas[:len(self.entradas) - self.maximo]
+
+    def _ler_snapshot(self):
+        if not os.path.exists(self.arquivo_snapshot):
+            return []
+        try:
+            with open(self.arquivo_snapshot, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            return dados if isinstance(dados, list) else []
+        except Exception as e:
+            print(f"❌ Snapshot {self.arquivo_snapshot} ilegível ({e}), usando só o diário")
+            return []
+
+    def _ler_diario(self):
+        """Linhas válidas do diário; corta do arquivo uma última linha incompleta"""
+        if not os.path.exists(self.arquivo_diario):
+            return []
+        with open(self.arquivo_diario, 'rb') as f:
+            conteudo = f.read()
+
+        completo = conteudo.rfind(b'\n') + 1
+        if completo < len(conteudo):
+            print(f"⚠️ Última linha de {self.arquivo_diario} incompleta (gravação interrompida), descartada")
+            with open(self.arquivo_diario, 'r+b') as f:
+                f.truncate(completo)
+
+        entradas = []
+        for numero, linha in enumerate(conteudo[:completo].splitlines(), start=1):
+            if not linha.strip():
+                continue
+            try:
+                entradas.append(json.loads(linha))
+            except ValueError:
+                print(f"⚠️ Linha {numero} de {self.arquivo_diario} inválida, ignorada")
+        return entradas
+
+    def carregar(self):
+        """Reconstrói o histórico (snapshot + diário) e retorna a lista de entradas"""
+        with self._lock:
+            snapshot = self._ler_snapshot()
+            diario = self._ler_diario()
+            self.linhas_diario = len(diario)
+
+            if diario and snapshot and diario[-1] == snapshot[-1]:
+                # Queda entre gravar o snapshot e zerar o diário: o diário já está no snapshot
+                diario = []
+
+            self.entradas[:] = snapshot + diario
+            self._aparar()
+        return self.entradas
+
+    def anexar(self, entrada):
+        """Adiciona uma rodada: uma linha no diário (e compacta de tempos em tempos)"""
+        self.anexar_lote([entrada])
+
+    def anexar_lote(self, entradas, sincronizar=True):
+        """Adiciona várias rodadas com uma única escrita (e um fsync, se sincronizar).
+
+        A memória só muda depois da escrita: se ela falhar, repetir o lote não duplica rodadas.
+        """
+        if not entradas:
+            return
+        with self._lock:
+            linhas = ''.join(json.dumps(entrada, ensure_ascii=False) + '\n' for entrada in entradas)
+            with open(self.arquivo_diario, 'a', encoding='utf-8') as f:
+                inicio = f.tell()
+                try:
+                    f.write(linhas)
+                    f.flush()
+                    if sincronizar:
+                        os.fsync(f.fileno())
+                except OSError:
+                    # Desfaz a escrita parcial: a nova tentativa grava o lote uma vez só
+                    f.truncate(inicio)
+                    raise
+            self.linhas_diario += len(entradas)
+
+            self.entradas.extend(entradas)
+            self._aparar()
+
+            if self.linhas_diario >= self.compactar_a_cada:
+                self._compactar()
+
+    def substituir(self, entradas):
+        """Troca todo o histórico (ex.: limpar dados) e grava um snapshot novo"""
+        with self._lock:
+            self.entradas[:] = list(entradas)
+            self._aparar()
+            self._compactar()
+
+    def compactar(self):
+        """Grava o snapshot com o estado atual e zera o diário"""
+        with self._lock:
+            self._compactar()
+
+    def _compactar(self):
+        pasta = os.path.dirname(self.arquivo_snapshot)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        temporario = self.arquivo_snapshot + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.entradas, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.arquivo_snapshot)
+
+        # Só depois do snapshot confirmado: zerar o diário
+        with open(self.arquivo_diario, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.linhas_diario = 0
+
+    def __len__(self):
+        return len(self.entradas)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📈 ESTATÍSTICAS INCREMENTAIS DAS RODADAS - FOOTBALL STUDIO
+Agregados mantidos a cada rodada nova, para o painel não recalcular o histórico a cada consulta.
+
+- Vitórias por vencedor e frequência de cada carta (histórico inteiro)
+- Carta mais comum: atualizada na inserção (as contagens só crescem)
+- Sequência atual: último vencedor e quantas vezes seguidas
+- Janela deslizante das últimas N rodadas: a rodada que sai da janela decrementa as contagens
+
+Ler o resumo custa o mesmo com 100 ou 10 milhões de rodadas.
+"""
+
+import threading
+from collections import Counter, deque
+
+class EstatisticasRodadas:
+    """Agregados das rodadas: atualização e leitura O(1)"""
+
+    def __init__(self, tamanho_janela=100):
+        self.tamanho_janela = tamanho_janela  # Rodadas na janela deslizante
+        self._lock = threading.Lock()
+        self._zerar()
+
+    def _zerar(self):
+        self.total = 0
+        self.vencedores = Counter()
+        self.frequencia_cartas = Counter()
+        self.carta_mais_comum = None
+        self.ultimo_vencedor = None
+        self.sequencia = 0
+        self.janela = deque()
+        self.vencedores_janela = Counter()
+
+    def reiniciar(self):
+        with self._lock:
+            self._zerar()
+
+    def carregar(self, vencedores, frequencia_cartas, sequencia, ultimos_vencedores):
+        """Estado inicial vindo do armazenamento (uma vez, na inicialização).
+
+        vencedores: {vencedor: rodadas}; frequencia_cartas: {carta: vezes};
+        sequencia: (último vencedor, tamanho); ultimos_vencedores: do mais antigo ao mais novo.
+        """
+        with self._lock:
+            self._zerar()
+            self.vencedores.update(vencedores)
+            self.total = sum(self.vencedores.values())
+            self.frequencia_cartas.update(frequencia_cartas)
+            if self.frequencia_cartas:
+                self.carta_mais_comum = self.frequencia_cartas.most_common(1)[0][0]
+            self.ultimo_vencedor, self.sequencia = sequencia
+            for vencedor in list(ultimos_vencedores)[-self.tamanho_janela:]:
+                self._entrar_na_janela(vencedor)
+
+    def adicionar(self, vencedor, cartas):
+        """Conta uma rodada nova (vencedor e as strings das cartas)"""
+        with self._lock:
+            self.total += 1
+            self.vencedores[vencedor] += 1
+
+            for carta in cartas:
+                self.frequencia_cartas[carta] += 1
+                if (self.carta_mais_comum is None
+                        or self.frequencia_cartas[carta] > self.frequencia_cartas[self.carta_mais_comum]):
+                    self.carta_mais_comum = carta
+
+            if vencedor == self.ultimo_vencedor:
+                self.sequencia += 1
+            else:
+                self.ultimo_vencedor = vencedor
+                self.sequencia = 1
+
+            self._entrar_na_janela(vencedor)
+
+    def _entrar_na_janela(self, vencedor):
+        self.janela.append(vencedor)
+        self.vencedores_janela[vencedor] += 1
+        if len(self.janela) > self.tamanho_janela:
+            self.vencedores_janela[self.janela.popleft()] -= 1
+
+    def resumo(self):
+        """Cópia consistente dos agregados (sem percorrer o histórico)"""
+        with self._lock:
+            return {
+                'total': self.total,
+                'vencedores': dict(self.vencedores),
+                'carta_mais_comum': self.carta_mais_comum,
+                'ultimo_vencedor': self.ultimo_vencedor,
+                'sequencia': self.sequencia,
+                'rodadas_janela': len(self.janela),
+                'vencedores_janela': {vencedor: vezes for vencedor, vezes in self.vencedores_janela.items() if vezes}
+            }
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎞️ FONTES DE FRAMES - FOOTBALL STUDIO
+Camada plugável de captura: tela ao vivo, pasta de imagens gravadas ou arquivo de vídeo.
+Permite rodar os detectores sem monitor (servidores Linux), medir desempenho
+e reproduzir sessões gravadas na velocidade máxima do reconhecedor.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+from captura_roi import CapturadorROI, calcular_blocos_cartas
+
+EXTENSOES_IMAGEM = ('.png', '.jpg', '.jpeg', '.bmp')
+
+class FrameSource:
+    """Interface base das fontes de frames (imagens BGR)"""
+
+    # Fontes ao vivo respeitam o intervalo entre capturas; replays rodam sem espera
+    tempo_real = False
+
+    def __init__(self):
+        self.esgotada = False  # True quando um replay chega ao fim
+        self.frames_lidos = 0
+
+    def ler_frame(self):
+        """Retorna o próximo frame BGR completo ou None (falha ou fim da fonte)"""
+        raise NotImplementedError
+
+    def ler_blocos(self, coords_casa=None, coords_visitante=None):
+        """Retorna (bloco_casa, bloco_visitante) recortados do próximo frame"""
+        img = self.ler_frame()
+        if img is None:
+            return None, None
+
+        altura, largura = img.shape[:2]
+        blocos = calcular_blocos_cartas(largura, altura, coords_casa, coords_visitante)
+        casa_x, casa_y, casa_w, casa_h = blocos['CASA']
+        visit_x, visit_y, visit_w, visit_h = blocos['VISITANTE']
+        return (img[casa_y:casa_y+casa_h, casa_x:casa_x+casa_w],
+                img[visit_y:visit_y+visit_h, visit_x:visit_x+visit_w])
+
+    def fechar(self):
+        """Libera recursos da fonte"""
+        pass
+
+    def descricao(self):
+        return self.__class__.__name__
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+class TelaFrameSource(FrameSource):
+    """Captura ao vivo da tela (mss por padrão, pyautogui como alternativa)"""
+
+    tempo_real = True
+
+    def __init__(self, backend='mss', indice_monitor=1):
+        super().__init__()
+        self.backend = backend
+        self.indice_monitor = indice_monitor
+        self.sct = None
+        self._capturador_roi = None
+
+    def ler_frame(self):
+        try:
+            if self.backend == 'pyautogui':
+                import pyautogui
+                screenshot = pyautogui.screenshot()
+                img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            else:
+                if self.sct is None:
+                    import mss
+                    self.sct = mss.mss()
+                captura = np.array(self.sct.grab(self.sct.monitors[self.indice_monitor]))
+                img = cv2.cvtColor(captura, cv2.COLOR_BGRA2BGR)
+
+            self.frames_lidos += 1
+            return img
+        except Exception as e:
+            print(f"❌ Erro ao capturar tela: {e}")
+            return None
+
+    def ler_blocos(self, coords_casa=None, coords_visitante=None):
+        """Ao vivo, captura apenas a ROI dos blocos em vez da tela inteira"""
+        if self.backend != 'mss':
+            return super().ler_blocos(coords_casa, coords_visitante)
+
+        if self._capturador_roi is None:
+            self._capturador_roi = CapturadorROI(coords_casa, coords_visitante, self.indice_monitor)
+
+        blocos = self._capturador_roi.capturar_blocos()
+        if blocos[0] is not None:
+            self.frames_lidos += 1
+        return blocos
+
+    def fechar(self):
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
+        if self._capturador_roi is not None:
+            self._capturador_roi.fechar()
+            self._capturador_roi = None
+
+    def descricao(self):
+        return f"Tela ao vivo ({self.backend})"
+
+class DiretorioFrameSource(FrameSource):
+    """Replay de frames gravados em uma pasta (ordem alfabética dos arquivos)"""
+
+    def __init__(self, pasta):
+        super().__init__()
+        self.pasta = pasta
+        self.arquivos = sorted(
+            os.path.join(pasta, nome) for nome in os.listdir(pasta)
+            if nome.lower().endswith(EXTENSOES_IMAGEM)
+        )
+        self.posicao = 0
+        print(f"📁 {len(self.arquivos)} frames encontrados em '{pasta}'")
+
+    def ler_frame(self):
+        while self.posicao < len(self.arquivos):
+            caminho = self.arquivos[self.posicao]
+            self.posicao += 1
+            img = cv2.imread(caminho, cv2.IMREAD_COLOR)
+            if img is not None:
+                self.frames_lidos += 1
+                return img
+            print(f"⚠️ Frame ilegível ignorado: {caminho}")
+
+        self.esgotada = True
+        return None
+
+    def descricao(self):
+        return f"Pasta '{self.pasta}' ({len(self.arquivos)} frames)"
+
+class VideoFrameSource(FrameSource):
+    """Replay de um arquivo de vídeo gravado da mesa"""
+
+    def __init__(self, caminho, pular_frames=0):
+        super().__init__()
+        self.caminho = caminho
+        self.pular_frames = pular_frames  # Frames descartados entre duas leituras
+        self.video = cv2.VideoCapture(caminho)
+        if not self.video.isOpened():
+            print(f"❌ Não foi possível abrir o vídeo '{caminho}'")
+            self.esgotada = True
+
+    def ler_frame(self):
+        if self.esgotada:
+            return None
+
+        # grab() avança sem decodificar os frames pulados
+        for _ in range(self.pular_frames):
+            if not self.video.grab():
+                self.esgotada = True
+                return None
+
+        ok, img = self.video.read()
+        if not ok:
+            self.esgotada = True
+            return None
+
+        self.frames_lidos += 1
+        return img
+
+    def fechar(self):
+        self.video.release()
+
+    def descricao(self):
+        return f"Vídeo '{self.caminho}'"
+
+def criar_fonte(origem=None, **kwargs):
+    """Cria a fonte adequada: None/'tela' → tela ao vivo, pasta → imagens, arquivo → vídeo"""
+    if origem is None or origem == 'tela':
+        return TelaFrameSource(**kwargs)
+    if os.path.isdir(origem):
+        return DiretorioFrameSource(origem)
+    if os.path.isfile(origem):
+        return VideoFrameSource(origem, **kwargs)
+    raise ValueError(f"Origem de frames inválida: {origem}")
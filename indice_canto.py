@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔠 RECONHECIMENTO PELO ÍNDICE DO CANTO - FOOTBALL STUDIO
+Compara apenas o índice do canto superior esquerdo (valor + naipe) em vez do bloco inteiro.
+
+- Modelos de canto recortados das imagens de templates_cartas/ (naipe/valor/*.png)
+- O canto é localizado uma vez por bloco (retângulo claro da carta) e o deslocamento fica salvo junto da calibração
+  (coordenadas_calibradas.json, chave 'indice_canto')
+- Cada reconhecimento é um recorte 40x60 + um produto matriz-vetor (correlação normalizada)
+"""
+
+import json
+import os
+
+import cv2
+import numpy as np
+
+ARQUIVO_CALIBRACAO = "coordenadas_calibradas.json"
+# Região do índice dentro da imagem de uma carta (frações de x, y, largura, altura)
+FRACAO_CANTO = (0.0, 0.0, 0.45, 0.6)
+
+def _cinza(img):
+    if img.ndim == 2:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+
+def retangulo_carta(cinza, area_minima):
+    """Retângulo (x, y, w, h) da maior região clara (a face da carta) ou None"""
+    _, claro = cv2.threshold(cinza, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    claro = cv2.morphologyEx(claro, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
+    contornos, _ = cv2.findContours(claro, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contornos:
+        return None
+    x, y, w, h = cv2.boundingRect(max(contornos, key=cv2.contourArea))
+    if w * h < area_minima * cinza.shape[0] * cinza.shape[1]:
+        return None
+    return x, y, w, h
+
+def regiao_na_carta(retangulo, fracao=FRACAO_CANTO):
+    """Região (x, y, w, h) dentro do retângulo da carta (padrão: o índice do canto)"""
+    x, y, w, h = retangulo
+    fx, fy, fw, fh = fracao
+    return x + int(w * fx), y + int(h * fy), max(1, int(w * fw)), max(1, int(h * fh))
+
+class ReconhecedorIndiceCanto:
+    """Modelos de canto em matriz + deslocamento do canto por bloco (cacheado)"""
+
+    def __init__(self, pasta_templates="templates_cartas", tamanho=(40, 60),
+                 arquivo_calibracao=ARQUIVO_CALIBRACAO, limiar=0.55):
+        self.pasta_templates = pasta_templates
+        self.tamanho = tamanho            # (largura, altura) do recorte comparado
+        self.arquivo_calibracao = arquivo_calibracao  # None = deslocamentos só em memória
+        self.limiar = limiar              # Correlação mínima para aceitar a carta
+        self.nomes = []                   # 'naipe_valor' de cada linha da matriz
+        self.matriz = np.empty((0, tamanho[0] * tamanho[1]), dtype=np.float32)
+        self.offsets = {}                 # chave do bloco -> frações (x, y, w, h) do canto
+        self._patch = np.empty((tamanho[1], tamanho[0]), dtype=np.uint8)
+        self.carregar_modelos()
+        self.carregar_offsets()
+
+    # ------------------------------------------------------------------
+    # Modelos
+    # ------------------------------------------------------------------
+
+    def _recortar_canto(self, img_carta):
+        """Recorta o índice de uma imagem de carta (usa o retângulo claro da carta se encontrado)"""
+        altura, largura = img_carta.shape[:2]
+        retangulo = retangulo_carta(img_carta, area_minima=0.3) or (0, 0, largura, altura)
+        x, y, w, h = regiao_na_carta(retangulo)
+        return img_carta[y:y + h, x:x + w]
+
+    def _vetor(self, patch_cinza):
+        """Redimensiona para o tamanho padrão e normaliza (média zero, norma 1)"""
+        cv2.resize(patch_cinza, self.tamanho, dst=self._patch, interpolation=cv2.INTER_AREA)
+        vetor = self._patch.astype(np.float32).ravel()
+        vetor -= vetor.mean()
+        norma = np.linalg.norm(vetor)
+        return vetor / norma if norma > 0 else vetor
+
+    def carregar_modelos(self):
+        """Recorta o canto de cada imagem de templates_cartas/<naipe>/<valor>/"""
+        if not os.path.isdir(self.pasta_templates):
+            print(f"❌ Pasta de templates '{self.pasta_templates}' não encontrada")
+            return
+
+        vetores = []
+        for naipe in sorted(os.listdir(self.pasta_templates)):
+            pasta_naipe = os.path.join(self.pasta_templates, naipe)
+            if not os.path.isdir(pasta_naipe):
+                continue
+            for valor in sorted(os.listdir(pasta_naipe)):
+                pasta_valor = os.path.join(pasta_naipe, valor)
+                if not os.path.isdir(pasta_valor):
+                    continue
+                for arquivo in sorted(os.listdir(pasta_valor)):
+                    if not arquivo.lower().endswith(('.png', '.jpg', '.jpeg')):
+                        continue
+                    img = cv2.imread(os.path.join(pasta_valor, arquivo), cv2.IMREAD_GRAYSCALE)
+                    if img is None:
+                        continue
+                    canto = cv2.resize(self._recortar_canto(img), self.tamanho, interpolation=cv2.INTER_AREA)
+                    vetores.append(self._vetor(canto))
+                    self.nomes.append(f"{naipe}_{valor}")
+
+        if vetores:
+            self.matriz = np.ascontiguousarray(vetores, dtype=np.float32)
+        print(f"🔠 Modelos de canto carregados: {len(self.nomes)}")
+
+    # ------------------------------------------------------------------
+    # Deslocamento do canto (calibração)
+    # ------------------------------------------------------------------
+
+    def carregar_offsets(self):
+        try:
+            if self.arquivo_calibracao and os.path.exists(self.arquivo_calibracao):
+                with open(self.arquivo_calibracao, 'r') as f:
+                    self.offsets = {chave: tuple(valor) for chave, valor
+                                    in json.load(f).get('indice_canto', {}).items()}
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar deslocamento do canto: {e}")
+
+    def salvar_offsets(self):
+        """Grava os deslocamentos junto das coordenadas calibradas (preserva as demais chaves)"""
+        if not self.arquivo_calibracao:
+            return
+        try:
+            dados = {}
+            if os.path.exists(self.arquivo_calibracao):
+                with open(self.arquivo_calibracao, 'r') as f:
+                    dados = json.load(f)
+            dados['indice_canto'] = self.offsets
+            with open(self.arquivo_calibracao, 'w') as f:
+                json.dump(dados, f, indent=2)
+        except Exception as e:
+            print(f"❌ Erro ao salvar deslocamento do canto: {e}")
+
+    def invalidar(self, chave=None):
+        """Esquece o deslocamento de um bloco (ou de todos) para localizá-lo de novo"""
+        if chave is None:
+            self.offsets.clear()
+        else:
+            self.offsets.pop(chave, None)
+
+    def localizar_canto(self, bloco, chave, salvar=True):
+        """Localiza a carta (retângulo claro) no bloco e guarda o deslocamento do índice (frações do bloco).
+
+        Só guarda se o canto encontrado for reconhecido acima do limiar (mesa sem carta não calibra).
+        """
+        if len(self.nomes) == 0 or bloco is None or bloco.size == 0:
+            return None
+
+        cinza = _cinza(bloco)
+        altura, largura = cinza.shape
+        retangulo = retangulo_carta(cinza, area_minima=0.02)
+        if retangulo is None:
+            return None
+
+        x, y, w, h = regiao_na_carta(retangulo)
+        nome, score = self._classificar(cinza[y:y + h, x:x + w])
+        if score < self.limiar:
+            print(f"⚠️ Canto de {chave} não confirmado (correlação {score:.2f}), mantendo sem calibração")
+            return None
+
+        self.offsets[chave] = (x / largura, y / altura, w / largura, h / altura)
+        print(f"📍 Canto de {chave} localizado em x={x}, y={y}, {w}x{h} ({nome}, correlação {score:.2f})")
+        if salvar:
+            self.salvar_offsets()
+        return self.offsets[chave]
+
+    # ------------------------------------------------------------------
+    # Reconhecimento
+    # ------------------------------------------------------------------
+
+    def _classificar(self, patch_cinza):
+        if len(self.nomes) == 0 or patch_cinza.size == 0:
+            return None, 0.0
+        sims = self.matriz @ self._vetor(patch_cinza)
+        indice = int(np.argmax(sims))
+        return self.nomes[indice], float(sims[indice])
+
+    def recortar_indice(self, bloco, chave):
+        """Recorta o índice do bloco usando o deslocamento cacheado (localiza na primeira vez)"""
+        offset = self.offsets.get(chave) or self.localizar_canto(bloco, chave)
+        if offset is None:
+            return None
+        altura, largura = bloco.shape[:2]
+        fx, fy, fw, fh = offset
+        x, y = int(fx * largura), int(fy * altura)
+        return bloco[y:y + max(1, int(fh * altura)), x:x + max(1, int(fw * largura))]
+
+    def reconhecer(self, bloco, chave):
+        """Reconhece a carta do bloco pelo índice do canto. Retorna ('naipe_valor', correlação) ou (None, correlação)"""
+        try:
+            if bloco is None or bloco.size == 0:
+                return None, 0.0
+            patch = self.recortar_indice(bloco, chave)
+            if patch is None or patch.size == 0:
+                return None, 0.0
+            nome, score = self._classificar(_cinza(patch))
+            if score >= self.limiar:
+                return nome, score
+            return None, score
+        except Exception as e:
+            print(f"❌ Erro no reconhecimento pelo canto: {e}")
+            return None, 0.0
+
+def valor_do_nome(nome_carta):
+    """'ouros_K' -> 'K'"""
+    return nome_carta.split('_', 1)[1] if nome_carta and '_' in nome_carta else None
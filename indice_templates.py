@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧭 ÍNDICES DE BUSCA DO BANCO DE TEMPLATES
+Índices plugáveis por trás de BancoTemplates.buscar / buscar_lote.
+
+- IndiceExato: produto matriz-vetor contra todas as linhas (bancos pequenos)
+- IndiceParticoes: busca aproximada por partições (k-means esférico + listas invertidas);
+  cada consulta só compara as linhas das 'sondas' partições mais próximas
+- IndiceAutomatico: exato até LIMIAR_INDICE_PARTICOES linhas, partições acima disso
+
+Os índices são atualizados a cada carregamento do banco: linhas anexadas são só atribuídas
+à partição mais próxima; as partições são retreinadas quando o banco dobra de tamanho
+ou muda de geração (compactação). Compare recall e latência com benchmark_indice_templates.py.
+
+similaridades_lote(consultas) retorna, para cada consulta, um par (linhas, similaridades):
+só as linhas comparadas e seus valores; linhas None significa todas as linhas, em ordem.
+"""
+
+import numpy as np
+
+# Linhas a partir das quais o índice automático passa a usar partições: no benchmark (106
+# dimensões) o exato empata por volta de 5 mil linhas e perde por 2x em 20 mil
+LIMIAR_INDICE_PARTICOES = 10000
+
+class IndiceExato:
+    """Similaridade exata contra todas as linhas"""
+
+    nome = 'exato'
+
+    def __init__(self):
+        self.matriz = np.empty((0, 0), dtype=np.float32)
+
+    def atualizar(self, matriz, geracao=0):
+        self.matriz = matriz
+
+    def similaridades_lote(self, consultas):
+        """Similaridade coseno de cada consulta contra todas as linhas (linhas e consultas normalizadas)"""
+        return [(None, sims) for sims in consultas @ self.matriz.T]
+
+class IndiceParticoes:
+    """Listas invertidas sobre partições k-means: similaridade exata só nas partições sondadas"""
+
+    nome = 'particoes'
+
+    def __init__(self, sondas=8, linhas_por_particao=128, iteracoes=10, amostra_treino=20000, semente=0):
+        self.sondas = sondas                        # Partições comparadas por consulta
+        self.linhas_por_particao = linhas_por_particao
+        self.iteracoes = iteracoes
+        self.amostra_treino = amostra_treino        # Linhas usadas para treinar os centroides
+        self._rng = np.random.default_rng(semente)
+        self.matriz = np.empty((0, 0), dtype=np.float32)
+        self.centroides = None
+        self.listas = []                            # partição -> índices das linhas
+        self.geracao = None
+        self.total_indexado = 0
+        self.total_treino = 0
+        self.treinamentos = 0
+
+    def atualizar(self, matriz, geracao=0):
+        """Indexa as linhas novas; retreina se o banco mudou de geração ou dobrou de tamanho"""
+        self.matriz = matriz
+        total = len(matriz)
+        if (self.centroides is None or geracao != self.geracao or total < self.total_indexado
+                or total >= 2 * max(self.total_treino, 1)):
+            self._treinar(geracao)
+        elif total > self.total_indexado:
+            self._indexar(self.total_indexado, total)
+
+    def _atribuir(self, linhas):
+        return np.argmax(linhas @ self.centroides.T, axis=1)
+
+    def _treinar(self, geracao):
+        """k-means esférico (centroides unitários, atribuição por produto escalar)"""
+        self.geracao = geracao
+        total = len(self.matriz)
+        self.total_treino = total
+        self.total_indexado = 0
+        self.treinamentos += 1
+        if total == 0:
+            self.centroides = np.empty((0, self.matriz.shape[1]), dtype=np.float32)
+            self.listas = []
+            return
+
+        amostra = self._rng.choice(total, min(total, self.amostra_treino), replace=False)
+        dados = np.asarray(self.matriz[np.sort(amostra)], dtype=np.float32)
+        # Os centroides iniciais saem da amostra: no máximo uma partição por linha amostrada
+        particoes = max(1, min(len(dados), total // self.linhas_por_particao))
+        centroides = dados[self._rng.choice(len(dados), particoes, replace=False)].copy()
+
+        for _ in range(self.iteracoes):
+            atribuicao = np.argmax(dados @ centroides.T, axis=1)
+            somas = np.zeros_like(centroides)
+            np.add.at(somas, atribuicao, dados)
+            normas = np.linalg.norm(somas, axis=1)
+            vazias = normas == 0
+            if vazias.any():
+                # Partição vazia recebe uma linha aleatória como novo centroide
+                somas[vazias] = dados[self._rng.choice(len(dados), int(vazias.sum()))]
+                normas[vazias] = np.linalg.norm(somas[vazias], axis=1)
+            centroides = somas / np.maximum(normas, 1e-12)[:, None]
+
+        self.centroides = np.ascontiguousarray(centroides, dtype=np.float32)
+        self.listas = [np.empty(0, dtype=np.int64) for _ in range(particoes)]
+        self._indexar(0, total)
+
+    def _indexar(self, inicio, fim):
+        """Atribui as linhas [inicio, fim) às partições (em blocos, para bancos em mmap)"""
+        for bloco in range(inicio, fim, 4096):
+            limite = min(fim, bloco + 4096)
+            atribuicao = self._atribuir(np.asarray(self.matriz[bloco:limite], dtype=np.float32))
+            ordem = np.argsort(atribuicao, kind='stable')
+            particoes, inicios = np.unique(atribuicao[ordem], return_index=True)
+            for particao, linhas in zip(particoes, np.split(ordem + bloco, inicios[1:])):
+                self.listas[particao] = np.concatenate([self.listas[particao], linhas])
+        self.total_indexado = fim
+
+    def similaridades_lote(self, consultas):
+        """(linhas, similaridades) de cada consulta, só com as linhas das partições sondadas"""
+        if len(self.matriz) == 0 or len(self.listas) == 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in consultas]
+
+        sondas = min(self.sondas, len(self.listas))
+        proximidade = consultas @ self.centroides.T
+        resultados = []
+        for posicao, consulta in enumerate(consultas):
+            escolhidas = np.argpartition(-proximidade[posicao], sondas - 1)[:sondas]
+            linhas = np.concatenate([self.listas[particao] for particao in escolhidas])
+            resultados.append((linhas, np.asarray(self.matriz[linhas], dtype=np.float32) @ consulta))
+        return resultados
+
+class IndiceAutomatico:
+    """Exato para bancos pequenos, partições a partir de 'limiar' linhas"""
+
+    nome = 'auto'
+
+    def __init__(self, limiar=LIMIAR_INDICE_PARTICOES, **opcoes_particoes):
+        self.limiar = limiar
+        self.exato = IndiceExato()
+        self.particoes = IndiceParticoes(**opcoes_particoes)
+        self.ativo = self.exato
+
+    def atualizar(self, matriz, geracao=0):
+        if len(matriz) >= self.limiar:
+            if self.ativo is not self.particoes:
+                print(f"🧭 Banco com {len(matriz)} linhas: usando índice por partições")
+            self.ativo = self.particoes
+        else:
+            self.ativo = self.exato
+        self.ativo.atualizar(matriz, geracao)
+
+    def similaridades_lote(self, consultas):
+        return self.ativo.similaridades_lote(consultas)
+
+INDICES = {
+    'exato': IndiceExato,
+    'particoes': IndiceParticoes,
+    'auto': IndiceAutomatico,
+}
+
+def criar_indice(tipo='auto', **opcoes):
+    """Cria o índice pelo nome ('exato', 'particoes' ou 'auto')"""
+    return INDICES[tipo](**opcoes)
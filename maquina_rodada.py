@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔁 MÁQUINA DE ESTADOS DA RODADA - FOOTBALL STUDIO
+Substitui o polling fixo por fases da rodada:
+AGUARDANDO → CARTAS_APARECENDO → CARTAS_ESTAVEIS → RODADA_REGISTRADA → AGUARDANDO
+
+- Amostra devagar com a mesa vazia e depois de confirmar a rodada
+- Amostra rápido durante a revelação das cartas
+- Registra uma rodada por revelação, mesmo que as cartas repitam a rodada anterior
+- A mesa só conta como vazia com os dois blocos vazios: um bloco ilegível não rearma a rodada
+"""
+
+AGUARDANDO = 'AGUARDANDO'
+CARTAS_APARECENDO = 'CARTAS_APARECENDO'
+CARTAS_ESTAVEIS = 'CARTAS_ESTAVEIS'
+RODADA_REGISTRADA = 'RODADA_REGISTRADA'
+
+class MaquinaEstadosRodada:
+    """Controla a fase da rodada e o intervalo até a próxima amostra"""
+
+    def __init__(self, intervalo_lento=2.0, intervalo_rapido=0.2, leituras_estaveis=2, leituras_vazias=2):
+        self.intervalo_lento = intervalo_lento    # Mesa vazia / rodada já registrada
+        self.intervalo_rapido = intervalo_rapido  # Em volta da revelação
+        self.leituras_estaveis = leituras_estaveis  # Leituras iguais seguidas para confirmar as cartas
+        self.leituras_vazias = leituras_vazias      # Leituras vazias seguidas para encerrar a rodada
+        self.fase = AGUARDANDO
+        self.leitura_atual = None
+        self.leitura_registrada = None  # Só volta a ser registrada depois da mesa vazia
+        self.contador_estavel = 0
+        self.contador_vazio = 0
+        self.rodadas_registradas = 0
+
+    def processar(self, carta_casa, carta_visitante, blocos_mudaram=False):
+        """Alimenta a máquina com uma leitura.
+
+        Retorna (carta_casa, carta_visitante) quando a rodada deve ser registrada, senão None.
+        Uma leitura parcial (só um bloco legível) não confirma nem encerra a rodada, a menos
+        que os blocos tenham mudado e a carta lida não seja mais a da leitura atual.
+        """
+        if carta_casa and carta_visitante:
+            return self._processar_cartas(carta_casa, carta_visitante)
+
+        if (carta_casa or carta_visitante) and not self._mesa_mudou(carta_casa, carta_visitante, blocos_mudaram):
+            if self.fase == AGUARDANDO and blocos_mudaram:
+                self._mudar_fase(CARTAS_APARECENDO)
+            return None
+
+        return self._processar_vazia(blocos_mudaram)
+
+    def _mesa_mudou(self, carta_casa, carta_visitante, blocos_mudaram):
+        """Leitura parcial com blocos mudados e a carta legível diferente da leitura atual"""
+        if not blocos_mudaram or self.leitura_atual is None:
+            return False
+        if carta_casa:
+            return str(carta_casa) != self.leitura_atual[0]
+        return str(carta_visitante) != self.leitura_atual[1]
+
+    def _processar_vazia(self, blocos_mudaram):
+        self.contador_estavel = 0
+
+        if self.fase == AGUARDANDO:
+            # Algo mudou nos blocos mas ainda não há cartas legíveis: acelerar a amostragem
+            if blocos_mudaram:
+                self._mudar_fase(CARTAS_APARECENDO)
+            return None
+
+        self.contador_vazio += 1
+        if self.contador_vazio >= self.leituras_vazias:
+            self.leitura_atual = None
+            self.leitura_registrada = None
+            self._mudar_fase(AGUARDANDO)
+        return None
+
+    def _processar_cartas(self, carta_casa, carta_visitante):
+        self.contador_vazio = 0
+        leitura = (str(carta_casa), str(carta_visitante))
+
+        if leitura == self.leitura_registrada:
+            # Rodada já registrada (também depois de uma leitura errada no meio): só a mesa vazia rearma
+            self.leitura_atual = leitura
+            self._mudar_fase(RODADA_REGISTRADA)
+            return None
+
+        if leitura != self.leitura_atual:
+            # Cartas novas (ou trocadas sem a mesa esvaziar): nova revelação
+            self.leitura_atual = leitura
+            self.contador_estavel = 1
+            self._mudar_fase(CARTAS_APARECENDO)
+        else:
+            self.contador_estavel += 1
+
+        if self.contador_estavel < self.leituras_estaveis:
+            return None
+
+        # Confirmada nesta leitura; a próxima leitura igual passa para RODADA_REGISTRADA
+        self.leitura_registrada = leitura
+        self.rodadas_registradas += 1
+        self._mudar_fase(CARTAS_ESTAVEIS)
+        return carta_casa, carta_visitante
+
+    def proximo_intervalo(self):
+        """Intervalo (segundos) até a próxima amostra de acordo com a fase atual"""
+        if self.fase == CARTAS_APARECENDO:
+            return self.intervalo_rapido
+        return self.intervalo_lento
+
+    def _mudar_fase(self, nova_fase):
+        if nova_fase != self.fase:
+            print(f"🔁 Fase: {self.fase} → {nova_fase}")
+            self.fase = nova_fase
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚙️ MOTOR DE OCR PARALELO - FOOTBALL STUDIO
+Distribui as tentativas de OCR (preprocessamento x config) em um pool limitado de processos.
+
+- Os resultados voltam em fluxo, na ordem em que terminam
+- No máximo uma tentativa por trabalhador em voo: a ordem da lista é a ordem de execução
+- Quando o chamador atinge consenso, as tentativas ainda não iniciadas são canceladas
+- Se o pool não puder ser criado, as tentativas rodam em série no próprio processo
+"""
+
+import atexit
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import backend_ocr
+
+def _iniciar_trabalhador(nome_backend):
+    """Cria o backend de OCR uma única vez em cada processo trabalhador"""
+    try:
+        backend_ocr.obter_backend(nome_backend)
+    except Exception as e:
+        # Um inicializador com erro quebraria o pool inteiro; a falha reaparece em cada tentativa
+        print(f"❌ Erro ao iniciar backend de OCR no trabalhador: {e}")
+
+def _executar_tentativa(imagem, config):
+    """Executa uma tentativa de OCR (roda dentro do processo trabalhador); retorna (texto, duração)"""
+    inicio = time.perf_counter()
+    texto = backend_ocr.ler_texto(imagem, config)
+    return texto, time.perf_counter() - inicio
+
+class MotorOCR:
+    """Pool de processos para tentativas de OCR com cancelamento por consenso"""
+
+    def __init__(self, max_trabalhadores=None, nome_backend=None):
+        if max_trabalhadores is None:
+            # Deixar um núcleo livre para a captura e o servidor
+            max_trabalhadores = max(1, min(8, (os.cpu_count() or 2) - 1))
+        self.max_trabalhadores = max_trabalhadores
+        self.nome_backend = nome_backend  # None = escolha automática em cada trabalhador
+        self._pool = None
+        self.tentativas_executadas = 0
+        self.tentativas_canceladas = 0
+        atexit.register(self.fechar)
+
+    def _obter_pool(self):
+        if self._pool is None:
+            # Com o início 'spawn' (Windows/macOS) cada trabalhador reimporta o módulo principal:
+            # quem usa o motor deixa a inicialização pesada sob 'if __name__ == "__main__"'
+            self._pool = ProcessPoolExecutor(max_workers=self.max_trabalhadores,
+                                             initializer=_iniciar_trabalhador,
+                                             initargs=(self.nome_backend,))
+            print(f"⚙️ Motor OCR iniciado com {self.max_trabalhadores} processos")
+        return self._pool
+
+    def executar(self, tentativas, parar=None):
+        """Executa as tentativas [(chave, imagem, config), ...] e gera (chave, texto, duracao) conforme terminam.
+
+        As tentativas são enviadas na ordem recebida, no máximo uma por trabalhador de cada vez,
+        então as primeiras da lista rodam primeiro. parar(chave, texto) é chamado a cada
+        resultado; se retornar True, as tentativas restantes não são executadas.
+        """
+        try:
+            pool = self._obter_pool()
+        except Exception as e:
+            print(f"⚠️ Pool de OCR indisponível ({e}), executando em série")
+            self._pool = None
+            yield from self._executar_em_serie(tentativas, parar)
+            return
+
+        fila = iter(tentativas)
+        em_execucao = {}
+
+        def enviar_proxima():
+            for tentativa in fila:
+                _, imagem, config = tentativa
+                em_execucao[pool.submit(_executar_tentativa, imagem, config)] = tentativa
+                return True
+            return False
+
+        try:
+            for _ in range(self.max_trabalhadores):
+                if not enviar_proxima():
+                    break
+
+            while em_execucao:
+                concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    chave = em_execucao.pop(futuro)[0]
+                    try:
+                        texto, duracao = futuro.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception:
+                        enviar_proxima()
+                        continue  # Tentativa com erro é apenas descartada, como no OCR em série
+
+                    self.tentativas_executadas += 1
+                    yield chave, texto, duracao
+
+                    if parar is not None and parar(chave, texto):
+                        self.tentativas_canceladas += sum(1 for _ in fila)
+                        return
+                    enviar_proxima()
+        except BrokenProcessPool as e:
+            # Um trabalhador morreu: o pool é recriado na próxima chamada e o restante roda em série
+            print(f"⚠️ Pool de OCR interrompido ({e}), concluindo em série")
+            self._pool = None
+            restantes = list(em_execucao.values()) + list(fila)
+            em_execucao.clear()
+            yield from self._executar_em_serie(restantes, parar)
+        finally:
+            # Cancela o que ainda não começou (também se o chamador abandonar o gerador)
+            for futuro in em_execucao:
+                if futuro.cancel():
+                    self.tentativas_canceladas += 1
+
+    def _executar_em_serie(self, tentativas, parar=None):
+        for chave, imagem, config in tentativas:
+            try:
+                texto, duracao = _executar_tentativa(imagem, config)
+            except Exception:
+                continue
+
+            self.tentativas_executadas += 1
+            yield chave, texto, duracao
+
+            if parar is not None and parar(chave, texto):
+                return
+
+    def fechar(self):
+        """Encerra o pool de processos"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -2,26 +2,26 @@
 """
 Script para organizar templates existentes na nova estrutura de pastas
 """
-import pickle
-import cv2
 import os
 import shutil
 from datetime import datetime
 
+from banco_templates import BancoTemplates
+from config_football_studio import TEMPLATES_BANCO
+
 def organizar_templates():
-    """Organiza templates do arquivo pickle na nova estrutura de pastas"""
+    """Organiza templates do banco de templates na nova estrutura de pastas"""
     
     print("📁 ORGANIZADOR DE TEMPLATES")
     print("=" * 50)
     
     # Carregar templates existentes
-    try:
-        with open('templates_cartas.pkl', 'rb') as f:
-            templates = pickle.load(f)
-        print(f"✅ Templates carregados: {len(templates)} tipos")
-    except FileNotFoundError:
-        print("❌ Arquivo templates_cartas.pkl não encontrado!")
+    banco = BancoTemplates(TEMPLATES_BANCO)
+    if not banco.carregar():
+        print(f"❌ Banco de templates '{TEMPLATES_BANCO}' não encontrado!")
         return
+    templates = banco.templates_por_chave()
+    print(f"✅ Templates carregados: {len(templates)} tipos ({banco.versao_caracteristicas})")
     
     # Criar timestamp para backup
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -52,24 +52,21 @@ def organizar_templates():
         print(f"   🃏 {naipe_nome} - {valor}")
         print(f"   📊 Variações: {len(variaciones)}")
         
-        # Salvar cada variação
-        for i, (template_img, caracteristicas) in enumerate(variaciones, 1):
-            nome_arquivo = f"{valor}_{naipe_pasta}_{timestamp}_v{i:02d}.png"
+        os.makedirs(pasta_destino, exist_ok=True)
+        
+        # Salvar cada variação (o banco guarda apenas as características, sem a imagem)
+        for i, template_info in enumerate(variaciones, 1):
+            nome_arquivo = f"{valor}_{naipe_pasta}_{timestamp}_v{i:02d}_caracteristicas.txt"
             caminho_completo = os.path.join(pasta_destino, nome_arquivo)
             
             try:
-                # Salvar imagem
-                cv2.imwrite(caminho_completo, template_img)
-                
-                # Salvar características em arquivo texto
-                txt_arquivo = caminho_completo.replace('.png', '_caracteristicas.txt')
-                with open(txt_arquivo, 'w') as f:
+                with open(caminho_completo, 'w') as f:
                     f.write(f"Template: {template_key}\n")
                     f.write(f"Variação: {i}\n")
                     f.write(f"Valor: {valor}\n")
                     f.write(f"Naipe: {naipe_nome}\n")
-                    f.write(f"Características: {caracteristicas.tolist()}\n")
-                    f.write(f"Data: {timestamp}\n")
+                    f.write(f"Características: {template_info['caracteristicas'].tolist()}\n")
+                    f.write(f"Data: {template_info['timestamp']}\n")
                 
                 print(f"   ✅ Salvo: {nome_arquivo}")
                 contador += 1
@@ -82,10 +79,10 @@ def organizar_templates():
     print(f"📁 Estrutura criada em: templates_organizados/")
     print(f"🗓️ Timestamp: {timestamp}")
     
-    # Criar backup do arquivo original
-    backup_nome = f"templates_cartas_backup_{timestamp}.pkl"
+    # Criar backup do banco original
+    backup_nome = f"{TEMPLATES_BANCO}_backup_{timestamp}"
     try:
-        shutil.copy2('templates_cartas.pkl', backup_nome)
+        shutil.copytree(TEMPLATES_BANCO, backup_nome)
         print(f"💾 Backup criado: {backup_nome}")
     except Exception as e:
         print(f"❌ Erro ao criar backup: {e}")
@@ -6,18 +6,21 @@ Sistema para otimizar coordenadas e melhorar precisão
 """
 
 import cv2
-import numpy as np
-import pytesseract
-import pyautogui
 import json
 import os
+import sys
+import time
 from datetime import datetime
 
-def capturar_tela_completa():
-    """Captura a tela completa"""
+from backend_ocr import ler_texto
+from fontes_frames import criar_fonte
+
+def capturar_tela_completa(fonte):
+    """Captura a tela completa (ou o próximo frame da fonte)"""
     try:
-        screenshot = pyautogui.screenshot()
-        img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        img = fonte.ler_frame()
+        if img is None:
+            return None
         print(f"📏 Tela capturada: {img.shape[1]}x{img.shape[0]}")
         return img
     except Exception as e:
@@ -128,7 +131,7 @@ def detectar_carta_ocr_robusto(img_regiao, lado):
                 ]
                 
                 for config in configs:
-                    texto = pytesseract.image_to_string(processed, config=config).strip()
+                    texto = ler_texto(processed, config=config).strip()
                     # Limpar texto
                     texto_limpo = ''.join(c for c in texto if c.isalnum())
                     
@@ -164,16 +167,21 @@ def salvar_coordenadas_otimizadas(coordenadas):
     except Exception as e:
         print(f"❌ Erro ao salvar: {e}")
 
-def testar_deteccao_otimizada():
+def testar_deteccao_otimizada(fonte=None):
     """Testa a detecção com coordenadas otimizadas"""
     print("🚀 TESTANDO DETECÇÃO OTIMIZADA")
     print("=" * 50)
     
+    fonte = fonte or criar_fonte()
+    print(f"🎞️ Fonte: {fonte.descricao()}")
+    
     for tentativa in range(3):
         print(f"\n🔄 Tentativa {tentativa + 1}/3")
         
         # Capturar tela
-        img = capturar_tela_completa()
+        img = capturar_tela_completa(fonte)
+        if fonte.esgotada:
+            break
         if img is None:
             continue
             
@@ -203,15 +211,17 @@ def testar_deteccao_otimizada():
             # Salvar coordenadas
             if coordenadas:
                 salvar_coordenadas_otimizadas(coordenadas)
-                
+            
+            fonte.fechar()
             return True
         else:
             print(f"❌ FALHA: CASA={carta_casa}, VISITANTE={carta_visitante}")
             
-        print("⏳ Aguardando 5 segundos...")
-        import time
-        time.sleep(5)
+        if fonte.tempo_real:
+            print("⏳ Aguardando 5 segundos...")
+            time.sleep(5)
     
+    fonte.fechar()
     print("\n❌ Todas as tentativas falharam")
     return False
 
@@ -223,10 +233,14 @@ if __name__ == "__main__":
     print("   2. Usar coordenadas otimizadas")
     print("   3. Testar detecção de cartas")
     print("   4. Salvar coordenadas que funcionam")
-    print("\n🎮 Abra o Football Studio e pressione Enter...")
-    input()
     
-    sucesso = testar_deteccao_otimizada()
+    # Uso: python otimizar_deteccao.py [pasta_de_frames|video]
+    origem = sys.argv[1] if len(sys.argv) > 1 else None
+    if origem is None:
+        print("\n🎮 Abra o Football Studio e pressione Enter...")
+        input()
+    
+    sucesso = testar_deteccao_otimizada(criar_fonte(origem))
     
     if sucesso:
         print("\n🎉 OTIMIZAÇÃO CONCLUÍDA COM SUCESSO!")
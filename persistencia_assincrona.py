@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 PERSISTÊNCIA ASSÍNCRONA (WRITE-BEHIND) - FOOTBALL STUDIO
+O loop de detecção só enfileira a rodada; uma thread de fundo grava em lotes.
+
+Política de durabilidade:
+- rodadas_por_lote: grava quando o lote atinge N rodadas (1 = uma gravação por rodada)
+- intervalo_ms: ... ou quando a rodada mais antiga do lote espera T ms
+- fsync: confirma cada lote no disco (False deixa a descarga para o sistema operacional)
+
+Métricas: profundidade da fila, lotes gravados, latência da gravação e erros.
+Um disco lento atrasa só a thread de gravação, nunca a detecção.
+"""
+
+import queue
+import threading
+import time
+
+# Políticas prontas: (rodadas_por_lote, intervalo_ms, fsync)
+POLITICAS_DURABILIDADE = {
+    'rodada': (1, 0, True),        # fsync a cada rodada
+    'lote': (10, 1000, True),      # fsync a cada 10 rodadas ou 1 s
+    'rapida': (50, 5000, False),   # Lotes grandes, sem fsync
+}
+
+_PARAR = object()
+
+class _PedidoDescarga:
+    """Pedido de descarga na fila: a thread de gravação preenche 'sucesso' e sinaliza o evento"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.sucesso = False
+
+class PersistidorAssincrono:
+    """Fila + thread de gravação: gravar_lote(entradas, fsync) é chamado fora do loop de detecção"""
+
+    def __init__(self, gravar_lote, rodadas_por_lote=10, intervalo_ms=1000, fsync=True, nome="persistencia"):
+        self.gravar_lote = gravar_lote
+        self.rodadas_por_lote = max(1, rodadas_por_lote)
+        self.intervalo = intervalo_ms / 1000.0
+        self.fsync = fsync
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._no_lote = 0  # Rodadas já retiradas da fila e ainda não gravadas
+        self.lotes = 0
+        self.rodadas_gravadas = 0
+        self.erros = 0
+        self.tempo_total = 0.0
+        self.ultima_latencia = 0.0
+        self.maior_latencia = 0.0
+        self._thread = threading.Thread(target=self._executar, name=nome, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def com_politica(cls, gravar_lote, politica='lote', nome="persistencia"):
+        """Cria o persistidor com uma das POLITICAS_DURABILIDADE"""
+        if politica not in POLITICAS_DURABILIDADE:
+            print(f"⚠️ Política de durabilidade '{politica}' desconhecida, usando 'lote'")
+            politica = 'lote'
+        rodadas_por_lote, intervalo_ms, fsync = POLITICAS_DURABILIDADE[politica]
+        return cls(gravar_lote, rodadas_por_lote, intervalo_ms, fsync, nome)
+
+    def enfileirar(self, entrada):
+        """Chamado pelo loop de detecção: não toca no disco"""
+        self._fila.put(entrada)
+
+    def descarregar(self, timeout=5.0):
+        """Grava o que estiver pendente e espera a confirmação (ex.: ao parar o monitor).
+
+        Retorna True só se tudo foi gravado; False se a gravação falhou ou o prazo acabou.
+        """
+        pedido = _PedidoDescarga()
+        self._fila.put(pedido)
+        if not pedido.evento.wait(timeout):
+            print(f"⚠️ Descarga do histórico não terminou em {timeout:.0f} s")
+            return False
+        if not pedido.sucesso:
+            print("❌ Descarga do histórico falhou: as rodadas continuam na fila para nova tentativa")
+        return pedido.sucesso
+
+    def parar(self, timeout=5.0):
+        """Grava o que falta e encerra a thread"""
+        if self._thread.is_alive():
+            self._fila.put(_PARAR)
+            self._thread.join(timeout)
+
+    def _executar(self):
+        pendentes = []
+        prazo = None
+        while True:
+            espera = None if not pendentes else max(0.0, prazo - time.monotonic())
+            try:
+                item = self._fila.get(timeout=espera)
+            except queue.Empty:
+                item = None  # Prazo do lote vencido
+
+            if item is _PARAR:
+                self._gravar(pendentes)
+                return
+            if isinstance(item, _PedidoDescarga):
+                pendentes = self._gravar(pendentes)
+                item.sucesso = not pendentes
+                item.evento.set()
+                continue
+
+            if item is not None:
+                if not pendentes:
+                    prazo = time.monotonic() + self.intervalo
+                pendentes.append(item)
+                with self._lock:
+                    self._no_lote = len(pendentes)
+
+            if pendentes and (len(pendentes) >= self.rodadas_por_lote or time.monotonic() >= prazo):
+                pendentes = self._gravar(pendentes)
+                if pendentes:
+                    # Falhou: tenta de novo depois de mais um intervalo, sem travar em loop
+                    prazo = time.monotonic() + max(self.intervalo, 1.0)
+
+    def _gravar(self, pendentes):
+        """Grava o lote; retorna o que ficou pendente (o próprio lote, se a gravação falhar)"""
+        if not pendentes:
+            return pendentes
+        inicio = time.perf_counter()
+        try:
+            self.gravar_lote(pendentes, self.fsync)
+        except Exception as e:
+            with self._lock:
+                self.erros += 1
+            print(f"❌ Erro na gravação em segundo plano ({len(pendentes)} rodadas pendentes): {e}")
+            return pendentes
+
+        duracao = time.perf_counter() - inicio
+        with self._lock:
+            self.lotes += 1
+            self.rodadas_gravadas += len(pendentes)
+            self.tempo_total += duracao
+            self.ultima_latencia = duracao
+            self.maior_latencia = max(self.maior_latencia, duracao)
+            self._no_lote = 0
+        return []
+
+    def metricas(self):
+        """Profundidade da fila e latência das gravações"""
+        with self._lock:
+            return {
+                'profundidade_fila': self._fila.qsize() + self._no_lote,
+                'lotes': self.lotes,
+                'rodadas_gravadas': self.rodadas_gravadas,
+                'erros': self.erros,
+                'latencia_media_ms': (self.tempo_total / self.lotes) * 1000 if self.lotes else 0.0,
+                'ultima_latencia_ms': self.ultima_latencia * 1000,
+                'maior_latencia_ms': self.maior_latencia * 1000,
+                'rodadas_por_lote': self.rodadas_por_lote,
+                'intervalo_ms': self.intervalo * 1000,
+                'fsync': self.fsync
+            }
+
+    def resumo(self):
+        dados = self.metricas()
+        return (f"fila {dados['profundidade_fila']}, {dados['rodadas_gravadas']} rodadas em {dados['lotes']} lotes, "
+                f"gravação {dados['latencia_media_ms']:.1f} ms (máx {dados['maior_latencia_ms']:.1f} ms), "
+                f"{dados['erros']} erros")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎯 RASTREADOR DE CARTAS - FOOTBALL STUDIO
+Mantém os quadriláteros das cartas entre frames em vez de procurar contornos na área inteira.
+
+- Busca completa (blur + threshold + findContours + approxPolyDP na área toda) só quando não há
+  cartas rastreadas, quando uma carta é perdida ou a cada N frames (para achar cartas novas)
+- Nos demais frames cada carta só é confirmada numa janela pequena ao redor da última posição
+"""
+
+import cv2
+
+class RastreadorCartas:
+    """Rastreia retângulos (x, y, w, h) de cartas entre frames, com id estável por carta"""
+
+    def __init__(self, area_minima=4600, margem=0.25, intervalo_busca_completa=30, max_perdas=2):
+        self.area_minima = area_minima    # Área mínima do contorno de uma carta (px)
+        self.margem = margem              # Janela de verificação: retângulo + margem (fração do lado)
+        self.intervalo_busca_completa = intervalo_busca_completa
+        self.max_perdas = max_perdas      # Frames seguidos sem confirmação até a carta ser descartada
+        self.cartas = {}                  # id -> {'retangulo': (x, y, w, h), 'perdas': n}
+        self.removidos = []               # ids descartados no último atualizar()
+        self._proximo_id = 0
+        self._frames_desde_busca = 0
+        self.buscas_completas = 0
+        self.verificacoes = 0
+
+    def _quadrilateros(self, gray, modo=cv2.RETR_EXTERNAL):
+        """Mesmo pré-processamento da busca original; retorna os retângulos com 4 lados"""
+        blur = cv2.GaussianBlur(gray, (5, 5), 0)
+        # Ajuste o primeiro valor (127) se a detecção de contornos estiver falhando
+        _, thresh = cv2.threshold(blur, 127, 255, cv2.THRESH_BINARY_INV)
+        contornos, _ = cv2.findContours(thresh, modo, cv2.CHAIN_APPROX_SIMPLE)
+
+        retangulos = []
+        for cnt in contornos:
+            if cv2.contourArea(cnt) > self.area_minima:
+                peri = cv2.arcLength(cnt, True)
+                approx = cv2.approxPolyDP(cnt, 0.02 * peri, True)
+                if len(approx) == 4:
+                    retangulos.append(cv2.boundingRect(approx))
+        return retangulos
+
+    @staticmethod
+    def sobreposicao(a, b):
+        """Interseção sobre união de dois retângulos (x, y, w, h)"""
+        x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+        x2, y2 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+        intersecao = max(0, x2 - x1) * max(0, y2 - y1)
+        uniao = a[2] * a[3] + b[2] * b[3] - intersecao
+        return intersecao / uniao if uniao else 0.0
+
+    def _verificar(self, gray, retangulo):
+        """Procura a carta só na janela ao redor da última posição; retorna o novo retângulo ou None"""
+        x, y, w, h = retangulo
+        mx, my = int(w * self.margem), int(h * self.margem)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(gray.shape[1], x + w + mx), min(gray.shape[0], y + h + my)
+        self.verificacoes += 1
+
+        # RETR_LIST: recortada, a borda da carta pode aparecer como furo do contorno do fundo
+        melhor, melhor_iou = None, 0.5
+        for rx, ry, rw, rh in self._quadrilateros(gray[y0:y1, x0:x1], cv2.RETR_LIST):
+            candidato = (rx + x0, ry + y0, rw, rh)
+            iou = self.sobreposicao(candidato, retangulo)
+            if iou > melhor_iou:
+                melhor, melhor_iou = candidato, iou
+        return melhor
+
+    def _busca_completa(self, gray):
+        """Procura cartas na área inteira; mantém o id das que já eram rastreadas"""
+        self.buscas_completas += 1
+        self._frames_desde_busca = 0
+
+        novas = {}
+        for retangulo in self._quadrilateros(gray):
+            existente = max(self.cartas, default=None,
+                            key=lambda id_carta: self.sobreposicao(self.cartas[id_carta]['retangulo'], retangulo))
+            if existente is not None and existente not in novas and \
+                    self.sobreposicao(self.cartas[existente]['retangulo'], retangulo) > 0.5:
+                id_carta = existente
+            else:
+                id_carta = self._proximo_id
+                self._proximo_id += 1
+            novas[id_carta] = {'retangulo': retangulo, 'perdas': 0}
+
+        self.removidos.extend(id_carta for id_carta in self.cartas if id_carta not in novas)
+        self.cartas = novas
+
+    def atualizar(self, gray):
+        """Atualiza as cartas com o frame em escala de cinza; retorna [(id, (x, y, w, h)), ...]"""
+        self.removidos = []
+        self._frames_desde_busca += 1
+
+        perdeu = False
+        for id_carta, carta in list(self.cartas.items()):
+            retangulo = self._verificar(gray, carta['retangulo'])
+            if retangulo is not None:
+                carta['retangulo'], carta['perdas'] = retangulo, 0
+                continue
+            carta['perdas'] += 1
+            if carta['perdas'] > self.max_perdas:
+                del self.cartas[id_carta]
+                self.removidos.append(id_carta)
+                perdeu = True
+
+        if not self.cartas or perdeu or self._frames_desde_busca >= self.intervalo_busca_completa:
+            self._busca_completa(gray)
+
+        return [(id_carta, carta['retangulo']) for id_carta, carta in self.cartas.items()
+                if carta['perdas'] == 0]
+
+    def reiniciar(self):
+        """Esquece todas as cartas (a próxima atualização faz uma busca completa)"""
+        self.removidos = list(self.cartas)
+        self.cartas = {}
@@ -1,13 +1,52 @@
 import cv2
 import numpy as np
 import mss
+import json
 import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-def load_templates(base_folder='templates_cartas/'):
+from indice_canto import ReconhecedorIndiceCanto
+from classificador_fatorado import ClassificadorFatorado
+from cache_reconhecimento import CacheReconhecimento
+
+# Templates já decodificados (cinza) + manifesto com mtime/tamanho de cada arquivo de origem
+# (arquivos que não decodificam também entram, sem imagem, para não serem tentados a cada início)
+ARQUIVO_CACHE_TEMPLATES = 'cache_templates_cartas.npz'
+
+def _carregar_cache_templates(arquivo_cache):
+    """Lê o cache: caminho -> (mtime, tamanho, imagem em cinza ou None se o arquivo não decodificou)"""
+    if not arquivo_cache or not os.path.exists(arquivo_cache):
+        return {}
+    try:
+        with np.load(arquivo_cache) as dados:
+            manifesto = json.loads(str(dados['manifesto']))
+            return {caminho: (mtime, tamanho, dados[f'img_{i}'] if f'img_{i}' in dados else None)
+                    for i, (caminho, mtime, tamanho, *_) in enumerate(manifesto)}
+    except Exception as e:
+        print(f"Cache de modelos inválido ({e}), decodificando todos os arquivos.")
+        return {}
+
+def _salvar_cache_templates(arquivo_cache, entradas):
+    """Grava [(caminho, mtime, tamanho, imagem ou None), ...] em um único arquivo compactado"""
+    try:
+        temporario = arquivo_cache[:-len('.npz')] + '.tmp.npz'
+        manifesto = [[caminho, mtime, tamanho] for caminho, mtime, tamanho, _ in entradas]
+        imagens = {f'img_{i}': img for i, (_, _, _, img) in enumerate(entradas) if img is not None}
+        np.savez_compressed(temporario, manifesto=np.array(json.dumps(manifesto)), **imagens)
+        os.replace(temporario, arquivo_cache)
+    except Exception as e:
+        print(f"Aviso: não foi possível gravar o cache de modelos ({e}).")
+
+def load_templates(base_folder='templates_cartas/', arquivo_cache=ARQUIVO_CACHE_TEMPLATES):
     """
     Carrega todos os modelos da estrutura de pastas, criando nomes únicos para cada carta.
     Ex: 'copas_2', 'ouros_as'.
+
+    As imagens decodificadas ficam em arquivo_cache; nas execuções seguintes só os arquivos
+    novos ou alterados (mtime/tamanho) são decodificados, em paralelo. arquivo_cache=None
+    desativa o cache.
     """
     templates = {}
     print("Iniciando carregamento dos modelos...")
@@ -16,23 +55,52 @@ def load_templates(base_folder='templates_cartas/'):
         print(f"ERRO: A pasta de modelos '{base_folder}' não foi encontrada.")
         return None
 
-    for suit_folder in os.listdir(base_folder):
+    arquivos = []  # (nome_carta, caminho, mtime, tamanho)
+    for suit_folder in sorted(os.listdir(base_folder)):
         suit_path = os.path.join(base_folder, suit_folder)
         if os.path.isdir(suit_path):
-            for rank_folder in os.listdir(suit_path):
+            for rank_folder in sorted(os.listdir(suit_path)):
                 rank_path = os.path.join(suit_path, rank_folder)
                 if os.path.isdir(rank_path):
                     card_name = f"{suit_folder}_{rank_folder}"
-                    
-                    if card_name not in templates:
-                        templates[card_name] = []
+                    templates.setdefault(card_name, [])
                         
-                    for template_file in os.listdir(rank_path):
+                    for template_file in sorted(os.listdir(rank_path)):
                         if template_file.lower().endswith(('.png', '.jpg', '.jpeg')):
                             img_path = os.path.join(rank_path, template_file)
-                            template_img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-                            if template_img is not None:
-                                templates[card_name].append(template_img)
+                            info = os.stat(img_path)
+                            arquivos.append((card_name, img_path, info.st_mtime, info.st_size))
+
+    cache = _carregar_cache_templates(arquivo_cache)
+    imagens = {}
+    pendentes = []
+    for _, img_path, mtime, tamanho in arquivos:
+        anterior = cache.get(img_path)
+        if anterior is not None and anterior[0] == mtime and anterior[1] == tamanho:
+            imagens[img_path] = anterior[2]  # None: já falhou com este mtime/tamanho
+        else:
+            pendentes.append(img_path)
+
+    if pendentes:
+        # cv2.imread libera o GIL: threads bastam para decodificar em paralelo
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2)) as executor:
+            for img_path, template_img in zip(pendentes, executor.map(
+                    lambda caminho: cv2.imread(caminho, cv2.IMREAD_GRAYSCALE), pendentes)):
+                imagens[img_path] = template_img
+        print(f"{len(pendentes)} modelos decodificados, {len(arquivos) - len(pendentes)} do cache.")
+        falhas = [img_path for img_path in pendentes if imagens[img_path] is None]
+        if falhas:
+            print(f"Aviso: {len(falhas)} arquivos de modelo não puderam ser lidos (ex.: {falhas[0]}); "
+                  f"só serão tentados de novo quando mudarem.")
+
+    for card_name, img_path, _, _ in arquivos:
+        if imagens.get(img_path) is not None:
+            templates[card_name].append(imagens[img_path])
+
+    # Regrava o cache se algo foi decodificado (ou falhou) ou se arquivos foram removidos
+    if arquivo_cache and (pendentes or set(cache) != {img_path for _, img_path, _, _ in arquivos}):
+        _salvar_cache_templates(arquivo_cache, [(img_path, mtime, tamanho, imagens[img_path])
+                                                for _, img_path, mtime, tamanho in arquivos])
     
     if not templates:
         print("Nenhum modelo foi carregado. Verifique a estrutura de pastas e os nomes.")
@@ -43,30 +111,102 @@ def load_templates(base_folder='templates_cartas/'):
         print(f" - Carta '{card}': {len(imgs)} variações.")
     return templates
 
-def recognize_card(image_roi, templates):
+# Escalas em que cada modelo é pré-calculado (cobre zoom do navegador / resolução diferente)
+ESCALAS_PIRAMIDE = (0.7, 0.85, 1.0, 1.2, 1.4)
+# Redução aplicada na busca grossa (0.2 = 1/25 dos pixels)
+FATOR_GROSSO = 0.2
+# Quantos candidatos da busca grossa são refinados em resolução cheia
+CANDIDATOS_REFINO = 4
+# Menor lado aceito para um modelo na busca grossa
+LADO_MINIMO_GROSSO = 8
+
+def _redimensionar(img, escala):
+    altura = int(round(img.shape[0] * escala))
+    largura = int(round(img.shape[1] * escala))
+    if altura < 4 or largura < 4:
+        return None
+    interpolacao = cv2.INTER_AREA if escala < 1 else cv2.INTER_LINEAR
+    return cv2.resize(img, (largura, altura), interpolation=interpolacao)
+
+def preparar_piramide_templates(templates, escalas=ESCALAS_PIRAMIDE, fator_grosso=FATOR_GROSSO):
+    """
+    Pré-processa os modelos uma única vez: cada variação é redimensionada em todas as
+    escalas da pirâmide e também reduzida por fator_grosso para a busca inicial.
+    Retorna a lista de entradas usada por recognize_card.
+    """
+    piramide = []
+    for card_name, template_variations in templates.items():
+        for template_img in template_variations:
+            for escala in escalas:
+                fino = _redimensionar(template_img, escala)
+                grosso = _redimensionar(template_img, escala * fator_grosso)
+                if fino is None or grosso is None or min(grosso.shape) < LADO_MINIMO_GROSSO:
+                    continue
+                piramide.append({'card': card_name, 'escala': escala, 'fino': fino, 'grosso': grosso})
+
+    print(f"Pirâmide de modelos pronta: {len(piramide)} entradas ({len(escalas)} escalas).")
+    return piramide
+
+def _converter_para_cinza(image_roi):
+    if image_roi.ndim == 2:
+        return image_roi
+    if image_roi.shape[2] == 4:
+        return cv2.cvtColor(image_roi, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image_roi, cv2.COLOR_BGR2GRAY)
+
+def _refinar(gray_roi, fino, posicao_grossa, fator_grosso):
+    """Casa o modelo em resolução cheia apenas numa janela em volta da posição grossa"""
+    altura, largura = fino.shape
+    margem = int(np.ceil(1 / fator_grosso)) + 2  # Imprecisão da posição na busca grossa
+    x = int(posicao_grossa[0] / fator_grosso)
+    y = int(posicao_grossa[1] / fator_grosso)
+    x0, y0 = max(0, x - margem), max(0, y - margem)
+    x1 = min(gray_roi.shape[1], x + largura + margem)
+    y1 = min(gray_roi.shape[0], y + altura + margem)
+    janela = gray_roi[y0:y1, x0:x1]
+    if janela.shape[0] < altura or janela.shape[1] < largura:
+        return 0.0
+    res = cv2.matchTemplate(janela, fino, cv2.TM_CCOEFF_NORMED)
+    return cv2.minMaxLoc(res)[1]
+
+def recognize_card(image_roi, templates, fator_grosso=FATOR_GROSSO):
     """
     Compara a imagem com todos os modelos e retorna o melhor resultado.
+    Busca grossa em baixa resolução em todas as escalas da pirâmide e refino em
+    resolução cheia apenas em volta dos melhores candidatos.
+    Aceita o dicionário de load_templates (a pirâmide é montada na hora) ou a
+    lista já preparada por preparar_piramide_templates.
     """
     # Limite de confiança. Ajuste se necessário.
     # Valores mais altos = mais exigente. Valores mais baixos = mais flexível.
     best_overall_score = 0.50 
     best_overall_card = "Nenhuma"
+
+    if isinstance(templates, dict):
+        templates = preparar_piramide_templates(templates, fator_grosso=fator_grosso)
     
     # Converte a imagem capturada para escala de cinza
-    gray_roi = cv2.cvtColor(image_roi, cv2.COLOR_BGRA2GRAY)
+    gray_roi = _converter_para_cinza(image_roi)
+    gray_grosso = cv2.resize(gray_roi, None, fx=fator_grosso, fy=fator_grosso, interpolation=cv2.INTER_AREA)
 
-    for card_name, template_variations in templates.items():
-        for template_img in template_variations:
-            # Pula se o modelo for maior que a imagem capturada
-            if gray_roi.shape[0] < template_img.shape[0] or gray_roi.shape[1] < template_img.shape[1]:
-                continue
+    # 1. Busca grossa: todos os modelos/escalas que cabem na ROI reduzida
+    candidatos = []
+    for entrada in templates:
+        grosso = entrada['grosso']
+        # Pula se o modelo for maior que a imagem capturada (outra escala da pirâmide deve caber)
+        if gray_grosso.shape[0] < grosso.shape[0] or gray_grosso.shape[1] < grosso.shape[1]:
+            continue
+        res = cv2.matchTemplate(gray_grosso, grosso, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        candidatos.append((max_val, max_loc, entrada))
 
-            res = cv2.matchTemplate(gray_roi, template_img, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, _ = cv2.minMaxLoc(res)
-            
-            if max_val > best_overall_score:
-                best_overall_score = max_val
-                best_overall_card = card_name
+    # 2. Refino: só os melhores candidatos, numa janela pequena em resolução cheia
+    candidatos.sort(key=lambda candidato: candidato[0], reverse=True)
+    for _, max_loc, entrada in candidatos[:CANDIDATOS_REFINO]:
+        score = _refinar(gray_roi, entrada['fino'], max_loc, fator_grosso)
+        if score > best_overall_score:
+            best_overall_score = score
+            best_overall_card = entrada['card']
                 
     return best_overall_card, best_overall_score
 
@@ -99,6 +239,27 @@ if __name__ == "__main__":
     templates = load_templates(base_folder='templates_cartas/')
     if not templates:
         exit() # Encerra o programa se nenhum modelo for carregado
+    piramide = preparar_piramide_templates(templates)
+
+    # Modo canto (--canto): compara só o índice do canto superior esquerdo de cada carta
+    reconhecedor_canto = None
+    if '--canto' in sys.argv:
+        # As áreas são escolhidas a cada execução, então o deslocamento do canto fica só em memória
+        reconhecedor_canto = ReconhecedorIndiceCanto('templates_cartas', arquivo_calibracao=None)
+
+    # Modo fatorado (--fatorado): valor (13 classes) e naipe (4 classes) reconhecidos separadamente
+    classificador_fatorado = ClassificadorFatorado('templates_cartas') if '--fatorado' in sys.argv else None
+
+    def reconhecer_roi(img, chave):
+        """Reconhece a carta da ROI com o modo escolhido: (nome_carta, score)"""
+        if classificador_fatorado is not None:
+            return classificador_fatorado.reconhecer(img)
+        if reconhecedor_canto is not None:
+            return reconhecedor_canto.reconhecer(img, chave)
+        return recognize_card(img, piramide)
+
+    # Frames repetidos (e a mesma carta em outra rodada) saem do cache sem reprocessar
+    cache = CacheReconhecimento()
 
     # 2. Configurar as áreas de captura das cartas
     roi_carta1, roi_carta2 = configurar_rois_cartas()
@@ -116,8 +277,8 @@ if __name__ == "__main__":
             carta2_img = np.array(sct.grab(roi_carta2))
 
             # Tenta reconhecer cada carta
-            nome_carta1, score1 = recognize_card(carta1_img, templates)
-            nome_carta2, score2 = recognize_card(carta2_img, templates)
+            nome_carta1, score1 = cache.reconhecer(carta1_img, 'carta1', lambda img: reconhecer_roi(img, 'carta1'))
+            nome_carta2, score2 = cache.reconhecer(carta2_img, 'carta2', lambda img: reconhecer_roi(img, 'carta2'))
 
             # Imprime o resultado no terminal
             print(f"Carta 1: {nome_carta1} ({score1:.2f}) | Carta 2: {nome_carta2} ({score2:.2f})")
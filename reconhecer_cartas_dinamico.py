@@ -9,11 +9,14 @@ Versão Final
 Como funciona:
 1. Carrega o modelo de reconhecimento treinado (classificadorLBPH.yml).
 2. Carrega o mapeamento de IDs para nomes de cartas (mapeamento_nomes.json).
+   Se existir o modelo de valores (classificadorValoresLBPH.yml), usa o modo fatorado:
+   valor pelo índice do canto (13 classes) + naipe pela cor e forma do símbolo.
 3. Pede ao usuário para selecionar a área da tela onde o jogo está.
 4. Entra em um loop contínuo que:
    a. Captura a área selecionada.
-   b. Procura por contornos retangulares que pareçam cartas.
-   c. Para cada carta encontrada, tenta reconhecê-la usando o modelo.
+   b. Rastreia as cartas: confirma cada uma numa janela pequena ao redor da última
+      posição e só procura contornos na área inteira quando uma carta é perdida.
+   c. Para cada carta rastreada, reconhece com o modelo (apenas se o recorte mudou).
    d. Exibe o resultado na tela e no terminal.
    
 Pressione 'q' na janela de visualização para encerrar.
@@ -24,6 +27,10 @@ import cv2
 import numpy as np
 import json
 import mss
+import os
+from classificador_fatorado import ClassificadorFatorado, recortar_regioes
+from rastreador_cartas import RastreadorCartas
+from detector_mudanca import DetectorMudanca
 
 # --- FUNÇÃO PARA SELECIONAR A ÁREA DE CAPTURA ---
 def definir_area_de_captura():
@@ -69,6 +76,20 @@ except Exception as e:
     print("Verifique se você executou o script 'treinar_modelo_cartas.py' primeiro e se a pasta 'classifier_cartas' existe.")
     exit()
 
+# Modelo fatorado (opcional): valor pelo índice + naipe pela cor/forma do símbolo
+reconhecedor_valores = None
+if os.path.exists('classifier_cartas/classificadorValoresLBPH.yml'):
+    try:
+        reconhecedor_valores = cv2.face.LBPHFaceRecognizer_create()
+        reconhecedor_valores.read('classifier_cartas/classificadorValoresLBPH.yml')
+        with open('classifier_cartas/mapeamento_valores.json', 'r') as f:
+            mapa_valores = json.load(f)
+        classificador_naipes = ClassificadorFatorado('templates_cartas')
+        print("Modo fatorado ativo: valor (índice do canto) + naipe (cor e forma).")
+    except Exception as e:
+        print(f"Modelo de valores indisponível ({e}), usando o modelo de 52 cartas.")
+        reconhecedor_valores = None
+
 # 2. DEFINIR ÁREA DE CAPTURA
 area_de_captura = definir_area_de_captura()
 if not area_de_captura:
@@ -77,8 +98,31 @@ if not area_de_captura:
 # Configurações de exibição
 LARGURA_PADRAO = 220  # Deve ser o mesmo tamanho usado nos templates
 ALTURA_PADRAO = 300   # Deve ser o mesmo tamanho usado nos templates
+TAMANHO_VALOR = (40, 60)  # Deve ser o mesmo de treinar_modelo_cartas.py (modelo de valores)
 font = cv2.FONT_HERSHEY_SIMPLEX
 
+def reconhecer_carta(carta_bgr):
+    """Reconhece a carta recortada (BGR); retorna (nome_carta, confianca) do LBPH"""
+    if reconhecedor_valores is not None:
+        # Modo fatorado: índice do canto no modelo de valores, naipe pela cor/forma
+        patch_valor, patch_naipe = recortar_regioes(carta_bgr)
+        indice = cv2.resize(cv2.cvtColor(patch_valor, cv2.COLOR_BGR2GRAY), TAMANHO_VALOR)
+        id_predito, confianca = reconhecedor_valores.predict(indice)
+        naipe, _ = classificador_naipes.classificar_naipe(patch_naipe)
+        valor = mapa_valores.get(str(id_predito))
+        return (f"{naipe}_{valor}" if naipe and valor else "Desconhecida"), confianca
+
+    # Padroniza o tamanho da carta (em escala de cinza) para o mesmo do treinamento
+    carta_padronizada = cv2.resize(cv2.cvtColor(carta_bgr, cv2.COLOR_BGR2GRAY), (LARGURA_PADRAO, ALTURA_PADRAO))
+
+    # Realiza a predição
+    id_predito, confianca = reconhecedor.predict(carta_padronizada)
+    return mapa_nomes.get(str(id_predito), "Desconhecida"), confianca
+
+# Rastreia as cartas entre frames e só refaz o predict quando o recorte muda
+rastreador = RastreadorCartas(area_minima=4600) # Ajuste a área dependendo do tamanho das cartas na tela
+detector_mudanca = DetectorMudanca(verboso=False)
+
 # 3. LOOP PRINCIPAL DE RECONHECIMENTO
 print("\n--- PASSO 2: Iniciando reconhecimento ---")
 print("Pressione 'q' na janela 'Visao do Jogo' para sair.")
@@ -91,47 +135,31 @@ with mss.mss() as sct:
         # Converte de BGRA (formato do mss) para BGR (formato do OpenCV)
         frame_visualizacao = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
 
-        # Pré-processamento para detecção de contornos
+        # Rastreamento: busca completa de contornos só quando uma carta é perdida (ou a cada N frames)
         gray = cv2.cvtColor(frame_visualizacao, cv2.COLOR_BGR2GRAY)
-        blur = cv2.GaussianBlur(gray, (5, 5), 0)
-        # Ajuste o primeiro valor (127) se a detecção de contornos estiver falhando
-        _, thresh = cv2.threshold(blur, 127, 255, cv2.THRESH_BINARY_INV)
-        
-        contornos, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        for cnt in contornos:
-            # Filtra os contornos por área para ignorar ruídos
-            area = cv2.contourArea(cnt)
-            if area > 4600: # Ajuste este valor dependendo do tamanho das cartas na tela
-                peri = cv2.arcLength(cnt, True)
-                approx = cv2.approxPolyDP(cnt, 0.02 * peri, True)
-
-                # Se o contorno tem 4 lados, é um bom candidato a ser uma carta
-                if len(approx) == 4:
-                    (x, y, w, h) = cv2.boundingRect(approx)
-                    
-                    # Recorta a carta encontrada da imagem em escala de cinza
-                    carta_recortada = gray[y:y+h, x:x+w]
-                    # Padroniza o tamanho da carta para o mesmo do treinamento
-                    carta_padronizada = cv2.resize(carta_recortada, (LARGURA_PADRAO, ALTURA_PADRAO))
-
-                    # Realiza a predição
-                    id_predito, confianca = reconhecedor.predict(carta_padronizada)
-
-                    # Avalia a confiança (para LBPH, menor é melhor)
-                    if confianca < 100: # Ajuste este limiar conforme seus testes
-                        nome_carta = mapa_nomes.get(str(id_predito), "Desconhecida")
-                        
-                        # Exibe o resultado no terminal
-                        print(f"Identificado: {nome_carta} (Confiança: {confianca:.2f})")
-                        
-                        # Desenha o resultado na janela de visualização
-                        cv2.rectangle(frame_visualizacao, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                        cv2.putText(frame_visualizacao, nome_carta, (x, y - 10), font, 0.8, (0, 255, 0), 2)
-                    else:
-                        # Opcional: desenhar um retângulo vermelho para cartas não identificadas
-                        cv2.rectangle(frame_visualizacao, (x, y), (x + w, y + h), (0, 0, 255), 2)
-                        cv2.putText(frame_visualizacao, "Nao Identificada", (x, y - 10), font, 0.8, (0, 0, 255), 2)
+        for id_carta in rastreador.removidos:
+            detector_mudanca.invalidar(f"carta_{id_carta}")
+
+        for id_carta, (x, y, w, h) in rastreador.atualizar(gray):
+            # O predict só roda quando o recorte rastreado mudou
+            chave = f"carta_{id_carta}"
+            nome_carta, confianca = detector_mudanca.reconhecer(
+                chave, frame_visualizacao[y:y+h, x:x+w], reconhecer_carta)
+
+            # Avalia a confiança (para LBPH, menor é melhor)
+            if confianca < 100: # Ajuste este limiar conforme seus testes
+                
+                # Exibe o resultado no terminal (apenas quando a carta foi reconhecida de novo)
+                if detector_mudanca.ultimo_mudou.get(chave):
+                    print(f"Identificado: {nome_carta} (Confiança: {confianca:.2f})")
+                
+                # Desenha o resultado na janela de visualização
+                cv2.rectangle(frame_visualizacao, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                cv2.putText(frame_visualizacao, nome_carta, (x, y - 10), font, 0.8, (0, 255, 0), 2)
+            else:
+                # Opcional: desenhar um retângulo vermelho para cartas não identificadas
+                cv2.rectangle(frame_visualizacao, (x, y), (x + w, y + h), (0, 0, 255), 2)
+                cv2.putText(frame_visualizacao, "Nao Identificada", (x, y - 10), font, 0.8, (0, 0, 255), 2)
 
         cv2.imshow("Visao do Jogo", frame_visualizacao)
         
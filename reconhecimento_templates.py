@@ -11,58 +11,38 @@ import pyautogui
 import json
 import os
 from datetime import datetime
-from sklearn.metrics.pairwise import cosine_similarity
 import pickle
 
+from banco_templates import BancoTemplates
+from extrator_caracteristicas import ExtratorPixelsBordas
+from cache_reconhecimento import CacheReconhecimento
+
 class TemplateCardRecognizer:
     """Sistema de reconhecimento de cartas por templates"""
     
     def __init__(self):
-        self.templates = {}  # Dicionário para armazenar templates das cartas
-        self.templates_file = "templates_cartas.pkl"
+        self.templates = {}  # Visão {valor_lado: [template_info, ...]} do banco
+        self.templates_file = "templates_cartas.pkl"  # Formato antigo, apenas para migração
         self.cartas_validas = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
         self.threshold_similaridade = 0.7  # Threshold para aceitar reconhecimento
+        self.extrator = ExtratorPixelsBordas()  # Buffers de trabalho reaproveitados entre extrações
+        # Banco em disco (matriz float32 com mmap) usado diretamente na busca vetorizada
+        self.banco = BancoTemplates("templates_pixels_banco", self.extrator.versao, maximo_por_chave=5)
+        self.cache = CacheReconhecimento()  # Resultados por conteúdo da ROI (limpo ao mudar os templates)
         self.carregar_templates()
     
     def extrair_caracteristicas(self, img_carta):
         """Extrai características da imagem da carta para comparação"""
         try:
-            if img_carta is None or img_carta.size == 0:
-                return None
-            
-            # Redimensionar para tamanho padrão
-            img_redimensionada = cv2.resize(img_carta, (100, 140), interpolation=cv2.INTER_AREA)
-            
-            # Converter para escala de cinza
-            gray = cv2.cvtColor(img_redimensionada, cv2.COLOR_BGR2GRAY)
-            
-            # Normalizar a imagem
-            gray = cv2.equalizeHist(gray)
-            
-            # Aplicar filtro Gaussiano para reduzir ruído
-            gray = cv2.GaussianBlur(gray, (3, 3), 0)
-            
-            # Extrair bordas usando Canny
-            edges = cv2.Canny(gray, 50, 150)
-            
-            # Combinar informações: imagem original + bordas
-            # Redimensionar para vetor de características
-            gray_flat = gray.flatten()
-            edges_flat = edges.flatten()
-            
-            # Combinar características
-            caracteristicas = np.concatenate([gray_flat, edges_flat])
-            
-            # Normalizar características
-            if np.linalg.norm(caracteristicas) > 0:
-                caracteristicas = caracteristicas / np.linalg.norm(caracteristicas)
-            
-            return caracteristicas
-            
+            return self.extrator.extrair(img_carta)
         except Exception as e:
             print(f"❌ Erro ao extrair características: {e}")
             return None
     
+    def extrair_caracteristicas_lote(self, imagens):
+        """Extrai as características de N blocos de uma vez (matriz N x D float32 + máscara de válidos)"""
+        return self.extrator.extrair_lote(imagens)
+    
     def salvar_template(self, img_carta, valor_carta, lado="GERAL"):
         """Salva um template de carta para reconhecimento posterior"""
         try:
@@ -70,32 +50,14 @@ class TemplateCardRecognizer:
             if caracteristicas is None:
                 return False
             
-            # Criar chave única para o template
-            chave = f"{valor_carta}_{lado}"
-            
-            # Se já existe template desta carta, criar lista de variações
-            if chave not in self.templates:
-                self.templates[chave] = []
-            
-            # Adicionar template
-            template_info = {
-                'caracteristicas': caracteristicas,
-                'valor': valor_carta,
-                'lado': lado,
-                'timestamp': datetime.now().isoformat(),
-                'tamanho_original': img_carta.shape
-            }
+            # Anexa ao banco em disco sem regravar os templates existentes
+            # (o banco mantém ativos apenas os 5 mais recentes por carta)
+            self.banco.anexar(caracteristicas, valor_carta, lado)
+            self.templates = self.banco.templates_por_chave()
+            self.cache.limpar()
             
-            self.templates[chave].append(template_info)
-            
-            # Manter apenas os 5 melhores templates por carta
-            if len(self.templates[chave]) > 5:
-                self.templates[chave] = self.templates[chave][-5:]
-            
-            print(f"✅ Template salvo: {valor_carta} ({lado}) - Total de variações: {len(self.templates[chave])}")
-            
-            # Salvar templates no arquivo
-            self.salvar_templates_arquivo()
+            chave = f"{valor_carta}_{lado}"
+            print(f"✅ Template salvo: {valor_carta} ({lado}) - Total de variações: {len(self.templates.get(chave, []))}")
             
             return True
             
@@ -103,79 +65,123 @@ class TemplateCardRecognizer:
             print(f"❌ Erro ao salvar template: {e}")
             return False
     
-    def reconhecer_carta(self, img_carta):
-        """Reconhece uma carta comparando com templates salvos"""
+    def reconhecer_top_k(self, img_carta, k=3, lado=None):
+        """Retorna as k cartas mais prováveis como lista de (valor, similaridade); lado restringe a busca"""
         try:
             if not self.templates:
                 print("⚠️ Nenhum template disponível para comparação")
-                return None, 0.0
+                return []
             
             # Extrair características da carta atual
             caracteristicas_carta = self.extrair_caracteristicas(img_carta)
             if caracteristicas_carta is None:
-                return None, 0.0
-            
-            melhor_match = None
-            melhor_similaridade = 0.0
+                return []
             
-            # Comparar com todos os templates
-            for chave, templates_lista in self.templates.items():
-                for template in templates_lista:
-                    # Calcular similaridade coseno
-                    caracteristicas_template = template['caracteristicas']
-                    
-                    # Redimensionar se necessário para ter mesmo tamanho
-                    tamanho_min = min(len(caracteristicas_carta), len(caracteristicas_template))
-                    carac_carta = caracteristicas_carta[:tamanho_min].reshape(1, -1)
-                    carac_template = caracteristicas_template[:tamanho_min].reshape(1, -1)
-                    
-                    similaridade = cosine_similarity(carac_carta, carac_template)[0][0]
-                    
-                    if similaridade > melhor_similaridade:
-                        melhor_similaridade = similaridade
-                        melhor_match = template['valor']
-            
-            # Verificar se a similaridade é suficiente
-            if melhor_similaridade >= self.threshold_similaridade:
-                print(f"✅ Carta reconhecida: {melhor_match} (similaridade: {melhor_similaridade:.3f})")
-                return melhor_match, melhor_similaridade
-            else:
-                print(f"❌ Baixa similaridade: {melhor_similaridade:.3f} (threshold: {self.threshold_similaridade})")
-                return None, melhor_similaridade
+            # Similaridade coseno contra todo o banco em um único produto matriz-vetor
+            return self.banco.buscar(caracteristicas_carta, k, lado)
             
         except Exception as e:
             print(f"❌ Erro no reconhecimento: {e}")
+            return []
+    
+    def reconhecer_carta(self, img_carta, lado=None):
+        """Reconhece uma carta comparando com templates salvos (ROIs repetidas saem do cache).
+
+        Com lado ('CASA'/'VISITANTE') só os templates daquele lado e os 'GERAL' são comparados.
+        """
+        try:
+            return self.cache.reconhecer(img_carta, f"templates_{lado or 'GERAL'}",
+                                         lambda img: self._avaliar_candidatos(self.reconhecer_top_k(img, 1, lado)))
+        except Exception as e:
+            print(f"❌ Erro no reconhecimento: {e}")
+            return None, 0.0
+    
+    def reconhecer_lote(self, imagens, lados=None):
+        """Reconhece N blocos com uma extração em lote e um produto matriz-matriz por lado"""
+        try:
+            lados = lados or [None] * len(imagens)
+            resultados = [(None, 0.0)] * len(imagens)
+            for lado in dict.fromkeys(lados):
+                posicoes = [posicao for posicao, lado_imagem in enumerate(lados) if lado_imagem == lado]
+                # Só os blocos fora do cache são extraídos e buscados
+                grupo = self.cache.reconhecer_lote(
+                    [imagens[posicao] for posicao in posicoes], f"templates_{lado or 'GERAL'}",
+                    lambda pendentes, lado=lado: self._reconhecer_lote_sem_cache(pendentes, lado))
+                for posicao, resultado in zip(posicoes, grupo):
+                    resultados[posicao] = resultado
+            return resultados
+        except Exception as e:
+            print(f"❌ Erro no reconhecimento em lote: {e}")
+            return [(None, 0.0)] * len(imagens)
+    
+    def _reconhecer_lote_sem_cache(self, imagens, lado=None):
+        if not self.templates:
+            return [(None, 0.0)] * len(imagens)
+        
+        caracteristicas, validos = self.extrair_caracteristicas_lote(imagens)
+        candidatos = self.banco.buscar_lote(caracteristicas, k=1, lado=lado)
+        return [self._avaliar_candidatos(lista) if valido else (None, 0.0)
+                for lista, valido in zip(candidatos, validos)]
+    
+    def _avaliar_candidatos(self, candidatos):
+        """Aplica o threshold ao melhor candidato: (valor, similaridade) ou (None, similaridade)"""
+        if not candidatos:
             return None, 0.0
+        
+        melhor_match, melhor_similaridade = candidatos[0]
+        
+        # Verificar se a similaridade é suficiente
+        if melhor_similaridade >= self.threshold_similaridade:
+            print(f"✅ Carta reconhecida: {melhor_match} (similaridade: {melhor_similaridade:.3f})")
+            return melhor_match, melhor_similaridade
+        else:
+            print(f"❌ Baixa similaridade: {melhor_similaridade:.3f} (threshold: {self.threshold_similaridade})")
+            return None, melhor_similaridade
     
     def salvar_templates_arquivo(self):
-        """Salva templates em arquivo"""
+        """Reescreve o banco de templates compactado (os salvamentos normais só anexam)"""
         try:
-            with open(self.templates_file, 'wb') as f:
-                pickle.dump(self.templates, f)
-            print(f"💾 Templates salvos em {self.templates_file}")
+            self.banco.compactar()
+            self.templates = self.banco.templates_por_chave()
+            print(f"💾 Templates salvos em {self.banco.pasta}")
         except Exception as e:
             print(f"❌ Erro ao salvar templates: {e}")
     
     def carregar_templates(self):
-        """Carrega templates do arquivo"""
+        """Carrega templates do banco (mmap, sem pickle); migra o arquivo .pkl antigo se existir"""
         try:
-            if os.path.exists(self.templates_file):
-                with open(self.templates_file, 'rb') as f:
-                    self.templates = pickle.load(f)
+            if self.banco.carregar():
+                self.templates = self.banco.templates_por_chave()
                 print(f"📁 Templates carregados: {len(self.templates)} tipos de cartas")
                 
                 # Mostrar estatísticas
                 for chave, templates_lista in self.templates.items():
                     print(f"   📋 {chave}: {len(templates_lista)} variações")
+            elif not self.banco.existe() and os.path.exists(self.templates_file):
+                self.migrar_templates_pickle()
             else:
                 print("📝 Nenhum template encontrado. Será necessário criar templates primeiro.")
         except Exception as e:
             print(f"❌ Erro ao carregar templates: {e}")
             self.templates = {}
     
+    def migrar_templates_pickle(self):
+        """Converte o antigo templates_cartas.pkl para o banco versionado (executado uma única vez)"""
+        print(f"🔄 Migrando {self.templates_file} para o banco '{self.banco.pasta}'...")
+        with open(self.templates_file, 'rb') as f:
+            templates_antigos = pickle.load(f)
+        
+        # Só entram no banco os templates gerados por este extrator
+        self.banco.compilar(templates_antigos, self.extrator.dimensao)
+        self.banco.salvar()
+        self.templates = self.banco.templates_por_chave()
+        print(f"✅ Migração concluída: {len(self.banco)} templates")
+    
     def limpar_templates(self):
         """Limpa todos os templates"""
+        self.banco.limpar()
         self.templates = {}
+        self.cache.limpar()
         if os.path.exists(self.templates_file):
             os.remove(self.templates_file)
         print("🗑️ Templates limpos")
@@ -317,12 +323,10 @@ def testar_reconhecimento():
                 print("❌ Falha na captura")
                 continue
             
-            # Tentar reconhecer ambas as cartas
-            print("🎯 Reconhecendo CASA...")
-            carta_casa, sim_casa = recognizer.reconhecer_carta(bloco_casa)
-            
-            print("🎯 Reconhecendo VISITANTE...")
-            carta_visitante, sim_visitante = recognizer.reconhecer_carta(bloco_visitante)
+            # Tentar reconhecer ambas as cartas (uma extração em lote)
+            print("🎯 Reconhecendo CASA e VISITANTE...")
+            (carta_casa, sim_casa), (carta_visitante, sim_visitante) = recognizer.reconhecer_lote(
+                [bloco_casa, bloco_visitante], ['CASA', 'VISITANTE'])
             
             # Mostrar resultados
             print("📊 RESULTADOS:")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧮 RODADAS EM COLUNAS - FOOTBALL STUDIO
+Histórico em memória como um array estruturado NumPy (13 bytes por rodada) em vez de
+listas de objetos CartaFootballStudio/RodadaFutebolEstudio.
+
+Colunas por rodada:
+    valor_vermelha, valor_azul   uint8  (1 = A ... 13 = K, o próprio valor no jogo; 0 = valor desconhecido)
+    naipe_vermelha, naipe_azul   uint8  (código na tabela de naipes, que cresce sob demanda)
+    vencedor                     int8   (1 = Casa, -1 = Visitante, 0 = Empate)
+    timestamp                    int64  (microssegundos desde 1970, horário local sem fuso)
+
+O array cresce por duplicação. RodadaView expõe uma linha com a mesma interface das rodadas
+antigas (carta_vermelha, carta_azul, timestamp, vencedor) e as contagens são vetorizadas.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+VALORES_CARTAS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+CODIGO_VALOR = {valor: codigo for codigo, valor in enumerate(VALORES_CARTAS, start=1)}
+VALOR_DESCONHECIDO = 0  # Valor fora de VALORES_CARTAS: o texto original fica à parte, por linha
+VENCEDORES = {1: "Casa", -1: "Visitante", 0: "Empate"}
+SEM_TIMESTAMP = np.iinfo(np.int64).min  # Timestamp que não é ISO
+
+DTYPE_RODADA = np.dtype([
+    ('valor_vermelha', 'u1'), ('naipe_vermelha', 'u1'),
+    ('valor_azul', 'u1'), ('naipe_azul', 'u1'),
+    ('vencedor', 'i1'), ('timestamp', '<i8')
+])
+
+EPOCA = datetime(1970, 1, 1)
+
+def timestamp_para_codigo(timestamp):
+    """String ISO -> microssegundos desde 1970 (SEM_TIMESTAMP se não for ISO)"""
+    try:
+        momento = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return SEM_TIMESTAMP
+    if momento.tzinfo is not None:
+        momento = momento.astimezone(timezone.utc).replace(tzinfo=None)
+    return (momento - EPOCA) // timedelta(microseconds=1)
+
+def codigo_para_timestamp(codigo):
+    if codigo == SEM_TIMESTAMP:
+        return ''
+    return (EPOCA + timedelta(microseconds=int(codigo))).isoformat()
+
+class CartaView:
+    """Carta de uma linha do histórico (naipe, valor e str como CartaFootballStudio)"""
+
+    __slots__ = ('naipe', 'valor')
+
+    def __init__(self, naipe, valor):
+        self.naipe = naipe
+        self.valor = valor
+
+    def __str__(self):
+        return f"{self.valor}{self.naipe}"
+
+class RodadaView:
+    """Visão leve de uma linha: nada é copiado até um atributo ser lido"""
+
+    __slots__ = ('_rodadas', '_indice')
+
+    def __init__(self, rodadas, indice):
+        self._rodadas = rodadas
+        self._indice = indice
+
+    @property
+    def _linha(self):
+        return self._rodadas.colunas[self._indice]
+
+    @property
+    def carta_vermelha(self):
+        linha = self._linha
+        return CartaView(self._rodadas.naipes[linha['naipe_vermelha']],
+                         self._rodadas.valor(self._indice, 'valor_vermelha', linha['valor_vermelha']))
+
+    @property
+    def carta_azul(self):
+        linha = self._linha
+        return CartaView(self._rodadas.naipes[linha['naipe_azul']],
+                         self._rodadas.valor(self._indice, 'valor_azul', linha['valor_azul']))
+
+    @property
+    def vencedor(self):
+        return VENCEDORES[int(self._linha['vencedor'])]
+
+    @property
+    def timestamp(self):
+        return codigo_para_timestamp(self._linha['timestamp'])
+
+class RodadasColunares:
+    """Histórico de rodadas em colunas NumPy, com crescimento geométrico"""
+
+    def __init__(self, capacidade=1024):
+        self._dados = np.zeros(capacidade, dtype=DTYPE_RODADA)
+        self.tamanho = 0
+        self.naipes = []          # código -> naipe
+        self._codigo_naipe = {}   # naipe -> código
+        self._valores_desconhecidos = {}  # (linha, coluna) -> valor original de código VALOR_DESCONHECIDO
+
+    @property
+    def colunas(self):
+        """Array estruturado só com as rodadas preenchidas (visão, sem cópia)"""
+        return self._dados[:self.tamanho]
+
+    def __len__(self):
+        return self.tamanho
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += self.tamanho
+        if not 0 <= indice < self.tamanho:
+            raise IndexError(indice)
+        return RodadaView(self, indice)
+
+    def bytes_por_rodada(self):
+        return DTYPE_RODADA.itemsize
+
+    def codigo_naipe(self, naipe):
+        if naipe not in self._codigo_naipe:
+            if len(self.naipes) > np.iinfo(np.uint8).max:
+                raise ValueError(f"Naipes demais na tabela ({len(self.naipes)})")
+            self._codigo_naipe[naipe] = len(self.naipes)
+            self.naipes.append(naipe)
+        return self._codigo_naipe[naipe]
+
+    def _codigo_valor(self, valor, indice, coluna):
+        codigo = CODIGO_VALOR.get(valor, VALOR_DESCONHECIDO)
+        if codigo == VALOR_DESCONHECIDO:
+            self._valores_desconhecidos[(indice, coluna)] = valor
+        return codigo
+
+    def valor(self, indice, coluna, codigo):
+        """Valor da carta a partir do código (o texto original para valores desconhecidos)"""
+        if codigo == VALOR_DESCONHECIDO:
+            return self._valores_desconhecidos.get((indice, coluna), '?')
+        return VALORES_CARTAS[codigo - 1]
+
+    def _reservar(self, quantidade):
+        """Garante espaço para mais 'quantidade' linhas (duplicando a capacidade)"""
+        necessario = self.tamanho + quantidade
+        if necessario <= len(self._dados):
+            return
+        capacidade = max(len(self._dados), 1)
+        while capacidade < necessario:
+            capacidade *= 2
+        novos = np.zeros(capacidade, dtype=DTYPE_RODADA)
+        novos[:self.tamanho] = self._dados[:self.tamanho]
+        self._dados = novos
+
+    def anexar_linhas(self, linhas):
+        """Anexa tuplas (timestamp, naipe_vermelha, valor_vermelha, naipe_azul, valor_azul[, ...])
+
+        É a ordem das colunas do armazenamento SQLite; o vencedor é recalculado pelos valores.
+        Valores fora de VALORES_CARTAS entram com o código VALOR_DESCONHECIDO (que vale 0 no vencedor,
+        como em RodadaFutebolEstudio) em vez de interromper o bloco.
+        """
+        linhas = list(linhas)
+        if not linhas:
+            return 0
+        self._reservar(len(linhas))
+        bloco = self._dados[self.tamanho:self.tamanho + len(linhas)]
+        bloco['timestamp'] = [timestamp_para_codigo(linha[0]) for linha in linhas]
+        bloco['naipe_vermelha'] = [self.codigo_naipe(linha[1]) for linha in linhas]
+        bloco['valor_vermelha'] = [self._codigo_valor(linha[2], self.tamanho + posicao, 'valor_vermelha')
+                                   for posicao, linha in enumerate(linhas)]
+        bloco['naipe_azul'] = [self.codigo_naipe(linha[3]) for linha in linhas]
+        bloco['valor_azul'] = [self._codigo_valor(linha[4], self.tamanho + posicao, 'valor_azul')
+                               for posicao, linha in enumerate(linhas)]
+        # O código do valor é o valor no jogo: o vencedor é o sinal da diferença
+        bloco['vencedor'] = np.sign(bloco['valor_vermelha'].astype(np.int16) - bloco['valor_azul'])
+        self.tamanho += len(linhas)
+        return len(linhas)
+
+    def anexar(self, carta_vermelha, carta_azul, timestamp):
+        """Anexa uma rodada (cartas com .naipe e .valor)"""
+        self.anexar_linhas([(timestamp, carta_vermelha.naipe, carta_vermelha.valor,
+                             carta_azul.naipe, carta_azul.valor)])
+        return self[self.tamanho - 1]
+
+    def descartar_ultimas(self, quantidade=1):
+        """Desfaz as últimas anexações (ex.: a gravação da rodada no banco falhou)"""
+        self.tamanho = max(0, self.tamanho - quantidade)
+        for chave in [chave for chave in self._valores_desconhecidos if chave[0] >= self.tamanho]:
+            del self._valores_desconhecidos[chave]
+
+    def ultimas(self, quantidade):
+        """Visões das últimas rodadas, da mais antiga para a mais nova"""
+        return [RodadaView(self, indice) for indice in range(max(0, self.tamanho - quantidade), self.tamanho)]
+
+    def fatia_intervalo(self, inicio=None, fim=None):
+        """slice das rodadas com inicio <= timestamp < fim (ISO; rodadas anexadas em ordem cronológica)"""
+        timestamps = self.colunas['timestamp']
+        primeiro = 0 if inicio is None else int(np.searchsorted(timestamps, timestamp_para_codigo(inicio), 'left'))
+        ultimo = self.tamanho if fim is None else int(np.searchsorted(timestamps, timestamp_para_codigo(fim), 'left'))
+        return slice(primeiro, max(primeiro, ultimo))
+
+    def intervalo(self, inicio=None, fim=None):
+        fatia = self.fatia_intervalo(inicio, fim)
+        return [RodadaView(self, indice) for indice in range(fatia.start, fatia.stop)]
+
+    def contagem_vencedores(self, inicio=None, fim=None):
+        """{vencedor: rodadas} no intervalo, com um bincount sobre a coluna de vencedores"""
+        vencedores = self.colunas['vencedor'][self.fatia_intervalo(inicio, fim)]
+        contagem = np.bincount(vencedores.astype(np.int64) + 1, minlength=3)
+        return {VENCEDORES[codigo - 1]: int(vezes) for codigo, vezes in enumerate(contagem)}
+
+    def limpar(self):
+        self.tamanho = 0
+        self._valores_desconhecidos.clear()
@@ -6,25 +6,26 @@ Teste focado apenas nos blocos onde aparecem as cartas no Football Studio
 """
 
 import cv2
-import numpy as np
-import pytesseract
-import pyautogui
 from datetime import datetime
 import os
+import sys
 
-# Configurar Tesseract
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+from backend_ocr import ler_texto
+from fontes_frames import criar_fonte
 
-def testar_blocos_cartas():
+def testar_blocos_cartas(fonte=None):
     """Teste específico dos blocos das cartas"""
     print("🎯 TESTE DOS BLOCOS DAS CARTAS - FOOTBALL STUDIO")
     print("=" * 60)
     
     try:
-        # Capturar tela completa
+        # Capturar tela completa (ou o primeiro frame da fonte informada)
         print("📸 Capturando tela completa...")
-        screenshot = pyautogui.screenshot()
-        img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        with (fonte or criar_fonte()) as fonte_frames:
+            img = fonte_frames.ler_frame()
+        if img is None:
+            print("❌ Nenhum frame disponível")
+            return False
         altura, largura = img.shape[:2]
         
         print(f"📏 Tela: {largura}x{altura}")
@@ -164,7 +165,7 @@ def analisar_bloco_ocr(bloco_img, tipo):
         for nome_prep, processed in preprocessamentos:
             for i, config in enumerate(configs):
                 try:
-                    texto = pytesseract.image_to_string(processed, config=config)
+                    texto = ler_texto(processed, config=config)
                     texto_limpo = limpar_texto_teste(texto)
                     
                     if texto_limpo:
@@ -233,11 +234,15 @@ def validar_carta_teste(texto):
 
 if __name__ == "__main__":
     print("🎯 TESTE ESPECÍFICO DOS BLOCOS DAS CARTAS")
-    print("📱 Abra o Football Studio e deixe as cartas visíveis")
-    print("⏰ Pressione Enter quando estiver pronto...")
-    input()
     
-    sucesso = testar_blocos_cartas()
+    # Uso: python testar_blocos.py [pasta_de_frames|video]
+    origem = sys.argv[1] if len(sys.argv) > 1 else None
+    if origem is None:
+        print("📱 Abra o Football Studio e deixe as cartas visíveis")
+        print("⏰ Pressione Enter quando estiver pronto...")
+        input()
+    
+    sucesso = testar_blocos_cartas(criar_fonte(origem))
     
     if sucesso:
         print("\n🎉 TESTE CONCLUÍDO COM SUCESSO!")
@@ -59,14 +59,14 @@ def main():
     print("\n🔍 TESTE DE RECONHECIMENTO:")
     
     print("  🏠 CASA:", end=" ")
-    valor_casa, sim_casa = recognizer.reconhecer_carta(bloco_casa)
+    valor_casa, sim_casa = recognizer.reconhecer_carta(bloco_casa, 'CASA')
     if valor_casa:
         print(f"✅ {valor_casa} (similaridade: {sim_casa:.3f})")
     else:
         print(f"❌ Não reconhecida (max: {sim_casa:.3f})")
     
     print("  ✈️ VISITANTE:", end=" ")
-    valor_visitante, sim_visitante = recognizer.reconhecer_carta(bloco_visitante)
+    valor_visitante, sim_visitante = recognizer.reconhecer_carta(bloco_visitante, 'VISITANTE')
     if valor_visitante:
         print(f"✅ {valor_visitante} (similaridade: {sim_visitante:.3f})")
     else:
@@ -1,66 +1,182 @@
 import cv2
 import os
+import sys
 import numpy as np
 import json # Usaremos JSON para salvar o mapeamento de IDs
+from concurrent.futures import ThreadPoolExecutor
+from classificador_fatorado import recortar_regioes
 
-print("Iniciando o processo de treinamento do modelo de cartas...")
-
-# Usaremos o LBPH, pois é excelente para texturas e robusto à iluminação
-reconhecedor = cv2.face.LBPHFaceRecognizer_create()
-
-def carregar_dados_cartas(base_folder='templates_cartas/'):
-    """
-    Lê a pasta de templates, atribui um ID numérico para cada carta,
-    e retorna as imagens e os IDs prontos para o treinamento.
-    """
-    faces_cartas = []
-    ids_cartas = []
-    mapa_id_nome = {}
-    id_atual = 0
+# Tamanho das cartas no treinamento (o mesmo usado no reconhecimento em reconhecer_cartas_dinamico.py)
+TAMANHO_CARTA = (220, 300)
+# Tamanho do recorte do índice usado pelo modelo de valores (deve ser o mesmo no reconhecimento)
+TAMANHO_VALOR = (40, 60)
 
-    print(f"Lendo arquivos de '{base_folder}'...")
+PASTA_CLASSIFICADOR = 'classifier_cartas'
+# Amostras já decodificadas e normalizadas, com o mtime/tamanho de cada arquivo de origem
+ARQUIVO_DATASET = os.path.join(PASTA_CLASSIFICADOR, 'dataset_cartas.npz')
+MODELO_CARTAS = os.path.join(PASTA_CLASSIFICADOR, 'classificadorCartasLBPH.yml')
+MAPA_CARTAS = os.path.join(PASTA_CLASSIFICADOR, 'mapeamento_nomes.json')
+MODELO_VALORES = os.path.join(PASTA_CLASSIFICADOR, 'classificadorValoresLBPH.yml')
+MAPA_VALORES = os.path.join(PASTA_CLASSIFICADOR, 'mapeamento_valores.json')
 
-    for nome_naipe in os.listdir(base_folder):
+def listar_imagens(base_folder='templates_cartas/'):
+    """Retorna [(caminho, naipe, valor), ...] das imagens em <naipe>/<valor>/"""
+    imagens = []
+    for nome_naipe in sorted(os.listdir(base_folder)):
         path_naipe = os.path.join(base_folder, nome_naipe)
         if not os.path.isdir(path_naipe): continue
 
-        for nome_valor in os.listdir(path_naipe):
+        for nome_valor in sorted(os.listdir(path_naipe)):
             path_valor = os.path.join(path_naipe, nome_valor)
             if not os.path.isdir(path_valor): continue
 
-            # Nome único da carta (ex: 'copas_2')
-            nome_carta = f"{nome_naipe}_{nome_valor}"
-
-            if nome_carta not in mapa_id_nome.values():
-                mapa_id_nome[id_atual] = nome_carta
-                id_numerico = id_atual
-                id_atual += 1
-            else:
-                # Se já viu essa carta, pega o ID existente
-                id_numerico = [id for id, name in mapa_id_nome.items() if name == nome_carta][0]
-            
-            for nome_arquivo in os.listdir(path_valor):
-                path_imagem = os.path.join(path_valor, nome_arquivo)
-                imagem = cv2.imread(path_imagem, cv2.IMREAD_GRAYSCALE)
-                
-                if imagem is not None:
-                    faces_cartas.append(imagem)
-                    ids_cartas.append(id_numerico)
-
-    print(f"{len(faces_cartas)} imagens carregadas para {len(mapa_id_nome)} cartas únicas.")
-    return np.array(ids_cartas), faces_cartas, mapa_id_nome
-
-# Carrega os dados
-ids, faces, mapa_nomes = carregar_dados_cartas()
-
-# Salva o mapa de nomes para ser usado no reconhecimento
-os.makedirs('classifier_cartas', exist_ok=True)
-with open('classifier_cartas/mapeamento_nomes.json', 'w') as f:
-    json.dump(mapa_nomes, f)
-print("Mapeamento de nomes salvo em 'mapeamento_nomes.json'")
-
-# Treina o modelo
-print("\nIniciando treinamento do modelo LBPH...")
-reconhecedor.train(faces, ids)
-reconhecedor.write('classifier_cartas/classificadorCartasLBPH.yml')
-print("Treinamento concluído com sucesso! Modelo salvo em 'classificadorCartasLBPH.yml'")
\ No newline at end of file
+            for nome_arquivo in sorted(os.listdir(path_valor)):
+                imagens.append((os.path.join(path_valor, nome_arquivo), nome_naipe, nome_valor))
+    return imagens
+
+def assinatura(caminho):
+    """(mtime, tamanho) do arquivo: muda quando a imagem é substituída"""
+    info = os.stat(caminho)
+    return info.st_mtime, info.st_size
+
+def decodificar_amostra(caminho):
+    """Decodifica uma imagem e retorna (carta em cinza 220x300, índice do canto em cinza 40x60) ou None"""
+    imagem = cv2.imread(caminho)
+    if imagem is None:
+        return None
+    patch_valor, _ = recortar_regioes(imagem, area_minima=0.3)
+    carta = cv2.resize(cv2.cvtColor(imagem, cv2.COLOR_BGR2GRAY), TAMANHO_CARTA)
+    indice = cv2.resize(cv2.cvtColor(patch_valor, cv2.COLOR_BGR2GRAY), TAMANHO_VALOR)
+    return carta, indice
+
+def carregar_dataset():
+    """Lê o cache de amostras: caminho -> {'mtime', 'tamanho', 'carta', 'indice', 'nome'}"""
+    if not os.path.exists(ARQUIVO_DATASET):
+        return {}
+    try:
+        with np.load(ARQUIVO_DATASET) as dados:
+            return {
+                str(caminho): {'mtime': float(mtime), 'tamanho': int(tamanho), 'carta': carta,
+                               'indice': indice, 'nome': str(nome)}
+                for caminho, mtime, tamanho, carta, indice, nome in zip(
+                    dados['caminhos'], dados['mtimes'], dados['tamanhos'],
+                    dados['cartas'], dados['indices'], dados['nomes'])
+            }
+    except Exception as e:
+        print(f"Cache de amostras inválido ({e}), todas as imagens serão lidas de novo.")
+        return {}
+
+def salvar_dataset(amostras):
+    """Grava o cache de amostras em um único arquivo compactado (escrita atômica)"""
+    caminhos = list(amostras)
+    temporario = ARQUIVO_DATASET[:-len('.npz')] + '.tmp.npz'
+    np.savez_compressed(
+        temporario,
+        caminhos=np.array(caminhos, dtype=str),
+        mtimes=np.array([amostras[c]['mtime'] for c in caminhos], dtype=np.float64),
+        tamanhos=np.array([amostras[c]['tamanho'] for c in caminhos], dtype=np.int64),
+        cartas=np.array([amostras[c]['carta'] for c in caminhos], dtype=np.uint8).reshape(
+            -1, TAMANHO_CARTA[1], TAMANHO_CARTA[0]),
+        indices=np.array([amostras[c]['indice'] for c in caminhos], dtype=np.uint8).reshape(
+            -1, TAMANHO_VALOR[1], TAMANHO_VALOR[0]),
+        nomes=np.array([amostras[c]['nome'] for c in caminhos], dtype=str))
+    os.replace(temporario, ARQUIVO_DATASET)
+
+def atualizar_dataset(base_folder='templates_cartas/'):
+    """
+    Compara a pasta de templates com o cache e decodifica (em paralelo) só as imagens novas
+    ou alteradas. Retorna (amostras, caminhos_novos, houve_remocao_ou_alteracao).
+    """
+    print(f"Lendo arquivos de '{base_folder}'...")
+    cache = carregar_dataset()
+    amostras = {}
+    pendentes = []
+    alterou = False
+
+    for caminho, nome_naipe, nome_valor in listar_imagens(base_folder):
+        mtime, tamanho = assinatura(caminho)
+        nome_carta = f"{nome_naipe}_{nome_valor}"
+        anterior = cache.pop(caminho, None)
+        if anterior and anterior['mtime'] == mtime and anterior['tamanho'] == tamanho and anterior['nome'] == nome_carta:
+            amostras[caminho] = anterior
+            continue
+        alterou = alterou or anterior is not None
+        pendentes.append((caminho, nome_carta, mtime, tamanho))
+
+    # O que sobrou no cache não existe mais na pasta
+    alterou = alterou or bool(cache)
+
+    # cv2.imread/resize liberam o GIL: threads bastam para decodificar em paralelo
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2)) as executor:
+        decodificadas = list(executor.map(decodificar_amostra, [p[0] for p in pendentes]))
+
+    novos = []
+    for (caminho, nome_carta, mtime, tamanho), amostra in zip(pendentes, decodificadas):
+        if amostra is None: continue
+        carta, indice = amostra
+        amostras[caminho] = {'mtime': mtime, 'tamanho': tamanho, 'carta': carta, 'indice': indice, 'nome': nome_carta}
+        novos.append(caminho)
+
+    print(f"{len(amostras)} imagens no dataset ({len(novos)} novas ou alteradas, {len(amostras) - len(novos)} do cache).")
+    return amostras, novos, alterou
+
+def carregar_mapa(arquivo):
+    """Lê o mapeamento id -> nome e devolve nome -> id (IDs estáveis entre treinamentos)"""
+    if not os.path.exists(arquivo):
+        return {}
+    with open(arquivo, 'r') as f:
+        return {nome: int(id_numerico) for id_numerico, nome in json.load(f).items()}
+
+def salvar_mapa(id_por_nome, arquivo):
+    with open(arquivo, 'w') as f:
+        json.dump({id_numerico: nome for nome, id_numerico in id_por_nome.items()}, f)
+
+def obter_id(id_por_nome, nome):
+    """ID da classe em O(1); classes novas recebem o próximo ID livre"""
+    if nome not in id_por_nome:
+        id_por_nome[nome] = max(id_por_nome.values(), default=-1) + 1
+    return id_por_nome[nome]
+
+def treinar_modelo(arquivo_modelo, arquivo_mapa, amostras, caminhos_treino, incremental, chave_imagem, nome_classe):
+    """Treina (ou atualiza com update()) um modelo LBPH com as amostras dos caminhos indicados"""
+    id_por_nome = carregar_mapa(arquivo_mapa) if incremental else {}
+    imagens = [amostras[c][chave_imagem] for c in caminhos_treino]
+    ids = np.array([obter_id(id_por_nome, nome_classe(amostras[c]['nome'])) for c in caminhos_treino])
+
+    # Usaremos o LBPH, pois é excelente para texturas e robusto à iluminação
+    reconhecedor = cv2.face.LBPHFaceRecognizer_create()
+    if incremental:
+        reconhecedor.read(arquivo_modelo)
+        reconhecedor.update(imagens, ids)
+    else:
+        reconhecedor.train(imagens, ids)
+    reconhecedor.write(arquivo_modelo)
+    salvar_mapa(id_por_nome, arquivo_mapa)
+    print(f"Modelo salvo em '{arquivo_modelo}' ({len(imagens)} amostras, {len(id_por_nome)} classes).")
+
+print("Iniciando o processo de treinamento do modelo de cartas...")
+os.makedirs(PASTA_CLASSIFICADOR, exist_ok=True)
+
+# Carrega os dados (só as imagens novas são decodificadas)
+amostras, novos, alterou = atualizar_dataset()
+
+# Incremental só quando o modelo salvo contém exatamente o cache anterior (sem remoções/alterações)
+modelos_existem = all(os.path.exists(arquivo) for arquivo in (MODELO_CARTAS, MAPA_CARTAS, MODELO_VALORES, MAPA_VALORES))
+incremental = modelos_existem and not alterou and len(novos) < len(amostras) and '--completo' not in sys.argv
+
+if incremental and not novos:
+    print("Nenhuma imagem nova: os modelos já estão atualizados.")
+else:
+    caminhos_treino = novos if incremental else list(amostras)
+    print(f"\nIniciando {'atualização incremental' if incremental else 'treinamento completo'} do modelo LBPH...")
+    treinar_modelo(MODELO_CARTAS, MAPA_CARTAS, amostras, caminhos_treino, incremental, 'carta', lambda nome: nome)
+
+    # Modelo fatorado: valores (13 classes) treinados só no índice do canto. O naipe é decidido
+    # à parte (classificador_fatorado.py), então pares valor/naipe sem pasta também são reconhecidos
+    print("\nIniciando treinamento do modelo de valores (índice do canto)...")
+    treinar_modelo(MODELO_VALORES, MAPA_VALORES, amostras, caminhos_treino, incremental, 'indice',
+                   lambda nome: nome.split('_', 1)[1])
+
+    # O cache só é gravado depois dos modelos: ele registra o que os modelos já contêm
+    salvar_dataset(amostras)
+    print("Treinamento concluído com sucesso!")